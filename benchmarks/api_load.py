@@ -0,0 +1,153 @@
+# benchmarks/api_load.py
+"""
+Load test for the local JSON API (timeboard_core.api).
+
+Usage:
+    python -m benchmarks.api_load                        # spawn a server on a synthetic board
+    python -m benchmarks.api_load --url http://127.0.0.1:8765 --duration 10
+
+Opens --connections keep-alive connections, sends a mix of /active,
+/occurrences, /convert and /free requests for --duration seconds and
+reports throughput and p50/p99 latency per endpoint.
+"""
+from datetime import timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from timeboard_core.board import Board, save_board
+
+from .synthetic import ANCHOR_UTC, synthetic_events, synthetic_settings
+
+
+def _requests(rng: random.Random):
+    """Endless stream of (endpoint, target) pairs."""
+    while True:
+        at = ANCHOR_UTC + timedelta(minutes=rng.randrange(-3 * 1440, 3 * 1440, 5))
+        kind = rng.choices(("active", "occurrences", "convert", "free"), (4, 2, 3, 1))[0]
+        if kind == "active":
+            params = {"at": at.isoformat()}
+        elif kind == "occurrences":
+            params = {"start": at.isoformat(), "end": (at + timedelta(hours=12)).isoformat(),
+                      "zones": "Europe/Berlin,Asia/Tokyo"}
+        elif kind == "convert":
+            params = {"time": at.isoformat(), "zones": "America/New_York,Europe/London,Asia/Tokyo"}
+        else:
+            params = {"start": at.isoformat(), "end": (at + timedelta(days=1)).isoformat(),
+                      "min_minutes": "30"}
+        yield kind, f"/{kind}?{urlencode(params)}"
+
+
+async def _read_response(reader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = head.lower()
+    if b"transfer-encoding: chunked" in headers:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        length = int(headers.split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, deadline, rng, latencies: Dict[str, List[float]], errors: List[int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for kind, target in _requests(rng):
+            if time.perf_counter() >= deadline:
+                break
+            t0 = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            status = await _read_response(reader)
+            latencies.setdefault(kind, []).append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+async def run(host: str, port: int, connections: int, duration: float, seed: int = 1):
+    latencies: Dict[str, List[float]] = {}
+    errors: List[int] = []
+    deadline = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, deadline, random.Random(seed + i), latencies, errors)
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - t0
+
+    everything = [v for values in latencies.values() for v in values]
+    print(f"{len(everything)} requests in {elapsed:.1f}s over {connections} connections "
+          f"= {len(everything) / elapsed:.0f} req/s, {len(errors)} errors")
+    print(f"{'endpoint':14s} {'count':>7s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for kind, values in sorted(latencies.items()) + [("all", everything)]:
+        print(f"{kind:14s} {len(values):7d} {_pct(values, 0.5):8.2f} {_pct(values, 0.99):8.2f}")
+    return 1 if errors else 0
+
+
+def _wait_for_port(host: str, port: int, timeout: float = 10.0):
+    async def _probe():
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+
+    deadline = time.time() + timeout
+    while True:
+        try:
+            asyncio.run(_probe())
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="api_load", description="Load test for timeboard_core.api")
+    parser.add_argument("--url", help="Server to test; by default a server is spawned")
+    parser.add_argument("--events", type=int, default=500, help="Synthetic events for a spawned server")
+    parser.add_argument("--port", type=int, default=8799, help="Port for a spawned server")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        board_path = os.path.join(tempfile.mkdtemp(prefix="timeboard-api-"), "board.json")
+        save_board(Board("load-test", synthetic_settings(4), synthetic_events(args.events)), board_path)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "timeboard_core.api", "--board", board_path,
+             "--host", host, "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        _wait_for_port(host, port)
+        return asyncio.run(run(host, port, args.connections, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# benchmarks/bench_batch.py
+"""
+Batch recompute throughput across worker processes.
+
+Runs `timeboard_core.batch.run_batch` over synthetic boards (occurrences,
+reminders and daily category totals for a year) with 1, 2, 4 and 8
+workers and reports rules/sec and the speedup over one worker. Speedups
+are capped by the machine's cores (printed with the results).
+
+Usage:
+    python -m benchmarks.bench_batch                        # 16 boards x 2000 rules
+    python -m benchmarks.bench_batch --boards 4 --events 20000 --workers 1 2 4
+"""
+from datetime import date
+from typing import List, Optional
+import argparse
+import os
+import sys
+import time
+
+from timeboard_core.batch import DEFAULT_SHARD_RULES, run_batch
+from timeboard_core.board import Board
+
+from .synthetic import ANCHOR_UTC, synthetic_events, synthetic_settings
+
+
+def synthetic_boards(n_boards: int, n_events: int) -> List[Board]:
+    return [
+        Board(
+            name=f"board-{i}",
+            settings=synthetic_settings(6, "week", False, False),
+            events=synthetic_events(n_events, span_days=365, seed=i),
+        )
+        for i in range(n_boards)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_batch", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--boards", type=int, default=16, help="Number of boards (default: 16)")
+    parser.add_argument("--events", type=int, default=2000, help="Rules per board (default: 2000)")
+    parser.add_argument("--days", type=int, default=365, help="Days to expand (default: 365)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Worker counts to compare (default: 1 2 4 8)")
+    parser.add_argument("--shard-rules", type=int, default=DEFAULT_SHARD_RULES,
+                        help=f"Max rules per shard (default: {DEFAULT_SHARD_RULES})")
+    args = parser.parse_args(argv)
+
+    boards = synthetic_boards(args.boards, args.events)
+    n_rules = args.boards * args.events
+    start = date(ANCHOR_UTC.year, 1, 1)
+
+    print(f"{n_rules} rules on {args.boards} boards, {args.days} days, {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>8s} {'seconds':>9s} {'rules/s':>10s} {'occ/s':>12s} {'speedup':>8s}")
+    base = None
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        results = run_batch(boards, start, args.days, workers=workers, shard_rules=args.shard_rules)
+        elapsed = time.perf_counter() - t0
+        occurrences = sum(r.n_occurrences for r in results)
+        base = base or elapsed
+        print(f"{workers:8d} {elapsed:9.2f} {n_rules / elapsed:10.0f} {occurrences / elapsed:12.0f} "
+              f"{base / elapsed:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# benchmarks/bench_columnar.py
+"""
+Columnar occurrence export throughput against raw disk writes.
+
+Exports a year of occurrences of synthetic boards with
+`timeboard_core.columnar.export_occurrences` and compares rows/sec with
+writing the same number of fixed-width rows straight to disk (the
+"disk speed" ceiling). Parquet and Arrow IPC are measured when pyarrow is
+installed, CSV always.
+
+Usage:
+    python -m benchmarks.bench_columnar                          # 8 boards x 2000 rules
+    python -m benchmarks.bench_columnar --boards 32 --zones 3 --workers 4
+"""
+from datetime import timedelta
+from typing import List, Optional
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from timeboard_core.columnar import DEFAULT_CHUNK_ROWS, export_occurrences
+
+from .bench_batch import synthetic_boards
+from .synthetic import ANCHOR_UTC, synthetic_zones
+
+
+def _disk_baseline(path: str, n_rows: int, row_bytes: int, chunk_rows: int) -> float:
+    """Seconds to write and fsync n_rows x row_bytes in chunks."""
+    block = bytes(chunk_rows * row_bytes)
+    t0 = time.perf_counter()
+    with open(path, "wb") as f:
+        for lo in range(0, n_rows, chunk_rows):
+            f.write(block[:(min(chunk_rows, n_rows - lo)) * row_bytes])
+        f.flush()
+        os.fsync(f.fileno())
+    return time.perf_counter() - t0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_columnar", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--boards", type=int, default=8, help="Number of boards (default: 8)")
+    parser.add_argument("--events", type=int, default=2000, help="Rules per board (default: 2000)")
+    parser.add_argument("--days", type=int, default=365, help="Days to export (default: 365)")
+    parser.add_argument("--zones", type=int, default=2, help="Local-time columns (default: 2)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    try:
+        import pyarrow  # noqa: F401
+        formats = ["parquet", "arrow", "csv"]
+    except ImportError:
+        formats = ["csv"]
+        print("pyarrow not installed: CSV only")
+
+    boards = synthetic_boards(args.boards, args.events)
+    zones = synthetic_zones(args.zones)
+    start = ANCHOR_UTC - timedelta(days=ANCHOR_UTC.weekday())
+    end = start + timedelta(days=args.days)
+    print(f"{args.boards * args.events} rules, {args.days} days, {len(zones)} zone column(s), "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"{'format':>8s} {'rows':>10s} {'seconds':>8s} {'rows/s':>10s} {'MB':>8s} {'vs disk':>8s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        n_rows = None
+        for fmt in formats:
+            path = os.path.join(tmp, f"occurrences.{fmt}")
+            result = export_occurrences(boards, path, start, end, zones, chunk_rows=args.chunk_rows,
+                                        workers=args.workers)
+            n_rows = result.n_rows
+            # int64 start/end/locals + int16 category + 2 x int32
+            row_bytes = 8 * (2 + len(zones)) + 2 + 8
+            disk_s = _disk_baseline(os.path.join(tmp, "raw.bin"), n_rows, row_bytes, args.chunk_rows)
+            print(f"{fmt:>8s} {n_rows:10d} {result.elapsed_s:8.2f} {n_rows / result.elapsed_s:10.0f} "
+                  f"{result.bytes_written / 1e6:8.1f} {result.elapsed_s / disk_s:7.1f}x")
+        print(f"raw disk: {n_rows / disk_s:.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
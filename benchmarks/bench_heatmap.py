@@ -0,0 +1,78 @@
+# benchmarks/bench_heatmap.py
+"""
+Daily aggregate benchmarks for the year heatmap.
+
+Times a full `DailyAggregate` build for one year (every rule expanded
+once), an incremental sync after editing a single rule, and the
+365-cell read the heatmap does per rerun.
+
+Usage:
+    python -m benchmarks.bench_heatmap                  # 10k rules
+    python -m benchmarks.bench_heatmap --events 2000 --tz America/New_York
+"""
+from datetime import date
+from typing import List, Optional
+import argparse
+import dataclasses
+import sys
+import time
+
+from timeboard_core.daily_aggregate import DailyAggregate
+
+from .bench_render import _best_of
+from .synthetic import ANCHOR_UTC, synthetic_events
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _build(events, tz: str, year: int) -> DailyAggregate:
+    aggregate = DailyAggregate(tz, date(year, 1, 1), date(year, 12, 31))
+    aggregate.sync(0, events)
+    return aggregate
+
+
+def run(n_events: int, tz: str, repeat: int = 3) -> dict:
+    year = ANCHOR_UTC.year
+    events = synthetic_events(n_events, span_days=365)
+
+    # A full build is slow enough that one call per sample is representative
+    build_ms = min(_timed(lambda: _build(events, tz, year)) for _ in range(repeat))
+
+    aggregate = _build(events, tz, year)
+    edited = list(events)
+    versions = iter(range(1, 1 << 30))
+
+    def edit_one():
+        # Alternate the first rule's duration so every sync sees one change
+        edited[0] = dataclasses.replace(edited[0], duration_min=edited[0].duration_min ^ 15)
+        aggregate.sync(next(versions), edited)
+
+    return {
+        "events": n_events,
+        "build_ms": build_ms,
+        "sync_one_edit_ms": _best_of(edit_one, repeat),
+        "read_year_ms": _best_of(lambda: aggregate.daily_hours(), repeat),
+        "read_category_ms": _best_of(lambda: aggregate.daily_hours(events[0].category_id), repeat),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_heatmap", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=10000, help="Number of rules (default: 10000)")
+    parser.add_argument("--tz", default="Europe/Berlin", help="Timezone of the heatmap days")
+    parser.add_argument("--repeat", type=int, default=3, help="Samples per timing (best is kept)")
+    args = parser.parse_args(argv)
+
+    result = run(args.events, args.tz, args.repeat)
+    print(f"{'events':>8s} {'build ms':>10s} {'1 edit ms':>10s} {'year ms':>9s} {'cat ms':>9s}")
+    print(f"{result['events']:8d} {result['build_ms']:10.1f} {result['sync_one_edit_ms']:10.2f} "
+          f"{result['read_year_ms']:9.2f} {result['read_category_ms']:9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# benchmarks/bench_render.py
+"""
+Render benchmarks for the timeline hot paths.
+
+Times occurrence expansion (`instantiate_for_day`), layout and HTML
+generation for every zoom level with daylight/trading overlays on and
+off, and compares against the JSON baseline.
+
+Usage:
+    python -m benchmarks.bench_render                 # compare to baseline
+    python -m benchmarks.bench_render --update        # write new baseline
+    python -m benchmarks.bench_render --zones 8 --events 2000 --threshold 0.2
+
+Timings are the best of --repeat samples. Cases that look slower than
+the threshold are measured CONFIRM_PASSES more times and judged on the
+median of those passes: on a shared machine identical runs differ by
+tens of percent (a noisy neighbour, frequency changes), so neither one
+slow pass nor one fast pass proves anything. Exits with status 1 when
+any timing still regresses beyond the threshold. Baselines are
+machine-specific: regenerate with --update on the machine that runs the
+comparison.
+"""
+from datetime import timedelta
+from typing import Callable, Collection, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+from timeboard_core.settings import ZOOM_LEVELS
+from timeboard_core.timeline_html import timeline_html
+from timeboard_core.timeline_layout import build_timeline_layout, collect_occurrences
+
+from .synthetic import ANCHOR_UTC, DEFAULT_RECURRENCE_MIX, synthetic_events, synthetic_settings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+TIMED_METRICS = ("expand_ms", "layout_ms", "html_ms")
+
+# Slowdowns smaller than this many ms are treated as noise and never fail
+NOISE_FLOOR_MS = 0.5
+DEFAULT_REPEAT = 5
+# Re-measurements of a case that looks slower; their median is what counts
+CONFIRM_PASSES = 3
+
+
+def _best_of(fn: Callable, repeat: int) -> float:
+    """
+    Best per-call time in milliseconds over `repeat` samples; each sample
+    loops `fn` for at least 0.2 s (timeit's autorange, GC disabled).
+    """
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=loops)) / loops * 1000
+
+
+def run_cases(
+    n_zones: int,
+    n_events: int,
+    recurrence_mix: Optional[Dict[str, float]] = None,
+    repeat: int = DEFAULT_REPEAT,
+    only: Optional[Collection[str]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Timings per case; `only` limits the run to those case names."""
+    events = synthetic_events(n_events, recurrence_mix)
+    now_utc = ANCHOR_UTC + timedelta(hours=12)
+    results = {}
+
+    for zoom_level, zoom in ZOOM_LEVELS.items():
+        start_utc = ANCHOR_UTC - timedelta(days=zoom["days"] // 2)
+        for show_daylight in (False, True):
+            for show_trading in (False, True):
+                name = (f"{zoom_level}"
+                        f"/{'daylight' if show_daylight else 'plain'}"
+                        f"/{'trading' if show_trading else 'notrading'}")
+                if only is not None and name not in only:
+                    continue
+                settings = synthetic_settings(n_zones, zoom_level, show_daylight, show_trading)
+                zones = settings.active_timezones
+
+                occurrences = collect_occurrences(events, start_utc, zoom["days"])
+                layout = build_timeline_layout(zones, settings, events, start_utc, now_utc,
+                                               occurrences=occurrences)
+                html = timeline_html(layout)
+
+                results[name] = {
+                    "expand_ms": _best_of(
+                        lambda: collect_occurrences(events, start_utc, zoom["days"]), repeat),
+                    "layout_ms": _best_of(
+                        lambda: build_timeline_layout(zones, settings, events, start_utc, now_utc,
+                                                      occurrences=occurrences), repeat),
+                    "html_ms": _best_of(lambda: timeline_html(layout), repeat),
+                    "html_bytes": len(html.encode("utf-8")),
+                    "occurrences": len(occurrences),
+                }
+    return results
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> Dict[str, List[str]]:
+    """Case name -> human-readable regressions (empty when green)."""
+    regressions: Dict[str, List[str]] = {}
+    for name, metrics in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        lines = []
+        for metric in TIMED_METRICS:
+            old, new = base[metric], metrics[metric]
+            if new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+                lines.append(f"{name} {metric}: {old:.2f} -> {new:.2f} ms "
+                             f"(+{(new / old - 1) * 100:.0f}%)")
+        old, new = base["html_bytes"], metrics["html_bytes"]
+        if new > old * (1 + threshold):
+            lines.append(f"{name} html_bytes: {old} -> {new}")
+        if lines:
+            regressions[name] = lines
+    return regressions
+
+
+def confirm(
+    baseline: Dict[str, Dict[str, float]],
+    results: Dict[str, Dict[str, float]],
+    regressions: Dict[str, List[str]],
+    threshold: float,
+    measure: Callable[[Collection[str]], Dict[str, Dict[str, float]]],
+    passes: int = CONFIRM_PASSES,
+) -> Dict[str, List[str]]:
+    """
+    Re-measure regressed cases `passes` times and replace each timing with
+    the median of those passes; returns the regressions that remain
+    (updates `results`).
+    """
+    if not regressions:
+        return regressions
+    names = list(regressions)
+    samples: Dict[str, Dict[str, List[float]]] = {
+        name: {metric: [] for metric in TIMED_METRICS} for name in names
+    }
+    for _ in range(passes):
+        for name, metrics in measure(names).items():
+            for metric in TIMED_METRICS:
+                samples[name][metric].append(metrics[metric])
+    for name, timings in samples.items():
+        for metric, values in timings.items():
+            results[name][metric] = statistics.median(values)
+    return compare(baseline, {name: results[name] for name in names}, threshold)
+
+
+def _print_table(results, baseline=None):
+    print(f"{'case':28s} {'expand ms':>10s} {'layout ms':>10s} {'html ms':>10s} "
+          f"{'bytes':>9s} {'occ':>6s}")
+    for name, m in results.items():
+        line = (f"{name:28s} {m['expand_ms']:10.2f} {m['layout_ms']:10.2f} "
+                f"{m['html_ms']:10.2f} {m['html_bytes']:9d} {m['occurrences']:6d}")
+        if baseline and name in baseline:
+            b = baseline[name]
+            deltas = [(m[k] / b[k] - 1) * 100 if b[k] else 0.0 for k in TIMED_METRICS]
+            line += "   " + " ".join(f"{d:+5.0f}%" for d in deltas)
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_render", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--zones", type=int, default=6, help="Number of zones (default: 6)")
+    parser.add_argument("--events", type=int, default=500, help="Number of events (default: 500)")
+    parser.add_argument("--mix", help="Recurrence mix as JSON, e.g. '{\"daily\": 1, \"once\": 3}'")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Samples per timing (best is kept, default: {DEFAULT_REPEAT})")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--update", action="store_true", help="Write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    mix = json.loads(args.mix) if args.mix else DEFAULT_RECURRENCE_MIX
+    workload = {"zones": args.zones, "events": args.events, "mix": mix}
+    results = run_cases(args.zones, args.events, mix, args.repeat)
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({
+                "workload": workload,
+                "machine": {"python": platform.python_version(), "platform": platform.platform()},
+                "cases": results,
+            }, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        _print_table(results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        _print_table(results)
+        print(f"No baseline at {args.baseline}; run with --update to create one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as fh:
+        stored = json.load(fh)
+    if stored.get("workload") != workload:
+        _print_table(results)
+        print(f"Baseline workload {stored.get('workload')} differs from {workload}; not comparing.")
+        return 0
+
+    regressions = compare(stored["cases"], results, args.threshold)
+    if regressions:
+        print(f"Re-measuring {len(regressions)} case(s) that look slower...")
+        regressions = confirm(
+            stored["cases"], results, regressions, args.threshold,
+            lambda names: run_cases(args.zones, args.events, mix, args.repeat, only=names),
+        )
+    _print_table(results, stored["cases"])
+    if regressions:
+        lines = [line for case in regressions.values() for line in case]
+        print(f"\n{len(lines)} regression(s) beyond {args.threshold:.0%}:")
+        for line in lines:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
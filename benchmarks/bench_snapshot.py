@@ -0,0 +1,101 @@
+# benchmarks/bench_snapshot.py
+"""
+Binary board snapshots (.tbb) against JSON and pickle.
+
+Builds a synthetic board and reports the size of each format, the time
+to write it and the time to load it back: for .tbb both the column view
+(`decode_board`) and full Event objects (`BoardImage.events`). Exits with
+status 1 if .tbb does not round-trip the board, or an event whose
+optional fields are None.
+
+Usage:
+    python -m benchmarks.bench_snapshot                   # 100k events
+    python -m benchmarks.bench_snapshot --events 10000
+"""
+from dataclasses import replace
+from typing import List, Optional
+import argparse
+import json
+import pickle
+import sys
+import time
+
+from timeboard_core.board import Board, board_from_dict, board_to_dict
+from timeboard_core.board_binary import decode_board, encode_board
+from timeboard_core.events import Event
+
+from .synthetic import synthetic_events, synthetic_settings
+
+
+def _timed(fn, repeat: int = 3):
+    """(best seconds, result) of `repeat` calls."""
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _round_trip_errors(board: Board, events: List[Event]) -> List[str]:
+    """Differences between `board` and its .tbb round trip (`events`)."""
+    # None string fields come back as the Event defaults
+    expected = [replace(e, recurrence=e.recurrence or "once", color=e.color or "#00FFFF",
+                        reference_tz=e.reference_tz or "UTC") for e in board.events]
+    if len(events) != len(expected):
+        return [f"{len(expected)} events written, {len(events)} read"]
+    return [f"{old.id}: {old!r} != {new!r}" for old, new in zip(expected, events) if old != new]
+
+
+def _none_fields_board() -> Board:
+    """One event with every optional field None."""
+    event = replace(synthetic_events(1)[0], recurrence=None, color=None, reference_tz=None,
+                    weekday=None, month_day=None, start_date=None, end_date=None)
+    return Board(name="none-fields", settings=synthetic_settings(1), events=[event])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_snapshot", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=100_000, help="Events on the board (default: 100000)")
+    args = parser.parse_args(argv)
+
+    board = Board(
+        name="bench",
+        settings=synthetic_settings(6, "week", False, False),
+        events=synthetic_events(args.events, span_days=365),
+    )
+    write_json, json_data = _timed(lambda: json.dumps(board_to_dict(board)).encode("utf-8"))
+    write_pickle, pickle_data = _timed(lambda: pickle.dumps(board, protocol=pickle.HIGHEST_PROTOCOL))
+    write_tbb, tbb_data = _timed(lambda: encode_board(board))
+
+    load_json, _ = _timed(lambda: board_from_dict(json.loads(json_data)))
+    load_pickle, _ = _timed(lambda: pickle.loads(pickle_data))
+    load_image, image = _timed(lambda: decode_board(tbb_data))
+    load_events, _ = _timed(image.events)
+
+    print(f"{args.events} events")
+    print(f"{'format':>14s} {'MB':>8s} {'size':>7s} {'write ms':>9s} {'load ms':>9s}")
+    rows = [
+        ("json", json_data, write_json, load_json),
+        ("pickle", pickle_data, write_pickle, load_pickle),
+        ("tbb (view)", tbb_data, write_tbb, load_image),
+        ("tbb (events)", tbb_data, write_tbb, load_image + load_events),
+    ]
+    for name, data, write_s, load_s in rows:
+        print(f"{name:>14s} {len(data) / 1e6:8.2f} {len(data) / len(json_data):6.0%} "
+              f"{write_s * 1000:9.0f} {load_s * 1000:9.0f}")
+
+    none_board = _none_fields_board()
+    errors = (_round_trip_errors(board, decode_board(tbb_data).events())
+              + _round_trip_errors(none_board, decode_board(encode_board(none_board)).events()))
+    if errors:
+        print(f"\n{len(errors)} event(s) do not round-trip:")
+        for line in errors[:10]:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic calendars for benchmarks.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+import random
+
+from timeboard_core.events import Event, create_event, EVENT_CATEGORIES, RECURRENCE_TYPES
+from timeboard_core.overlays import TRADING_SESSIONS
+from timeboard_core.settings import UserSettings, TIMEZONE_ORDER
+
+# Default recurrence mix (weights); roughly what real boards look like
+DEFAULT_RECURRENCE_MIX: Dict[str, float] = {
+    "once": 0.35,
+    "daily": 0.15,
+    "weekly": 0.25,
+    "biweekly": 0.08,
+    "monthly_date": 0.07,
+    "monthly_weekday": 0.03,
+    "monthly_last_weekday": 0.02,
+    "bimonthly": 0.05,
+}
+
+ANCHOR_UTC = datetime(2025, 1, 6, tzinfo=ZoneInfo("UTC"))  # a Monday
+
+
+def synthetic_zones(n_zones: int) -> List[str]:
+    """
+    `n_zones` catalog zones: the trading-session zones first (so overlays
+    have something to draw), then zones spread across continents.
+    """
+    step = max(1, len(TIMEZONE_ORDER) // max(1, n_zones))
+    zones = [s.zone for s in TRADING_SESSIONS]
+    for zone in TIMEZONE_ORDER[::step] + TIMEZONE_ORDER:
+        if zone not in zones:
+            zones.append(zone)
+    return zones[:n_zones]
+
+
+def synthetic_events(
+    n_events: int,
+    recurrence_mix: Optional[Dict[str, float]] = None,
+    span_days: int = 120,
+    seed: int = 42,
+    anchor_utc: datetime = ANCHOR_UTC,
+) -> List[Event]:
+    """
+    `n_events` events starting within `span_days` around `anchor_utc`,
+    with recurrences drawn from `recurrence_mix`.
+    """
+    mix = recurrence_mix or DEFAULT_RECURRENCE_MIX
+    unknown = set(mix) - set(RECURRENCE_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown recurrence types: {sorted(unknown)}")
+
+    rng = random.Random(seed)
+    recurrences = list(mix)
+    weights = [mix[r] for r in recurrences]
+    categories = list(EVENT_CATEGORIES)
+    zones = TIMEZONE_ORDER
+
+    events = []
+    for i in range(n_events):
+        tz = ZoneInfo(rng.choice(zones))
+        day = anchor_utc + timedelta(days=rng.randrange(-span_days // 2, span_days // 2))
+        start = day.astimezone(tz).replace(
+            hour=rng.randrange(24), minute=rng.choice((0, 15, 30, 45)), second=0, microsecond=0
+        )
+        recurrence = rng.choices(recurrences, weights)[0]
+        end_date = None
+        if recurrence != "once" and rng.random() < 0.3:
+            end_date = start + timedelta(days=rng.randrange(14, 365))
+        events.append(create_event(
+            title=f"Event {i}",
+            category_id=rng.choice(categories),
+            start_dt=start,
+            duration_min=rng.choice((15, 30, 60, 90, 120, 480)),
+            reference_tz=str(tz),
+            recurrence=recurrence,
+            end_date=end_date,
+        ))
+    return events
+
+
+def synthetic_settings(
+    n_zones: int,
+    zoom_level: str = "week",
+    show_daylight: bool = False,
+    show_trading_sessions: bool = False,
+) -> UserSettings:
+    zones = synthetic_zones(n_zones)
+    return UserSettings(
+        church_timezone=zones[0],
+        active_timezones=zones,
+        zoom_level=zoom_level,
+        show_daylight=show_daylight,
+        show_trading_sessions=show_trading_sessions,
+    )
@@ -1,7 +1,149 @@
 import streamlit as st
-from datetime import datetime
+from datetime import date, datetime
 from zoneinfo import ZoneInfo
 
+from timeboard_core.event_store import EventStore, DEFAULT_DB_PATH, DEFAULT_MATERIALIZE
+from timeboard_core.journal import JournalStore, DEFAULT_JOURNAL_DIR
+from timeboard_core.prefetch import WindowPrefetcher, prefetch_executor
+from timeboard_core.board_registry import BoardRegistry, BoardSnapshot
+from timeboard_core.daily_aggregate import DailyAggregate
+from timeboard_core.repository import EventRepository
+from timeboard_core.sleep_analytics import SleepTracker, sleep_span
+from timeboard_core.subscriptions import (
+    BackgroundRefresh, SubscriptionRefresher, DEFAULT_SUBSCRIPTIONS_PATH, subscriptions_path,
+)
+from timeboard_core.settings import UserSettings
+
+DEFAULT_BOARD_ID = "default"
+
+
+@st.cache_resource
+def _open_event_store(path: str, materialize: bool) -> EventStore:
+    # One store (and sqlite connection) per process, shared by all sessions
+    return EventStore(path, materialize=materialize)
+
+
+@st.cache_resource
+def _open_journal_store(directory: str) -> JournalStore:
+    return JournalStore(directory)
+
+
+def get_event_store():
+    """
+    The board's event store: the journal (events + settings) when
+    TIMEBOARD_JOURNAL_DIR is set, the SQLite store otherwise.
+    """
+    if DEFAULT_JOURNAL_DIR:
+        return _open_journal_store(DEFAULT_JOURNAL_DIR)
+
+    store = _open_event_store(DEFAULT_DB_PATH, DEFAULT_MATERIALIZE)
+    if store.materialized:
+        # Slide the occurrence horizon with the calendar (no-op within a day)
+        store.ensure_horizon()
+    return store
+
+
+@st.cache_resource
+def get_board_registry() -> BoardRegistry:
+    # Process-wide: all sessions viewing a board share its snapshots
+    registry = BoardRegistry()
+    registry.register(DEFAULT_BOARD_ID, get_event_store())
+    return registry
+
+
+def get_board_id() -> str:
+    return st.session_state.setdefault("board_id", DEFAULT_BOARD_ID)
+
+
+def get_board_snapshot() -> BoardSnapshot:
+    """Current snapshot of this session's board (a shared reference)."""
+    snapshot = get_board_registry().snapshot(get_board_id())
+    st.session_state["board_version"] = snapshot.version
+    return snapshot
+
+
+def get_event_repository() -> EventRepository:
+    """Id-addressed edits of this session's board."""
+    return EventRepository(get_board_registry(), get_board_id())
+
+
+@st.cache_resource
+def _prefetch_executor():
+    # One small pool per process, shared by every session's prefetcher
+    return prefetch_executor()
+
+
+def get_window_prefetcher() -> WindowPrefetcher:
+    """This session's prefetcher of neighbouring timeline windows."""
+    if "window_prefetcher" not in st.session_state:
+        st.session_state["window_prefetcher"] = WindowPrefetcher(_prefetch_executor())
+    return st.session_state["window_prefetcher"]
+
+
+@st.cache_resource
+def _sleep_tracker(board_id: str, tz: str) -> SleepTracker:
+    # Process-wide and kept across board versions: each sync only applies the diff
+    year = datetime.now().year
+    return SleepTracker(tz, date(year - 1, 1, 1), date(year + 1, 12, 31))
+
+
+def get_sleep_tracker(tz: str, first: date, last: date) -> SleepTracker:
+    """
+    Sleep analytics of this session's board in `tz`, synced to the current
+    version; its span grows to the board's sleep events and first..last.
+    """
+    snapshot = get_board_snapshot()
+    tracker = _sleep_tracker(snapshot.board_id, tz)
+    span = snapshot.cached(("sleep_span",), lambda: sleep_span(snapshot.events_by_id().values()))
+    if span is not None:
+        first, last = min(first, span[0]), max(last, span[1])
+    tracker.cover(first, last)
+    tracker.sync(snapshot.version, snapshot.events_by_id().values())
+    return tracker
+
+
+@st.cache_resource
+def _daily_aggregate(board_id: str, tz: str, year: int) -> DailyAggregate:
+    # Like the sleep tracker: one per (board, zone, year), synced by diff
+    return DailyAggregate(tz, date(year, 1, 1), date(year, 12, 31))
+
+
+def get_daily_aggregate(tz: str, year: int) -> DailyAggregate:
+    """Booked seconds per day of `year` in `tz`, synced to the current board version."""
+    snapshot = get_board_snapshot()
+    aggregate = _daily_aggregate(snapshot.board_id, tz, year)
+    aggregate.sync(snapshot.version, snapshot.events_by_id().values())
+    return aggregate
+
+
+@st.cache_resource
+def _subscription_worker(board_id: str) -> BackgroundRefresh:
+    # One refresh thread per board and process; it edits the board through the registry.
+    # Each board has its own file (subscriptions + fetch validators); the
+    # default board keeps the file the CLI uses
+    refresher = SubscriptionRefresher(get_board_registry(), board_id)
+    path = DEFAULT_SUBSCRIPTIONS_PATH if board_id == DEFAULT_BOARD_ID else subscriptions_path(board_id)
+    return BackgroundRefresh(refresher, path)
+
+
+def get_subscription_worker() -> BackgroundRefresh:
+    """Subscription refresh of this session's board."""
+    return _subscription_worker(get_board_id())
+
+
+def load_settings() -> UserSettings:
+    store = get_event_store()
+    if isinstance(store, JournalStore):
+        return store.settings
+    return UserSettings()
+
+
+def save_settings(settings: UserSettings):
+    """Persist settings changes (journal backend only)."""
+    store = get_event_store()
+    if isinstance(store, JournalStore):
+        store.save_settings(settings)
+
 
 def init_session_state():
     # ------------------------------------------------------------------
@@ -48,9 +190,6 @@ def init_session_state():
     # ------------------------------------------------------------------
     # 4. Sonstiges
     # ------------------------------------------------------------------
-    if "events" not in st.session_state:
-        st.session_state["events"] = []
-
     if "show_event_form" not in st.session_state:
         st.session_state["show_event_form"] = False
 
@@ -1,17 +1,16 @@
 import streamlit as st
 
-from state.session import init_session_state
+from state.session import init_session_state, load_settings, save_settings
 from timeboard_app.ui.active_time import render_active_time_slider
 from timeboard_app.ui.timeline import render_timeline
+from timeboard_app.ui.sleep_panel import render_sleep_panel
 from timeboard_app.ui.settings_panel import render_settings_panel
+from timeboard_app.ui.subscriptions_panel import render_subscriptions_panel
+from timeboard_app.ui.import_panel import render_import_panel
 from timeboard_app.ui.event_form import render_event_form, render_event_list, render_add_event_button
-from timeboard_core.settings import UserSettings
 
 if "settings" not in st.session_state:
-    st.session_state["settings"] = UserSettings()
-
-if "events" not in st.session_state:
-    st.session_state["events"] = []
+    st.session_state["settings"] = load_settings()
 
 if "show_event_form" not in st.session_state:
     st.session_state["show_event_form"] = False
@@ -40,6 +39,7 @@ col_settings, col_events = st.columns([3, 1])
 
 with col_settings:
     render_settings_panel()
+    save_settings(st.session_state["settings"])
 
 with col_events:
     render_add_event_button()
@@ -54,6 +54,8 @@ render_event_form(settings)
 # Event List
 # --------------------------------------------------
 render_event_list()
+render_subscriptions_panel(settings)
+render_import_panel(settings)
 
 # --------------------------------------------------
 # Active Time Slider
@@ -74,5 +76,6 @@ if zones:
         st.session_state["today_utc"],
         st.session_state["local_tz"],
     )
+    render_sleep_panel(zones, settings)
 else:
     st.warning("⚠️ No timezones selected. Please add at least one timezone in Settings.")
\ No newline at end of file
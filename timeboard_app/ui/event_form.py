@@ -1,12 +1,21 @@
+import html
 import streamlit as st
 from datetime import datetime, time, date, timedelta
 from zoneinfo import ZoneInfo
 from timeboard_core.events import (
     Event, create_event, 
     EVENT_CATEGORIES, RECURRENCE_TYPES, WEEKDAY_NAMES, 
-    COLOR_PRESETS, format_recurrence, DEFAULT_REMINDERS_MIN
+    COLOR_PRESETS, format_recurrence, DEFAULT_REMINDERS_MIN, shift_event
 )
+from timeboard_core.event_index import SORT_KEYS
 from timeboard_core.settings import AVAILABLE_TIMEZONES, TIMEZONE_ORDER
+from timeboard_core.relocate import RELOCATION_MODES
+from timeboard_core.repository import StaleRevisionError
+from timeboard_core.series import RuleSeries, end_date_for_count
+from state.session import get_board_snapshot, get_event_repository
+
+# Rows rendered per page of the event list (only one page of widgets per rerun)
+EVENT_LIST_PAGE_SIZE = 25
 
 
 def render_event_form(settings):
@@ -279,18 +288,35 @@ def render_event_form(settings):
         
         # Show end date option for recurring events
         end_date_value = None
+        end_count = None
         if recurrence != "once":
             col_rec1, col_rec2 = st.columns(2)
             with col_rec1:
-                has_end_date = st.checkbox("Set end date", key="event_has_end_date")
+                end_mode = st.radio(
+                    "Ends",
+                    options=["never", "date", "count"],
+                    format_func=lambda x: {"never": "Never", "date": "On date", "count": "After N times"}[x],
+                    key="event_end_mode",
+                    horizontal=True,
+                    label_visibility="collapsed"
+                )
             with col_rec2:
-                if has_end_date:
+                if end_mode == "date":
                     end_date_value = st.date_input(
                         "End date",
                         value=today + timedelta(days=30),
                         key="event_end_date",
                         label_visibility="collapsed"
                     )
+                elif end_mode == "count":
+                    end_count = st.number_input(
+                        "Occurrences",
+                        min_value=1,
+                        max_value=10000,
+                        value=10,
+                        key="event_end_count",
+                        label_visibility="collapsed"
+                    )
         
         # ----- Reminders Info -----
         st.markdown(f"**🔔 Reminders:** {DEFAULT_REMINDERS_MIN[0]} min & {DEFAULT_REMINDERS_MIN[1]} min before")
@@ -357,12 +383,11 @@ def render_event_form(settings):
                     recurrence=recurrence,
                     end_date=end_dt,
                 )
+                if end_count:
+                    event.end_date = end_date_for_count(event, int(end_count))
                 
-                # Add to events list
-                if "events" not in st.session_state:
-                    st.session_state["events"] = []
-                
-                st.session_state["events"].append(event)
+                # Persist (publishes a new board version)
+                get_event_repository().add(event)
                 st.session_state["show_event_form"] = False
                 st.session_state["selected_category"] = "work"
                 st.session_state.pop("selected_color", None)
@@ -370,40 +395,397 @@ def render_event_form(settings):
                 st.rerun()
 
 
+def _selected_event_ids() -> set:
+    return st.session_state.setdefault("selected_event_ids", set())
+
+
+def _select_key(event_id) -> str:
+    return f"select_event_{event_id}"
+
+
+def _toggle_selected(event_id):
+    if st.session_state.get(_select_key(event_id)):
+        _selected_event_ids().add(event_id)
+    else:
+        _selected_event_ids().discard(event_id)
+
+
+def _render_event_row(event):
+    col0, col1, col2, col3, col4, col5 = st.columns([0.4, 0.5, 2.5, 2, 0.5, 0.5])
+    
+    with col0:
+        # The selection set is the truth; the box's widget state follows it
+        # (it would otherwise keep its old value after select all / clear)
+        st.session_state[_select_key(event.id)] = event.id in _selected_event_ids()
+        st.checkbox(
+            "Select",
+            key=_select_key(event.id),
+            on_change=_toggle_selected,
+            args=(event.id,),
+            label_visibility="collapsed"
+        )
+    
+    with col1:
+        cat = EVENT_CATEGORIES.get(event.category_id, EVENT_CATEGORIES["custom"])
+        st.markdown(f"{cat['icon']}")
+    
+    with col2:
+        st.markdown(
+            f"<span style='color:{event.color};'>●</span> **{html.escape(event.title)}**",
+            unsafe_allow_html=True
+        )
+    
+    with col3:
+        # Show time in reference timezone
+        tz = ZoneInfo(event.reference_tz)
+        start_local = event.start_utc.astimezone(tz)
+        st.markdown(
+            f"<small>{start_local.strftime('%d.%m. %H:%M')} · {format_recurrence(event)}</small>",
+            unsafe_allow_html=True
+        )
+    
+    with col4:
+        if st.button("✏️", key=f"edit_event_{event.id}", help="Edit event"):
+            st.session_state["editing_event_id"] = event.id
+            st.rerun()
+    
+    with col5:
+        if st.button("🗑️", key=f"delete_event_{event.id}", help="Delete event"):
+            get_event_repository().delete([event.id])
+            _selected_event_ids().discard(event.id)
+            st.rerun()
+    
+    if st.session_state.get("editing_event_id") == event.id:
+        _render_edit_form(event)
+
+
+def _render_edit_form(event):
+    """Inline form editing one event in place"""
+    
+    tz = ZoneInfo(event.reference_tz)
+    start_local = event.start_utc.astimezone(tz)
+    categories = list(EVENT_CATEGORIES.keys())
+    
+    with st.form(f"edit_event_form_{event.id}"):
+        title = st.text_input("Event Title", value=event.title)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            category_id = st.selectbox(
+                "📁 Event Type",
+                options=categories,
+                index=categories.index(event.category_id) if event.category_id in categories else 0,
+                format_func=lambda x: EVENT_CATEGORIES[x]["label"],
+            )
+        with col2:
+            color = st.color_picker("🎨 Color", value=event.color)
+        
+        col3, col4, col5 = st.columns(3)
+        with col3:
+            event_date = st.date_input("📅 Date", value=start_local.date())
+        with col4:
+            start_time = st.time_input("🕐 Start Time", value=start_local.time().replace(tzinfo=None))
+        with col5:
+            duration = st.number_input("⏱️ Duration (min)", min_value=1, max_value=1440, value=event.duration_min)
+        
+        col_btn1, col_btn2 = st.columns(2)
+        with col_btn1:
+            cancel = st.form_submit_button("❌ Cancel", use_container_width=True)
+        with col_btn2:
+            save = st.form_submit_button("💾 Save", type="primary", use_container_width=True)
+    
+    _render_occurrence_pager(event)
+    
+    if cancel:
+        st.session_state.pop("editing_event_id", None)
+        st.rerun()
+    
+    if save:
+        new_start = datetime.combine(event_date, start_time).replace(tzinfo=tz)
+        moved = shift_event(event, new_start.astimezone(ZoneInfo("UTC")) - event.start_utc)
+        try:
+            get_event_repository().edit(
+                event.id,
+                expected_revision=event.revision,
+                title=title.strip() or event.title,
+                category_id=category_id,
+                color=color,
+                duration_min=int(duration),
+                start_utc=moved.start_utc,
+                start_date=moved.start_date,
+                end_date=moved.end_date,
+                weekday=moved.weekday,
+                month_day=moved.month_day,
+            )
+        except (KeyError, StaleRevisionError):
+            st.error("This event was changed or deleted in the meantime — please reopen it.")
+            return
+        st.session_state.pop("editing_event_id", None)
+        st.rerun()
+
+
+# Occurrences per page in the edit form's occurrence pager
+OCCURRENCE_PAGE_SIZE = 5
+
+
+def _render_occurrence_pager(event):
+    """Upcoming occurrences of a rule, paged by index (no day-by-day expansion)"""
+    
+    if event.recurrence == "once":
+        return
+    
+    series = RuleSeries(event)
+    total = series.total()
+    now_index = series.index_at(datetime.now(ZoneInfo("UTC")))
+    page_key = f"occurrence_page_{event.id}"
+    page = st.session_state.get(page_key, 0)
+    if total is not None:
+        # Finished series: start at its last page
+        now_index = min(now_index, max(total - OCCURRENCE_PAGE_SIZE, 0))
+    offset = max(now_index + page * OCCURRENCE_PAGE_SIZE, 0)
+    occurrences = series.page(offset, OCCURRENCE_PAGE_SIZE)
+    tz = ZoneInfo(event.reference_tz)
+    
+    st.markdown("**📆 Occurrences**")
+    if total is not None:
+        st.caption(f"{total} occurrences in total")
+    for k, occ in enumerate(occurrences, start=offset + 1):
+        st.markdown(
+            f"<small>#{k} · {occ.start_utc.astimezone(tz).strftime('%a %d.%m.%Y %H:%M')}</small>",
+            unsafe_allow_html=True
+        )
+    
+    col_o1, col_o2 = st.columns(2)
+    with col_o1:
+        if st.button("◀ Earlier", key=f"occ_prev_{event.id}", disabled=offset == 0, use_container_width=True):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with col_o2:
+        if st.button("Later ▶", key=f"occ_next_{event.id}", disabled=len(occurrences) < OCCURRENCE_PAGE_SIZE,
+                     use_container_width=True):
+            st.session_state[page_key] = page + 1
+            st.rerun()
+
+
+def _render_bulk_actions(index, query, category_id, recurrence):
+    """Selection toolbar: one action applies to every selected event in one pass"""
+    
+    repo = get_event_repository()
+    selected = _selected_event_ids()
+    # Forget ids deleted in the meantime (possibly by another session)
+    selected.intersection_update(repo.snapshot.events_by_id())
+    
+    col_s1, col_s2, col_s3 = st.columns([2, 2, 3])
+    with col_s1:
+        matching = index.matching_ids(query, category_id=category_id, recurrence=recurrence)
+        if st.button(f"☑️ Select all {len(matching)} matching", key="select_all_matching", use_container_width=True):
+            selected.update(matching)
+            st.rerun()
+    with col_s2:
+        if st.button("✖️ Clear selection", key="clear_selection", disabled=not selected, use_container_width=True):
+            selected.clear()
+            st.rerun()
+    with col_s3:
+        st.caption(f"{len(selected)} selected")
+    
+    if not selected:
+        return
+    
+    col_a1, col_a2, col_a3, col_a4 = st.columns(4)
+    
+    with col_a1:
+        if st.button(f"🗑️ Delete {len(selected)}", key="bulk_delete", use_container_width=True):
+            repo.delete(selected)
+            selected.clear()
+            st.rerun()
+    
+    with col_a2:
+        color_id = st.selectbox(
+            "Color",
+            options=list(COLOR_PRESETS.keys()),
+            format_func=lambda x: COLOR_PRESETS[x]["label"],
+            key="bulk_color"
+        )
+        if st.button("🎨 Recolor", key="bulk_recolor", use_container_width=True):
+            repo.recolor(selected, COLOR_PRESETS[color_id]["color"])
+            st.rerun()
+    
+    with col_a3:
+        new_category = st.selectbox(
+            "Category",
+            options=list(EVENT_CATEGORIES.keys()),
+            format_func=lambda x: EVENT_CATEGORIES[x]["label"],
+            key="bulk_category"
+        )
+        if st.button("📁 Recategorize", key="bulk_recategorize", use_container_width=True):
+            repo.recategorize(selected, new_category)
+            st.rerun()
+    
+    with col_a4:
+        shift_min = st.number_input(
+            "Shift (min)", min_value=-10080, max_value=10080, value=60,
+            step=getattr(st.session_state.get("settings"), "minute_step", 5),
+            key="bulk_shift_min"
+        )
+        if st.button("⏩ Shift", key="bulk_shift", use_container_width=True):
+            repo.shift(selected, int(shift_min))
+            st.rerun()
+    
+    _render_relocation(repo, selected)
+
+
+# Diff rows shown in the relocation preview
+RELOCATION_PREVIEW_ROWS = 200
+
+
+def _render_relocation(repo, selected):
+    """Re-anchor the selection into another reference timezone (preview, then apply)"""
+    
+    st.markdown("**🧳 Relocate schedule**")
+    col_r1, col_r2 = st.columns(2)
+    with col_r1:
+        settings = st.session_state.get("settings")
+        home_tz = getattr(settings, "church_timezone", TIMEZONE_ORDER[0])
+        target_tz = st.selectbox(
+            "New reference timezone",
+            options=TIMEZONE_ORDER,
+            index=TIMEZONE_ORDER.index(home_tz) if home_tz in TIMEZONE_ORDER else 0,
+            format_func=lambda x: AVAILABLE_TIMEZONES.get(x, x),
+            key="relocate_tz"
+        )
+    with col_r2:
+        mode = st.radio(
+            "Mode",
+            options=list(RELOCATION_MODES.keys()),
+            format_func=lambda x: RELOCATION_MODES[x],
+            key="relocate_mode",
+            horizontal=True
+        )
+    
+    changes = repo.plan_relocation(selected, target_tz, mode)
+    if not changes:
+        st.caption("All selected events already use this timezone")
+        return
+    
+    with st.expander(f"Preview: {len(changes)} event(s) change", expanded=False):
+        st.dataframe(
+            [
+                {
+                    "Event": c.title,
+                    "From": f"{c.start_before.strftime('%a %d.%m. %H:%M')} ({c.from_tz})",
+                    "To": f"{c.start_after.strftime('%a %d.%m. %H:%M')} ({c.to_tz})",
+                    "Shift (min)": c.shift_min,
+                    "DST gap": "⚠️" if c.adjusted else "",
+                }
+                for c in changes[:RELOCATION_PREVIEW_ROWS]
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        if len(changes) > RELOCATION_PREVIEW_ROWS:
+            st.caption(f"Showing the first {RELOCATION_PREVIEW_ROWS} of {len(changes)} changes")
+    
+    if st.button(f"🧳 Relocate {len(changes)} event(s)", key="bulk_relocate", use_container_width=True):
+        repo.relocate(selected, target_tz, mode)
+        st.rerun()
+
+
 def render_event_list():
-    """Render the list of existing events"""
+    """Render a searchable, paged list of existing events"""
     
-    events = st.session_state.get("events", [])
+    board = get_board_snapshot()
+    n_events = board.count()
     
-    if not events:
+    if not n_events:
         return
     
-    with st.expander(f"📋 Events ({len(events)})", expanded=False):
-        for i, event in enumerate(events):
-            col1, col2, col3, col4 = st.columns([0.5, 2.5, 2, 0.5])
-            
-            with col1:
-                cat = EVENT_CATEGORIES.get(event.category_id, EVENT_CATEGORIES["custom"])
-                st.markdown(f"{cat['icon']}")
-            
-            with col2:
-                st.markdown(
-                    f"<span style='color:{event.color};'>●</span> **{event.title}**",
-                    unsafe_allow_html=True
-                )
-            
-            with col3:
-                # Show time in reference timezone
-                tz = ZoneInfo(event.reference_tz)
-                start_local = event.start_utc.astimezone(tz)
-                st.markdown(
-                    f"<small>{start_local.strftime('%d.%m. %H:%M')} · {format_recurrence(event)}</small>",
-                    unsafe_allow_html=True
+    # A toggle rather than an expander: collapsed expanders still run their
+    # body, and the search index below is built per board version
+    if not st.toggle(f"📋 Events ({n_events})", key="show_event_list"):
+        return
+    
+    with st.container(border=True):
+        # ----- Search / Filter / Sort -----
+        query = st.text_input(
+            "Search",
+            placeholder="Search titles...",
+            key="event_search",
+            label_visibility="collapsed"
+        )
+        
+        col_f1, col_f2, col_f3, col_f4 = st.columns([2, 2, 2, 1])
+        with col_f1:
+            category_id = st.selectbox(
+                "Category",
+                options=[""] + list(EVENT_CATEGORIES.keys()),
+                format_func=lambda x: EVENT_CATEGORIES[x]["label"] if x else "All categories",
+                key="event_filter_category"
+            )
+        with col_f2:
+            recurrence = st.selectbox(
+                "Repeat",
+                options=[""] + list(RECURRENCE_TYPES.keys()),
+                format_func=lambda x: RECURRENCE_TYPES[x] if x else "Any recurrence",
+                key="event_filter_recurrence"
+            )
+        with col_f3:
+            sort = st.selectbox(
+                "Sort by",
+                options=list(SORT_KEYS.keys()),
+                format_func=lambda x: SORT_KEYS[x],
+                key="event_sort"
+            )
+        with col_f4:
+            descending = st.checkbox("↓", key="event_sort_desc", help="Descending")
+        
+        # Back to the first page whenever the search changes
+        search_key = (query, category_id, recurrence, sort, descending)
+        if st.session_state.get("event_list_search") != search_key:
+            st.session_state["event_list_search"] = search_key
+            st.session_state["event_list_page"] = 0
+        page = st.session_state.get("event_list_page", 0)
+        
+        index = board.event_index()
+        result = index.search(
+            query,
+            category_id=category_id or None,
+            recurrence=recurrence or None,
+            sort=sort,
+            descending=descending,
+            offset=page * EVENT_LIST_PAGE_SIZE,
+            limit=EVENT_LIST_PAGE_SIZE,
+        )
+        n_pages = max(1, -(-result.total // EVENT_LIST_PAGE_SIZE))
+        if page >= n_pages:
+            st.session_state["event_list_page"] = n_pages - 1
+            st.rerun()
+        
+        # ----- Selection + bulk actions -----
+        _render_bulk_actions(index, query, category_id or None, recurrence or None)
+        
+        # ----- Current page only -----
+        for event in result.events:
+            _render_event_row(event)
+        
+        if not result.total:
+            st.caption("No matching events")
+        
+        # ----- Pager -----
+        if n_pages > 1:
+            col_p1, col_p2, col_p3 = st.columns([1, 3, 1])
+            with col_p1:
+                if st.button("◀", key="event_page_prev", disabled=page == 0, use_container_width=True):
+                    st.session_state["event_list_page"] = page - 1
+                    st.rerun()
+            with col_p2:
+                first = page * EVENT_LIST_PAGE_SIZE + 1
+                st.caption(
+                    f"{first}–{first + len(result.events) - 1} of {result.total} "
+                    f"· page {page + 1}/{n_pages}"
                 )
-            
-            with col4:
-                if st.button("🗑️", key=f"delete_event_{i}", help="Delete event"):
-                    st.session_state["events"].pop(i)
+            with col_p3:
+                if st.button("▶", key="event_page_next", disabled=page >= n_pages - 1, use_container_width=True):
+                    st.session_state["event_list_page"] = page + 1
                     st.rerun()
         
         # Legend
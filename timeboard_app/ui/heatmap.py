@@ -0,0 +1,131 @@
+import altair as alt
+import streamlit as st
+from datetime import date, timedelta
+
+from state.session import get_daily_aggregate
+from timeboard_core.events import EVENT_CATEGORIES
+
+# Session key set by clicking a day; read by the timeline to jump there
+# (in session state, unlike a link, a jump keeps the session)
+JUMP_KEY = "heatmap_jump_day"
+SELECTION_NAME = "day"
+
+CELL_SIZE = 11
+CELL_GAP = 2
+HEATMAP_LEVELS = ("#EBEDF0", "#C6E48B", "#7BC96F", "#239A3B", "#196127")
+ALL_CATEGORIES = "__all__"
+
+
+def _level(hours: float, top: float) -> int:
+    """0 for an empty day, otherwise 1..4 by share of the year's busiest day."""
+    if hours <= 0 or top <= 0:
+        return 0
+    return min(len(HEATMAP_LEVELS) - 1, 1 + int(hours / top * (len(HEATMAP_LEVELS) - 1)))
+
+
+def heatmap_chart(daily_hours: list, color: str = None) -> alt.LayerChart:
+    """
+    GitHub-style grid of (date, hours), non-empty: one column per week
+    (Monday on top), each cell with its date and hours as tooltip.
+    Clicking a cell selects its date (selection SELECTION_NAME).
+    """
+    top = max(hours for _, hours in daily_hours)
+    first = daily_hours[0][0]
+    grid_start = first - timedelta(days=first.weekday())
+
+    cells = []
+    for d, hours in daily_hours:
+        level = _level(hours, top)
+        cells.append({
+            "date": d.isoformat(),
+            "label": f"{d:%a %d %b %Y}",
+            "week": (d - grid_start).days // 7,
+            "weekday": d.weekday(),
+            "hours": round(hours, 1),
+            "level": level,
+            "month": f"{d:%b}" if d.day == 1 else "",
+        })
+    data = alt.Data(values=cells)
+
+    day = alt.selection_point(name=SELECTION_NAME, fields=["date"], on="click", clear="dblclick")
+    band = alt.Scale(paddingInner=CELL_GAP / (CELL_SIZE + CELL_GAP), paddingOuter=0)
+    x = alt.X("week:O", axis=None, scale=band)
+    encoding = {
+        "x": x,
+        "y": alt.Y("weekday:O", axis=None, scale=band),
+        "stroke": alt.condition(day, alt.value("#333"), alt.value(None)),
+        "tooltip": [alt.Tooltip("label:N", title="Day"), alt.Tooltip("hours:Q", title="Hours")],
+    }
+    if color is None:
+        encoding["color"] = alt.Color(
+            "level:O", legend=None,
+            scale=alt.Scale(domain=list(range(len(HEATMAP_LEVELS))), range=list(HEATMAP_LEVELS)),
+        )
+    else:
+        # One hue for the category, deeper for busier days
+        encoding["color"] = alt.condition("datum.level == 0", alt.value(HEATMAP_LEVELS[0]), alt.value(color))
+        encoding["fillOpacity"] = alt.condition(
+            "datum.level == 0", alt.value(1),
+            alt.FillOpacity("level:Q", legend=None, scale=alt.Scale(domain=[1, 4], range=[0.44, 1])),
+        )
+    grid = alt.Chart(data).mark_rect(cornerRadius=2).encode(**encoding).add_params(day)
+    months = alt.Chart(data).transform_filter("datum.month != ''").mark_text(
+        align="left", baseline="bottom", fontSize=9, color="#666",
+    ).encode(x=x, y=alt.value(-2), text="month:N")
+
+    step = CELL_SIZE + CELL_GAP
+    weeks = (daily_hours[-1][0] - grid_start).days // 7 + 1
+    return alt.layer(grid, months).properties(
+        width=weeks * step, height=7 * step,
+    ).configure_view(stroke=None)
+
+
+def _open_selected_day(chart_key: str):
+    """on_select callback: the clicked day becomes the timeline's jump target."""
+    points = st.session_state[chart_key].selection.get(SELECTION_NAME, [])
+    if points:
+        st.session_state[JUMP_KEY] = date.fromisoformat(points[0]["date"])
+
+
+def render_year_heatmap(zones: list):
+    """Booked hours per day of a year (all or one category); clicking a day opens it in the timeline."""
+    with st.expander("🗓 Year at a glance"):
+        today = st.session_state["today_local"].date()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            year = st.number_input("Year", min_value=1970, max_value=2199, value=today.year, key="heatmap_year")
+        with col2:
+            tz = st.selectbox("Days in", zones, key="heatmap_tz")
+
+        aggregate = get_daily_aggregate(tz, int(year))
+        with col3:
+            category_id = st.selectbox(
+                "Category",
+                options=[ALL_CATEGORIES] + aggregate.categories(),
+                format_func=lambda c: "All" if c == ALL_CATEGORIES else EVENT_CATEGORIES.get(
+                    c, EVENT_CATEGORIES["custom"])["label"],
+                key="heatmap_category",
+            )
+
+        category = None if category_id == ALL_CATEGORIES else category_id
+        daily_hours = aggregate.daily_hours(category)
+        color = EVENT_CATEGORIES.get(category, {}).get("color") if category else None
+        if daily_hours:
+            # The selection is handled in the callback, before the rerun
+            # draws the timeline, so the jump applies on that same rerun
+            chart_key = f"heatmap_chart_{int(year)}"
+            st.altair_chart(
+                heatmap_chart(daily_hours, color),
+                on_select=lambda: _open_selected_day(chart_key),
+                selection_mode=SELECTION_NAME,
+                key=chart_key,
+            )
+
+        total = sum(hours for _, hours in daily_hours)
+        busy = sum(1 for _, hours in daily_hours if hours > 0)
+        st.caption(f"{total:.0f} h on {busy} days in {int(year)} ({tz}) · click a day to open it in the timeline")
+
+
+def pop_jump_day():
+    """The day requested from the heatmap, if any (consumed once)."""
+    return st.session_state.pop(JUMP_KEY, None)
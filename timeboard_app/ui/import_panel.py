@@ -0,0 +1,60 @@
+import io
+import streamlit as st
+
+from state.session import get_event_repository
+from timeboard_core.csv_import import COLUMNS, import_csv
+from timeboard_core.settings import AVAILABLE_TIMEZONES, TIMEZONE_ORDER
+
+# Rejected rows listed under the summary
+SHOWN_ERRORS = 50
+
+
+def render_import_panel(settings):
+    """Bulk CSV import with a progress bar and per-row errors."""
+    with st.expander("📥 Import CSV"):
+        st.caption("Columns: " + ", ".join(COLUMNS) + " (title, reference_tz, recurrence, end_date and color are optional)")
+        uploaded = st.file_uploader("Schedule CSV", type=["csv"], key="import_csv_file")
+        default_tz_idx = TIMEZONE_ORDER.index(settings.church_timezone) if settings.church_timezone in TIMEZONE_ORDER else 0
+        default_tz = st.selectbox(
+            "Zone for rows without reference_tz",
+            options=TIMEZONE_ORDER,
+            index=default_tz_idx,
+            format_func=lambda x: AVAILABLE_TIMEZONES.get(x, x),
+            key="import_default_tz",
+        )
+        dry_run = st.checkbox("Validate only", key="import_dry_run")
+
+        if uploaded is None or not st.button("📥 Import", type="primary", key="import_csv_run"):
+            return
+
+        data = uploaded.getvalue()
+        total_rows = max(data.count(b"\n"), 1)
+        bar = st.progress(0.0, text="Importing…")
+
+        def progress(rows: int, imported: int, errors: int):
+            bar.progress(min(rows / total_rows, 1.0), text=f"{rows} rows · {imported} ok · {errors} error(s)")
+
+        lines = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+        try:
+            result = import_csv(
+                lines,
+                None if dry_run else get_event_repository(),
+                default_tz,
+                progress=progress,
+            )
+        except (ValueError, UnicodeDecodeError) as exc:
+            bar.empty()
+            st.error(f"Cannot import this file: {exc}")
+            return
+        bar.progress(1.0, text="Done")
+
+        verb = "validated" if dry_run else "imported"
+        if result.n_errors:
+            st.warning(f"{result.imported} of {result.rows} rows {verb}, {result.n_errors} rejected")
+            st.dataframe(
+                [{"line": e.line, "problem": e.message} for e in result.errors[:SHOWN_ERRORS]],
+                hide_index=True,
+                use_container_width=True,
+            )
+        else:
+            st.success(f"✅ {result.imported} rows {verb}")
@@ -6,7 +6,9 @@ from timeboard_core.settings import (
     DEFAULT_TIMEZONES,
     ZOOM_LEVELS,
     MINUTE_STEPS,
+    DEFAULT_TRADING_EXCHANGES,
 )
+from timeboard_core.trading_calendar import exchanges
 
 
 def render_settings_panel():
@@ -127,15 +129,29 @@ def render_settings_panel():
         
         # Trading sessions toggle
         show_sessions = st.checkbox(
-            "📈 Show trading sessions (London, New York, Tokyo)",
+            "📈 Show trading sessions",
             value=settings.show_trading_sessions,
             key="show_trading_sessions_checkbox",
-            help="Display trading session overlays for major financial markets"
+            help="Display trading session overlays (with holidays and half days) for major exchanges"
         )
         
         if show_sessions != settings.show_trading_sessions:
             settings.show_trading_sessions = show_sessions
         
+        if settings.show_trading_sessions:
+            known = exchanges()
+            selected_exchanges = st.multiselect(
+                "Exchanges",
+                options=list(known),
+                default=[e for e in settings.trading_exchanges if e in known],
+                format_func=lambda x: known[x].name,
+                key="trading_exchanges_multiselect",
+                help="Sessions are drawn on the lane of the exchange's timezone; "
+                     "London/New York style overlaps are highlighted"
+            )
+            if selected_exchanges != settings.trading_exchanges:
+                settings.trading_exchanges = selected_exchanges
+        
         st.markdown("---")
         
         # -----------------------------------------------------
@@ -144,6 +160,7 @@ def render_settings_panel():
         if st.button("🔄 Reset to Defaults", key="reset_settings"):
             settings.active_timezones = DEFAULT_TIMEZONES.copy()
             settings.show_trading_sessions = False
+            settings.trading_exchanges = DEFAULT_TRADING_EXCHANGES.copy()
             settings.show_daylight = False
             settings.zoom_level = "week"
             settings.minute_step = 5
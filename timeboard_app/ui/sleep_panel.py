@@ -0,0 +1,71 @@
+import streamlit as st
+from datetime import timedelta
+
+from state.session import get_sleep_tracker
+from timeboard_core.events import EVENT_CATEGORIES
+from timeboard_core.sleep_analytics import DEFAULT_TARGET_HOURS, ROLLING_WINDOWS, SLEEP_CATEGORY
+
+SPARKLINE_DAYS = 30
+SPARKLINE_WIDTH = 600
+SPARKLINE_HEIGHT = 60
+
+
+def _sparkline_svg(values: list, target: float) -> str:
+    """Per-day hours as a small SVG line with the target as a dashed rule."""
+    top = max(max(values, default=0), target, 1) * 1.1
+    step = SPARKLINE_WIDTH / max(len(values) - 1, 1)
+
+    def y(hours: float) -> float:
+        return SPARKLINE_HEIGHT - hours / top * SPARKLINE_HEIGHT
+
+    points = " ".join(f"{i * step:.1f},{y(v):.1f}" for i, v in enumerate(values))
+    dots = "".join(
+        f"<circle cx='{i * step:.1f}' cy='{y(v):.1f}' r='2.5' fill='#E74C3C'/>"
+        for i, v in enumerate(values) if 0 < v < target * 0.75
+    )
+    return (
+        f"<svg width='100%' viewBox='0 0 {SPARKLINE_WIDTH} {SPARKLINE_HEIGHT}' preserveAspectRatio='none'>"
+        f"<line x1='0' y1='{y(target):.1f}' x2='{SPARKLINE_WIDTH}' y2='{y(target):.1f}' "
+        f"stroke='#888' stroke-dasharray='4 4' stroke-width='1'/>"
+        f"<polyline points='{points}' fill='none' stroke='#34495E' stroke-width='2'/>"
+        f"{dots}</svg>"
+    )
+
+
+def render_sleep_panel(zones: list, settings):
+    """Rolling sleep totals, sleep debt and short nights without a nap."""
+    with st.expander("😴 Sleep"):
+        tz = st.selectbox("Days in", zones, key="sleep_tz")
+        today = st.session_state["today_local"].date()
+        start = today - timedelta(days=SPARKLINE_DAYS - 1)
+        tracker = get_sleep_tracker(tz, start - timedelta(days=max(ROLLING_WINDOWS)), today + timedelta(days=8))
+
+        budgets = getattr(settings, "category_budgets", {}) or {}
+        target = budgets.get(SLEEP_CATEGORY, DEFAULT_TARGET_HOURS * 7) / 7
+
+        day = tracker.day(today)
+        if day is None:
+            st.caption("No sleep data for today.")
+            return
+
+        cols = st.columns(len(ROLLING_WINDOWS))
+        for col, window in zip(cols, ROLLING_WINDOWS):
+            with col:
+                debt = day.debt_hours(window, target)
+                st.metric(
+                    f"{window}-day sleep",
+                    f"{day.rolling_hours[window]:.1f} h",
+                    delta=f"{-debt:+.1f} h vs. target",
+                )
+
+        series = tracker.series(start, today + timedelta(days=1))
+        st.markdown(_sparkline_svg([d.total_hours for d in series], target), unsafe_allow_html=True)
+        st.caption(f"Hours slept per day, last {SPARKLINE_DAYS} days (dashed: {target:.1f} h target)")
+
+        short = tracker.short_nights(start, today + timedelta(days=8))
+        if short:
+            st.warning(
+                "⚠️ Short night without a nap on "
+                + ", ".join(d.strftime("%a %d.%m.") for d in short)
+            )
+            st.caption(EVENT_CATEGORIES[SLEEP_CATEGORY].get("warning_advice", ""))
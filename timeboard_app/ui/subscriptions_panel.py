@@ -0,0 +1,68 @@
+import streamlit as st
+
+from state.session import get_subscription_worker
+from timeboard_core.events import EVENT_CATEGORIES
+from timeboard_core.settings import AVAILABLE_TIMEZONES, TIMEZONE_ORDER
+from timeboard_core.subscriptions import new_subscription
+
+
+def _remove(worker, subscription):
+    def drop(subscriptions):
+        subscriptions[:] = [s for s in subscriptions if s.id != subscription.id]
+
+    worker.edit(drop)
+    worker.refresher.unsubscribe(subscription)
+
+
+def render_subscriptions_panel(settings):
+    """External .ics calendars; refreshes run on the worker thread, never here."""
+    worker = get_subscription_worker()
+
+    with st.expander("📡 Calendar subscriptions"):
+        subscriptions = worker.subscriptions()
+        if worker.running:
+            st.caption("🔄 Refreshing…")
+
+        for subscription in subscriptions:
+            col_source, col_status, col_remove = st.columns([5, 3, 1])
+            with col_source:
+                label = EVENT_CATEGORIES.get(subscription.category_id, {}).get("label", subscription.category_id)
+                st.markdown(f"**{subscription.source}**  \n{label} · {subscription.default_tz}")
+            with col_status:
+                if subscription.last_error:
+                    st.error(subscription.last_error)
+                else:
+                    st.caption(f"Last refresh: {subscription.last_refresh or 'pending'}")
+            with col_remove:
+                if st.button("🗑️", key=f"remove_subscription_{subscription.id}", help="Unsubscribe"):
+                    _remove(worker, subscription)
+                    st.rerun()
+
+        if subscriptions and st.button("🔄 Refresh now", key="refresh_subscriptions"):
+            worker.trigger()
+            st.caption("Refresh started in the background.")
+
+        with st.form("add_subscription_form", clear_on_submit=True):
+            source = st.text_input("Calendar URL or file", placeholder="https://example.com/team.ics")
+            col_cat, col_tz = st.columns(2)
+            with col_cat:
+                category_id = st.selectbox(
+                    "Category",
+                    options=list(EVENT_CATEGORIES.keys()),
+                    index=list(EVENT_CATEGORIES.keys()).index("custom"),
+                    format_func=lambda c: EVENT_CATEGORIES[c]["label"],
+                )
+            with col_tz:
+                default_tz_idx = TIMEZONE_ORDER.index(settings.church_timezone) if settings.church_timezone in TIMEZONE_ORDER else 0
+                default_tz = st.selectbox(
+                    "Zone for floating times",
+                    options=TIMEZONE_ORDER,
+                    index=default_tz_idx,
+                    format_func=lambda x: AVAILABLE_TIMEZONES.get(x, x),
+                    help="Used for all-day events and times without a TZID",
+                )
+            if st.form_submit_button("➕ Subscribe") and source.strip():
+                subscription = new_subscription(source.strip(), category_id=category_id, default_tz=default_tz)
+                worker.edit(lambda subs: subs.append(subscription))
+                worker.trigger()
+                st.rerun()
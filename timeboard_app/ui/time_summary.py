@@ -0,0 +1,141 @@
+import streamlit as st
+from datetime import date, datetime, timedelta
+
+from state.session import get_board_snapshot
+from timeboard_core.events import EVENT_CATEGORIES
+from timeboard_core.time_accounting import REPORT_PERIODS
+from timeboard_core.trading_calendar import exchange_ids_or_default, exchanges
+
+SUMMARY_RANGES = {
+    "window": "Visible days",
+    "week": "This week",
+    "month": "This month",
+    "30d": "Last 30 days",
+}
+
+
+def _category_label(category_id: str) -> str:
+    return EVENT_CATEGORIES.get(category_id, EVENT_CATEGORIES["custom"])["label"]
+
+
+def _summary_range(key: str, window_start: date, visible_days: int, today: date):
+    if key == "window":
+        return window_start, window_start + timedelta(days=visible_days)
+    if key == "week":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=7)
+    if key == "month":
+        first = today.replace(day=1)
+        return first, (first + timedelta(days=32)).replace(day=1)
+    return today - timedelta(days=29), today + timedelta(days=1)
+
+
+def render_time_summary(zones: list, settings, timeline_start_utc: datetime, visible_days: int):
+    """
+    Hours per category vs. weekly budgets, shown beside the timeline.
+    Totals come from the board version's prefix-sum ledger (built once).
+    """
+    st.markdown("**⏱ Time summary**")
+
+    tz = st.selectbox("Days in", zones, key="time_summary_tz")
+    range_key = st.selectbox(
+        "Range",
+        options=list(SUMMARY_RANGES),
+        format_func=lambda k: SUMMARY_RANGES[k],
+        key="time_summary_range",
+    )
+    window_start = timeline_start_utc.date()
+    today = st.session_state["today_local"].date()
+    start, end = _summary_range(range_key, window_start, visible_days, today)
+
+    ledger = get_board_snapshot().category_ledger(tz, start, end)
+    budgets = getattr(settings, "category_budgets", None)
+    lines = ledger.budget(start, end, budgets)
+    if not lines:
+        st.caption("No events in this range.")
+        return
+
+    st.dataframe(
+        [
+            {
+                "Category": _category_label(line.category_id),
+                "Planned h": round(line.planned_hours, 1),
+                "Target h": round(line.target_hours, 1) if line.target_hours is not None else None,
+                "Δ h": round(line.delta_hours, 1) if line.delta_hours is not None else None,
+            }
+            for line in lines
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(f"{start:%d %b} – {end - timedelta(days=1):%d %b %Y} ({tz})")
+
+
+def render_time_report(zones: list, timeline_start_utc: datetime):
+    """Per-day / week / month hours per category over a chosen date range."""
+    with st.expander("📊 Time report"):
+        col1, col2, col3, col4 = st.columns(4)
+        window_start = timeline_start_utc.date()
+        with col1:
+            first = st.date_input("From", value=window_start - timedelta(days=28), key="time_report_from")
+        with col2:
+            last = st.date_input("To", value=window_start + timedelta(days=27), key="time_report_to")
+        with col3:
+            period = st.selectbox("Per", REPORT_PERIODS, index=1, key="time_report_period")
+        with col4:
+            tz = st.selectbox("Days in", zones, key="time_report_tz")
+
+        if last < first:
+            st.warning("'To' is before 'From'.")
+            return
+
+        end = last + timedelta(days=1)
+        ledger = get_board_snapshot().category_ledger(tz, first, end)
+        rows = ledger.report(first, end, period)
+        categories = ledger.categories
+        st.dataframe(
+            [
+                {"From": bucket.isoformat(), **{_category_label(c): round(hours.get(c, 0.0), 1) for c in categories}}
+                for bucket, hours in rows
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+def render_session_overlap_report(zones: list, settings):
+    """Hours per category inside each shown exchange's trading sessions, per week or month of a year."""
+    exchange_ids = exchange_ids_or_default(getattr(settings, "trading_exchanges", None))
+    if not getattr(settings, "show_trading_sessions", False) or not exchange_ids:
+        return
+
+    with st.expander("📈 Trading-session overlap"):
+        col1, col2, col3 = st.columns(3)
+        today = st.session_state["today_local"].date()
+        with col1:
+            year = st.number_input("Year", min_value=1970, max_value=2199, value=today.year, key="overlap_year")
+        with col2:
+            period = st.selectbox("Per", ["week", "month"], index=1, key="overlap_period")
+        with col3:
+            tz = st.selectbox("Days in", zones, key="overlap_tz")
+
+        report = get_board_snapshot().session_overlap(
+            tuple(exchange_ids), tz, date(int(year), 1, 1), date(int(year) + 1, 1, 1), period
+        )
+        known = exchanges()
+        rows = []
+        for b, bucket in enumerate(report.buckets):
+            for category_id in report.categories:
+                hours = report.category_hours[category_id][b]
+                if not hours:
+                    continue
+                row = {"From": bucket.isoformat(), "Category": _category_label(category_id), "Hours": round(hours, 1)}
+                for exchange_id in report.exchange_ids:
+                    overlap = report.overlap_hours[(category_id, exchange_id)][b]
+                    row[known[exchange_id].name] = f"{overlap:.1f} h ({report.share(category_id, exchange_id, b):.0%})"
+                rows.append(row)
+
+        if not rows:
+            st.caption("No events in this year.")
+            return
+        st.dataframe(rows, hide_index=True, use_container_width=True)
@@ -0,0 +1,393 @@
+# timeboard_core/api.py
+"""
+Local JSON HTTP API over timeboard_core (no Streamlit).
+
+Usage:
+    python -m timeboard_core.api                       # timeboard.db on 127.0.0.1:8765
+    python -m timeboard_core.api --journal boards/team --port 9000
+    python -m timeboard_core.api --board board.json
+
+Endpoints (GET, query parameters; times are ISO 8601, default UTC):
+    /health
+    /occurrences?start=..&end=..[&zones=Europe/Berlin,Asia/Tokyo]
+    /active?at=..[&zones=..]
+    /convert?time=..&zones=..[&from=America/New_York]
+    /free?start=..&end=..[&min_minutes=30]
+    POST /batch   {"requests": [{"path": "/active", "params": {...}}, ...]}
+
+HTTP/1.1 keep-alive is the default. List responses and batches are
+streamed with chunked transfer encoding; an error after the headers went
+out is logged to stderr and the connection is aborted without the final
+chunk, so the client sees a truncated response instead of a 500 body
+spliced into the stream. Expanded windows come from a
+`BoardRegistry` snapshot, so repeated queries on the same days are
+served from memory. Ranges span at most MAX_RANGE_DAYS, and handlers
+(expansion is CPU-bound) run in worker threads so one request does not
+stall the event loop.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .board import load_board
+from .board_registry import BoardRegistry
+from .event_store import DEFAULT_DB_PATH, EventStore
+from .events import Event
+from .queries import active_at, busy_intervals, convert_time, free_slots, occurrences_between
+
+UTC = ZoneInfo("UTC")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BOARD_ID = "api"
+
+KEEP_ALIVE_TIMEOUT_S = 15
+STORE_POLL_INTERVAL_S = 1.0     # how often to look for writes by other processes
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_REQUESTS = 1000
+STREAM_CHUNK_ITEMS = 256
+# Longest start..end span of /occurrences and /free
+MAX_RANGE_DAYS = 92
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class _StreamAborted(Exception):
+    """A streamed response failed after its headers were sent."""
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Parameter parsing -----------------------------------------
+
+def _param(params: Dict[str, str], name: str) -> str:
+    if name not in params:
+        raise ApiError(400, f"Missing parameter: {name}")
+    return params[name]
+
+
+def _parse_time(value: str, default_tz: ZoneInfo = UTC) -> datetime:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ApiError(400, f"Invalid time: {value}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=default_tz)
+    return dt.astimezone(UTC)
+
+
+def _zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ApiError(400, f"Unknown timezone: {name}")
+
+
+def _zones(params: Dict[str, str]) -> List[str]:
+    zones = [z for z in params.get("zones", "").split(",") if z]
+    for zone in zones:
+        _zone(zone)
+    return zones
+
+
+def _range(params: Dict[str, str]) -> Tuple[datetime, datetime]:
+    start = _parse_time(_param(params, "start"))
+    end = _parse_time(_param(params, "end"))
+    if end <= start:
+        raise ApiError(400, "end must be after start")
+    if end - start > timedelta(days=MAX_RANGE_DAYS):
+        raise ApiError(400, f"Range must not exceed {MAX_RANGE_DAYS} days")
+    return start, end
+
+
+def _occurrence_json(occ: Event, zones: List[str]) -> Dict:
+    data = {
+        "id": occ.id,
+        "title": occ.title,
+        "category_id": occ.category_id,
+        "recurrence": occ.recurrence,
+        "color": occ.color,
+        "start": occ.start_utc.isoformat(),
+        "end": occ.end_utc.isoformat(),
+    }
+    if zones:
+        data["local"] = {
+            zone: {
+                "start": occ.start_utc.astimezone(ZoneInfo(zone)).isoformat(),
+                "end": occ.end_utc.astimezone(ZoneInfo(zone)).isoformat(),
+            }
+            for zone in zones
+        }
+    return data
+
+
+# --- Handlers (return a JSON-able value or an iterator of items) --
+
+class TimeBoardApi:
+    """Request handlers over one board snapshot source."""
+
+    def __init__(self, registry: BoardRegistry, board_id: str = BOARD_ID):
+        self.registry = registry
+        self.board_id = board_id
+        self._data_version = None
+        self._polled_at = 0.0
+        self._routes = {
+            "/health": self.health,
+            "/occurrences": self.occurrences,
+            "/active": self.active,
+            "/convert": self.convert,
+            "/free": self.free,
+        }
+
+    @property
+    def source(self):
+        now = time.monotonic()
+        if now - self._polled_at >= STORE_POLL_INTERVAL_S:
+            self._polled_at = now
+            store = self.registry.store(self.board_id)
+            if hasattr(store, "data_version"):
+                # Pick up edits made by the app (another process) to the same database
+                version = store.data_version()
+                if self._data_version is not None and version != self._data_version:
+                    self.registry.invalidate(self.board_id)
+                self._data_version = version
+        return self.registry.snapshot(self.board_id)
+
+    def handle(self, path: str, params: Dict[str, str]):
+        route = self._routes.get(path)
+        if route is None:
+            raise ApiError(404, f"Unknown endpoint: {path}")
+        return route(params)
+
+    def health(self, params):
+        snapshot = self.source
+        return {"status": "ok", "board": snapshot.board_id, "version": snapshot.version}
+
+    def occurrences(self, params) -> Iterator[Dict]:
+        start, end = _range(params)
+        zones = _zones(params)
+        return (_occurrence_json(occ, zones) for occ in occurrences_between(self.source, start, end))
+
+    def active(self, params) -> Iterator[Dict]:
+        at = _parse_time(_param(params, "at"))
+        zones = _zones(params)
+        return (_occurrence_json(occ, zones) for occ in active_at(self.source, at))
+
+    def convert(self, params):
+        from_tz = _zone(params.get("from", "UTC"))
+        instant = _parse_time(_param(params, "time"), default_tz=from_tz)
+        zones = _zones(params) or ["UTC"]
+        return {
+            "utc": instant.isoformat(),
+            "zones": {zone: local.isoformat() for zone, local in convert_time(instant, zones).items()},
+        }
+
+    def free(self, params) -> Iterator[Dict]:
+        start, end = _range(params)
+        try:
+            min_minutes = int(params.get("min_minutes", 0))
+        except ValueError:
+            raise ApiError(400, "min_minutes must be an integer")
+        busy = busy_intervals(self.source, start, end)
+        return (
+            {"start": a.isoformat(), "end": b.isoformat(), "minutes": int((b - a).total_seconds() // 60)}
+            for a, b in free_slots(busy, start, end, min_minutes)
+        )
+
+    def batch(self, body: bytes) -> Iterator[Dict]:
+        try:
+            requests = json.loads(body or b"{}").get("requests", [])
+        except (ValueError, AttributeError):
+            raise ApiError(400, "Invalid JSON body")
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH_REQUESTS:
+            raise ApiError(400, f"'requests' must be a list of at most {MAX_BATCH_REQUESTS} items")
+
+        def _results():
+            for req in requests:
+                try:
+                    params = {k: str(v) for k, v in (req.get("params") or {}).items()}
+                    result = self.handle(req.get("path", ""), params)
+                    if not isinstance(result, (dict, list)):
+                        result = list(result)
+                    yield {"status": 200, "result": result}
+                except ApiError as exc:
+                    yield {"status": exc.status, "error": str(exc)}
+                except (AttributeError, TypeError):
+                    yield {"status": 400, "error": "Invalid batch item"}
+        return _results()
+
+
+# --- HTTP/1.1 server -------------------------------------------
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _head(status: int, keep_alive: bool, extra: str) -> bytes:
+    return (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"{extra}\r\n"
+    ).encode("latin-1")
+
+
+async def _send_json(writer, status: int, value, keep_alive: bool):
+    body = _dumps(value)
+    writer.write(_head(status, keep_alive, f"Content-Length: {len(body)}\r\n") + body)
+    await writer.drain()
+
+
+async def _send_stream(writer, items: Iterable, keep_alive: bool):
+    """
+    Stream a JSON array with chunked encoding, STREAM_CHUNK_ITEMS per chunk.
+    Items are produced (and encoded) in a worker thread, one chunk at a time.
+    """
+    items = iter(items)
+
+    def _next_chunk() -> List[bytes]:
+        return [_dumps(item) for item in islice(items, STREAM_CHUNK_ITEMS)]
+
+    def _chunk(data: bytes) -> bytes:
+        return b"%x\r\n%s\r\n" % (len(data), data)
+
+    encoded = await asyncio.to_thread(_next_chunk)
+    writer.write(_head(200, keep_alive, "Transfer-Encoding: chunked\r\n"))
+    prefix = b"["
+    try:
+        while len(encoded) == STREAM_CHUNK_ITEMS:
+            writer.write(_chunk(prefix + b",".join(encoded)))
+            prefix = b","
+            await writer.drain()
+            encoded = await asyncio.to_thread(_next_chunk)
+    except ConnectionError:
+        raise
+    except Exception as exc:
+        # The status line is out: no other response can follow
+        raise _StreamAborted(f"{type(exc).__name__}: {exc}") from exc
+    tail = prefix + b",".join(encoded) if encoded else (b"[" if prefix == b"[" else b"")
+    writer.write(_chunk(tail + b"]") + b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _handle_connection(api: TimeBoardApi, reader, writer):
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT_S)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                await _send_json(writer, 400, {"error": "Malformed request line"}, False)
+                return
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                await _send_json(writer, 400, {"error": "Invalid Content-Length"}, False)
+                return
+            if length > MAX_BODY_BYTES:
+                await _send_json(writer, 413, {"error": "Body too large"}, False)
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            params = dict(parse_qsl(url.query))
+            try:
+                if url.path == "/batch":
+                    if method != "POST":
+                        raise ApiError(405, "Use POST for /batch")
+                    await _send_stream(writer, api.batch(body), keep_alive)
+                else:
+                    if method != "GET":
+                        raise ApiError(405, f"Use GET for {url.path}")
+                    result = await asyncio.to_thread(api.handle, url.path, params)
+                    if isinstance(result, (dict, list)):
+                        await _send_json(writer, 200, result, keep_alive)
+                    else:
+                        await _send_stream(writer, result, keep_alive)
+            except _StreamAborted as exc:
+                print(f"{method} {target}: {exc} (response aborted)", file=sys.stderr)
+                writer.transport.abort()
+                return
+            except ApiError as exc:
+                await _send_json(writer, exc.status, {"error": str(exc)}, keep_alive)
+            except Exception as exc:  # keep serving other requests
+                await _send_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"}, False)
+                return
+
+            if not keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(api: TimeBoardApi, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    server = await asyncio.start_server(
+        lambda r, w: _handle_connection(api, r, w), host, port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def open_source(db: Optional[str] = None, journal: Optional[str] = None, board: Optional[str] = None):
+    """Open the store to serve: a journal dir, a board JSON file, or SQLite."""
+    if journal:
+        from .journal import JournalStore
+        return JournalStore(journal)
+    if board:
+        store = EventStore(":memory:")
+        store.add_many(load_board(board).events)
+        return store
+    return EventStore(db or DEFAULT_DB_PATH)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="timeboard-api", description="Local JSON API over timeboard_core")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help=f"SQLite event store (default: {DEFAULT_DB_PATH})")
+    source.add_argument("--journal", help="Journal directory")
+    source.add_argument("--board", help="Board JSON file (read-only)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    registry = BoardRegistry()
+    registry.register(BOARD_ID, open_source(args.db, args.journal, args.board))
+    print(f"TimeBoard API on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(TimeBoardApi(registry), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
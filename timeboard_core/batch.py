@@ -0,0 +1,329 @@
+# timeboard_core/batch.py
+"""
+Nightly batch recompute of occurrences, reminders and daily analytics for
+many boards on a process pool.
+
+Usage:
+    python -m timeboard_core.batch boards/ --days 365
+    python -m timeboard_core.batch boards/*.json --start 2025-01-01 --workers 8
+
+Boards are encoded once into `RuleColumns`: fixed-width integer arrays
+(epochs, durations, recurrence / weekday / month-day codes, interned zone
+and category indexes, flattened reminder offsets). Small boards are one
+shard each; large boards are cut into rule ranges of at most
+`shard_rules` rules. A worker receives only a shard's column slices
+(plain bytes, cheap to pickle), rebuilds minimal events, expands them
+over the board's local days and sends back counts and arrays, which the
+parent merges per board (by position: names need not be unique). No
+`Event` objects cross process boundaries.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import os
+import sys
+import time
+
+from .board import Board, load_board
+from .events import Event, RECURRENCE_TYPES
+from .export import _expand_sources
+from .occurrence_sets import day_of_date
+from .time_accounting import accumulate_spans, day_bounds, occurrence_spans
+
+# Rules per shard; boards above this are split by rule ranges
+DEFAULT_SHARD_RULES = 2000
+# Reminders are collected for this long after the batch start
+DEFAULT_REMINDER_HORIZON = timedelta(days=1)
+
+_RECURRENCES = tuple(RECURRENCE_TYPES)
+_NO_VALUE = -1                      # weekday / month day unset
+_NO_DATE = -(1 << 62)               # start_date / end_date unset
+_UTC = timezone.utc
+
+
+# --- Compact rule arrays ------------------------------------------
+
+@dataclass
+class RuleColumns:
+    """Events as parallel integer columns plus interned string tables."""
+    zones: Tuple[str, ...]
+    categories: Tuple[str, ...]
+    start: array = field(default_factory=lambda: array("q"))          # UTC epoch seconds
+    duration: array = field(default_factory=lambda: array("l"))       # minutes
+    recurrence: array = field(default_factory=lambda: array("b"))     # index into RECURRENCE_TYPES
+    weekday: array = field(default_factory=lambda: array("b"))
+    month_day: array = field(default_factory=lambda: array("b"))
+    zone: array = field(default_factory=lambda: array("l"))           # index into zones
+    category: array = field(default_factory=lambda: array("l"))       # index into categories
+    first: array = field(default_factory=lambda: array("q"))          # start_date epoch or _NO_DATE
+    last: array = field(default_factory=lambda: array("q"))           # end_date epoch or _NO_DATE
+    reminder_offsets: array = field(default_factory=lambda: array("l"))  # rule i: [offsets[i], offsets[i+1])
+    reminders: array = field(default_factory=lambda: array("l"))      # minutes before start
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def slice(self, lo: int, hi: int) -> "RuleColumns":
+        """Rules [lo, hi) with the same string tables."""
+        r_lo, r_hi = self.reminder_offsets[lo], self.reminder_offsets[hi]
+        return RuleColumns(
+            zones=self.zones,
+            categories=self.categories,
+            start=self.start[lo:hi],
+            duration=self.duration[lo:hi],
+            recurrence=self.recurrence[lo:hi],
+            weekday=self.weekday[lo:hi],
+            month_day=self.month_day[lo:hi],
+            zone=self.zone[lo:hi],
+            category=self.category[lo:hi],
+            first=self.first[lo:hi],
+            last=self.last[lo:hi],
+            reminder_offsets=array("l", (o - r_lo for o in self.reminder_offsets[lo:hi + 1])),
+            reminders=self.reminders[r_lo:r_hi],
+        )
+
+
+def _epoch(dt: Optional[datetime]) -> int:
+    return int(dt.timestamp()) if dt is not None else _NO_DATE
+
+
+def _datetime(ts: int) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts, _UTC) if ts != _NO_DATE else None
+
+
+def encode_rules(events: Iterable[Event]) -> RuleColumns:
+    """Columns for `events` (in order); strings are interned per board."""
+    zones: Dict[str, int] = {}
+    categories: Dict[str, int] = {}
+    recurrences = {r: i for i, r in enumerate(_RECURRENCES)}
+    columns = RuleColumns(zones=(), categories=())
+    columns.reminder_offsets.append(0)
+    for event in events:
+        columns.start.append(int(event.start_utc.timestamp()))
+        columns.duration.append(event.duration_min)
+        columns.recurrence.append(recurrences[event.recurrence or "once"])
+        columns.weekday.append(_NO_VALUE if event.weekday is None else event.weekday)
+        columns.month_day.append(_NO_VALUE if event.month_day is None else event.month_day)
+        columns.zone.append(zones.setdefault(event.reference_tz or "UTC", len(zones)))
+        columns.category.append(categories.setdefault(event.category_id, len(categories)))
+        columns.first.append(_epoch(event.start_date))
+        columns.last.append(_epoch(event.end_date))
+        columns.reminders.extend(event.reminders_min)
+        columns.reminder_offsets.append(len(columns.reminders))
+    columns.zones = tuple(zones)
+    columns.categories = tuple(categories)
+    return columns
+
+
+def decode_rules(columns: RuleColumns) -> List[Event]:
+    """Minimal events for expansion (ids are the rule indexes)."""
+    events = []
+    for i in range(len(columns)):
+        weekday, month_day = columns.weekday[i], columns.month_day[i]
+        events.append(Event(
+            id=str(i),
+            title="",
+            category_id=columns.categories[columns.category[i]],
+            start_utc=datetime.fromtimestamp(columns.start[i], _UTC),
+            duration_min=columns.duration[i],
+            reminders_min=list(columns.reminders[columns.reminder_offsets[i]:columns.reminder_offsets[i + 1]]),
+            recurrence=_RECURRENCES[columns.recurrence[i]],
+            weekday=None if weekday == _NO_VALUE else weekday,
+            month_day=None if month_day == _NO_VALUE else month_day,
+            reference_tz=columns.zones[columns.zone[i]],
+            start_date=_datetime(columns.first[i]),
+            end_date=_datetime(columns.last[i]),
+        ))
+    return events
+
+
+# --- Shards -------------------------------------------------------
+
+@dataclass
+class BoardBatchResult:
+    board: str
+    tz: str
+    first_day: date
+    n_rules: int = 0
+    n_occurrences: int = 0
+    # Reminder fire times within the horizon (sorted) and their rule indexes
+    reminder_ts: array = field(default_factory=lambda: array("q"))
+    reminder_rules: array = field(default_factory=lambda: array("l"))
+    # Booked seconds per local day of `tz`, per category
+    category_seconds: Dict[str, array] = field(default_factory=dict)
+
+
+# (board index, tz, first_day, n_days, reminder window, rule offset, columns)
+Shard = Tuple[int, str, int, int, Tuple[int, int], int, RuleColumns]
+
+
+def plan_shards(
+    boards: Sequence[Tuple[str, RuleColumns]],
+    first_day: int,
+    n_days: int,
+    reminder_window: Tuple[int, int],
+    shard_rules: int = DEFAULT_SHARD_RULES,
+) -> List[Shard]:
+    """
+    One shard per (tz, columns) board, large boards split into rule
+    ranges; largest first. Shards name their board by its position.
+    """
+    shards = []
+    for index, (tz, columns) in enumerate(boards):
+        for lo in range(0, max(len(columns), 1), shard_rules):
+            hi = min(lo + shard_rules, len(columns))
+            shards.append((index, tz, first_day, n_days, reminder_window, lo, columns.slice(lo, hi)))
+    # Long shards first so the pool does not end on one straggler
+    shards.sort(key=lambda shard: -len(shard[6]))
+    return shards
+
+
+def expand_shard(shard: Shard) -> Tuple[int, int, int, array, array, Dict[str, bytes]]:
+    """
+    Worker: (board index, rules, occurrences, reminder times, reminder rules,
+    category -> per-day seconds as bytes) for one shard.
+    """
+    index, tz, first_day, n_days, (remind_lo, remind_hi), offset, columns = shard
+    bounds = day_bounds(tz, first_day, n_days)
+    span_lo, span_hi = bounds[0], bounds[-1]
+
+    n_occurrences = 0
+    reminders: List[Tuple[int, int]] = []
+    per_day: Dict[str, array] = {}
+    for i, event in enumerate(decode_rules(columns)):
+        if event.duration_min <= 0:
+            continue
+        days = per_day.get(event.category_id)
+        if days is None:
+            days = per_day[event.category_id] = array("q", bytes(8 * n_days))
+        slack = 2 + event.duration_min // 1440
+        spans = list(occurrence_spans(event, first_day - slack, first_day + n_days + 2))
+        accumulate_spans(days, spans, bounds)
+        for start, _ in spans:
+            if not span_lo <= start < span_hi:
+                continue
+            n_occurrences += 1
+            for minutes in event.reminders_min:
+                fire = start - minutes * 60
+                if remind_lo <= fire < remind_hi:
+                    reminders.append((fire, offset + i))
+
+    reminders.sort()
+    return (
+        index,
+        len(columns),
+        n_occurrences,
+        array("q", (fire for fire, _ in reminders)),
+        array("l", (rule for _, rule in reminders)),
+        {category: days.tobytes() for category, days in per_day.items()},
+    )
+
+
+def _merge(result: BoardBatchResult, part) -> None:
+    _, n_rules, n_occurrences, reminder_ts, reminder_rules, per_day = part
+    result.n_rules += n_rules
+    result.n_occurrences += n_occurrences
+    # Sorted once per board after the last shard (see _sort_reminders)
+    result.reminder_ts.extend(reminder_ts)
+    result.reminder_rules.extend(reminder_rules)
+    for category, data in per_day.items():
+        days = array("q")
+        days.frombytes(data)
+        target = result.category_seconds.get(category)
+        if target is None:
+            result.category_seconds[category] = days
+        else:
+            for i, seconds in enumerate(days):
+                if seconds:
+                    target[i] += seconds
+
+
+def _sort_reminders(result: BoardBatchResult) -> None:
+    merged = sorted(zip(result.reminder_ts, result.reminder_rules))
+    result.reminder_ts = array("q", (fire for fire, _ in merged))
+    result.reminder_rules = array("l", (rule for _, rule in merged))
+
+
+def board_zone(board: Board) -> str:
+    """Zone whose local days the board's analytics use (its home zone)."""
+    return board.settings.church_timezone or "UTC"
+
+
+def run_batch(
+    boards: Iterable[Board],
+    start: date,
+    n_days: int = 365,
+    workers: Optional[int] = None,
+    shard_rules: int = DEFAULT_SHARD_RULES,
+    reminder_horizon: timedelta = DEFAULT_REMINDER_HORIZON,
+) -> List[BoardBatchResult]:
+    """
+    Occurrences, reminders and per-day category seconds for every board
+    over `n_days` local days from `start`; one result per board, in the
+    order of `boards` (boards with the same name stay separate).
+    """
+    first_day = day_of_date(start)
+    boards = list(boards)
+    encoded = [(board_zone(board), encode_rules(board.events)) for board in boards]
+    results = [BoardBatchResult(board=board.name, tz=tz, first_day=start)
+               for board, (tz, _) in zip(boards, encoded)]
+
+    # Reminders are due from the batch start (UTC midnight) for the horizon
+    remind_lo = first_day * 86400
+    reminder_window = (remind_lo, remind_lo + int(reminder_horizon.total_seconds()))
+    shards = plan_shards(encoded, first_day, n_days, reminder_window, shard_rules)
+
+    if workers == 1:
+        for part in map(expand_shard, shards):
+            _merge(results[part[0]], part)
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            for part in pool.map(expand_shard, shards):
+                _merge(results[part[0]], part)
+
+    for result in results:
+        _sort_reminders(result)
+    return results
+
+
+def _load_boards(sources: List[str]) -> Iterator[Board]:
+    for path in _expand_sources(sources):
+        try:
+            yield load_board(path)
+        except Exception as exc:  # one bad board must not stop the batch
+            print(f"FAILED {path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="timeboard-batch",
+        description="Recompute occurrences, reminders and daily category totals for many boards.",
+    )
+    parser.add_argument("sources", nargs="+", help="Board JSON files, globs or directories")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD); default: today (UTC)")
+    parser.add_argument("--days", type=int, default=365, help="Days to expand (default: 365)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-rules", type=int, default=DEFAULT_SHARD_RULES,
+                        help=f"Max rules per shard (default: {DEFAULT_SHARD_RULES})")
+    args = parser.parse_args(argv)
+
+    start = date.fromisoformat(args.start) if args.start else datetime.now(_UTC).date()
+    t0 = time.perf_counter()
+    results = run_batch(_load_boards(args.sources), start, args.days, args.workers, args.shard_rules)
+    elapsed = time.perf_counter() - t0
+
+    n_rules = sum(r.n_rules for r in results)
+    for result in results:
+        hours = sum(sum(days) for days in result.category_seconds.values()) / 3600
+        print(f"{result.n_rules:7d} rules  {result.n_occurrences:9d} occurrences  "
+              f"{len(result.reminder_ts):6d} reminders  {hours:10.1f} h  {result.board}")
+    print(f"Processed {len(results)} board(s), {n_rules} rules in {elapsed:.2f}s "
+          f"({n_rules / elapsed if elapsed else 0:.0f} rules/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# timeboard_core/board.py
+"""
+Board definitions (settings + events) and their JSON-friendly form.
+"""
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import json
+
+from .events import Event
+from .settings import UserSettings
+
+
+@dataclass
+class Board:
+    name: str
+    settings: UserSettings = field(default_factory=UserSettings)
+    events: List[Event] = field(default_factory=list)
+
+
+# --- Datetime helpers ------------------------------------------
+
+def _dt_to_str(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() if dt is not None else None
+
+
+def _dt_from_str(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+# --- Events ----------------------------------------------------
+
+_EVENT_DATETIME_FIELDS = ("start_utc", "start_date", "end_date")
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    data = {}
+    for f in fields(Event):
+        value = getattr(event, f.name)
+        if f.name in _EVENT_DATETIME_FIELDS:
+            value = _dt_to_str(value)
+        elif isinstance(value, list):
+            value = list(value)
+        data[f.name] = value
+    return data
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    known = {f.name for f in fields(Event)}
+    kwargs = {k: v for k, v in data.items() if k in known}
+    for name in _EVENT_DATETIME_FIELDS:
+        if name in kwargs:
+            kwargs[name] = _dt_from_str(kwargs[name])
+    if kwargs.get("start_utc") is None:
+        raise ValueError(f"Event {data.get('id', '?')} has no start_utc")
+    return Event(**kwargs)
+
+
+# --- Settings --------------------------------------------------
+
+def settings_to_dict(settings: UserSettings) -> Dict[str, Any]:
+    data = {}
+    for f in fields(UserSettings):
+        value = getattr(settings, f.name)
+        if isinstance(value, list):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = dict(value)
+        data[f.name] = value
+    return data
+
+
+def settings_from_dict(data: Dict[str, Any]) -> UserSettings:
+    known = {f.name for f in fields(UserSettings)}
+    return UserSettings(**{k: v for k, v in data.items() if k in known})
+
+
+# --- Boards ----------------------------------------------------
+
+def board_to_dict(board: Board) -> Dict[str, Any]:
+    return {
+        "name": board.name,
+        "settings": settings_to_dict(board.settings),
+        "events": [event_to_dict(e) for e in board.events],
+    }
+
+
+def board_from_dict(data: Dict[str, Any], default_name: str = "board") -> Board:
+    return Board(
+        name=data.get("name") or default_name,
+        settings=settings_from_dict(data.get("settings", {})),
+        events=[event_from_dict(e) for e in data.get("events", [])],
+    )
+
+
+def load_board(path: str) -> Board:
+    """Load a board definition from a JSON file (or a binary .tbb snapshot)."""
+    from .board_binary import is_binary_board, read_board
+    if is_binary_board(path):
+        return read_board(path)
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    default_name = path.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    return board_from_dict(data, default_name=default_name)
+
+
+def save_board(board: Board, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(board_to_dict(board), fh, ensure_ascii=False, indent=2)
@@ -0,0 +1,266 @@
+# timeboard_core/board_registry.py
+"""
+Process-wide registry of boards with versioned, shared snapshots.
+
+Sessions only hold a board id (plus their own view state) and ask the
+registry for the current `BoardSnapshot`. A snapshot is immutable: it
+holds the id -> event map of its version, frozen when it is published,
+for the event list, search and analytics. Timeline windows are read
+lazily, one per window, through the store's window query (the
+materialized occurrence table when it covers the window) while the
+version is still current; a superseded snapshot expands its own map
+instead, so it never sees a newer version. Every result is computed
+once and shared by every viewer of the version.
+
+Edits go through the registry, are written to the board's store, and
+publish a new snapshot whose map is the previous one with the edit
+applied, so the store is read in full only when a board is registered
+(or invalidated) and memory scales with boards (and the windows
+viewed), not sessions. Superseded snapshots are dropped once no rerun
+references them.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from functools import partial
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import threading
+
+from .event_index import EventIndex
+from .event_store import epoch_day, event_day_window
+from .events import Event
+from .session_overlap import SessionOverlapReport, session_overlap_report
+from .time_accounting import CategoryLedger, ledger_span
+from .timeline_layout import (
+    TimelineFrame, build_timeline_frame, collect_occurrences, get_zoom_config, layout_settings_key,
+)
+
+# Cached query results per snapshot (windows, frames + event pages)
+DEFAULT_MAX_CACHED_RESULTS = 64
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """
+    One immutable version of a board.
+
+    Returned events are shared between sessions and must not be mutated;
+    edit through `BoardRegistry` instead.
+    """
+    board_id: str
+    version: int
+    events: Mapping[str, Event] = field(repr=False, compare=False)
+    # read(store) -> result while this is the board's current version, else None
+    read_store: Optional[Callable[[Callable[[object], object]], object]] = field(
+        default=None, repr=False, compare=False,
+    )
+    max_cached: int = field(default=DEFAULT_MAX_CACHED_RESULTS, repr=False, compare=False)
+    _cache: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def cached(self, key: tuple, compute: Callable[[], object]):
+        """Memoize a derived result for this version (shared by all viewers)."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return value
+
+    def count(self) -> int:
+        return len(self.events)
+
+    def _sorted(self) -> Tuple[Event, ...]:
+        """Events ordered by start time (the order of the stores' `list_events`)."""
+        return self.cached(("sorted",), lambda: tuple(sorted(self.events.values(), key=lambda e: (e.start_utc, e.id))))
+
+    def list_events(self, limit: Optional[int] = None, offset: int = 0) -> Tuple[Event, ...]:
+        events = self._sorted()
+        return events[offset:offset + limit] if limit is not None else events[offset:]
+
+    def event_index(self) -> EventIndex:
+        """Search index over all events of this version (built on first use)."""
+        return self.cached(("event_index",), lambda: EventIndex(self._sorted()))
+
+    def events_by_id(self) -> Mapping[str, Event]:
+        """Id -> event map of this version (read-only)."""
+        return self.events
+
+    def _day_windows(self) -> Tuple[List[int], List[Optional[int]]]:
+        """(start_day, end_day) of every event in `_sorted` order, as two lists."""
+        def build():
+            windows = [event_day_window(e) for e in self._sorted()]
+            return [w[0] for w in windows], [w[1] for w in windows]
+        return self.cached(("day_windows",), build)
+
+    def events_in_range(self, start_utc: datetime, end_utc: datetime) -> List[Event]:
+        """Rules that can occur on any UTC day from start_utc to end_utc (as in EventStore)."""
+        first_day, last_day = epoch_day(start_utc), epoch_day(end_utc)
+        start_days, end_days = self._day_windows()
+        return [
+            event for event, start_day, end_day in zip(self._sorted(), start_days, end_days)
+            if start_day <= last_day and (end_day is None or end_day >= first_day)
+        ]
+
+    def category_ledger(self, tz: str, start: date, end: date) -> CategoryLedger:
+        """Per-category time ledger covering [start, end) (whole years, built once per version)."""
+        first, last = ledger_span(start, end)
+        return self.cached(
+            ("ledger", tz, first, last),
+            lambda: CategoryLedger(self._sorted(), tz, first, last),
+        )
+
+    def session_overlap(self, exchange_ids: Tuple[str, ...], tz: str, start: date, end: date,
+                        period: str) -> SessionOverlapReport:
+        """Category time vs. trading sessions over [start, end), per version."""
+        return self.cached(
+            ("session_overlap", tuple(exchange_ids), tz, start, end, period),
+            lambda: session_overlap_report(self._sorted(), exchange_ids, tz, start, end, period),
+        )
+
+    def window_occurrences(self, start_utc: datetime, days: int) -> Tuple[Event, ...]:
+        """Expanded occurrences of a timeline window, shared across viewers."""
+        def build():
+            occurrences = None
+            if self.read_store is not None:
+                occurrences = self.read_store(lambda store: store.window_occurrences(start_utc, days))
+            if occurrences is None:
+                # Superseded: the store already holds a newer version
+                occurrences = collect_occurrences(
+                    self.events_in_range(start_utc, start_utc + timedelta(days=days)), start_utc, days,
+                )
+            return tuple(occurrences)
+        return self.cached(("window", start_utc, days), build)
+
+    def occurrence_rows(self, start_utc: datetime, end_utc: datetime,
+                        category_id: Optional[str] = None) -> List[tuple]:
+        """
+        The store's materialized occurrence rows (see
+        `EventStore.occurrence_rows`) while this version is current.
+        ValueError if the store keeps no occurrence table covering the
+        range, or the snapshot is superseded.
+        """
+        def read(store):
+            if not getattr(store, "materialized", False):
+                return None
+            return store.occurrence_rows(start_utc, end_utc, category_id)
+
+        rows = self.read_store(read) if self.read_store is not None else None
+        if rows is None:
+            raise ValueError("No materialized occurrences for this snapshot")
+        return rows
+
+    def timeline_frame(self, zones: Tuple[str, ...], settings, start_utc: datetime) -> TimelineFrame:
+        """Time-independent timeline layout of a window (see `finish_timeline_layout`)."""
+        days = get_zoom_config(settings)["days"]
+        return self.cached(
+            ("frame", tuple(zones), layout_settings_key(settings), start_utc),
+            lambda: build_timeline_frame(
+                list(zones), settings, [], start_utc,
+                occurrences=list(self.window_occurrences(start_utc, days)),
+            ),
+        )
+
+
+class BoardRegistry:
+    """Board id -> current snapshot, with write-through edits."""
+
+    def __init__(self, max_cached: int = DEFAULT_MAX_CACHED_RESULTS):
+        self.max_cached = max_cached
+        self._lock = threading.RLock()
+        self._stores: Dict[str, object] = {}
+        self._snapshots: Dict[str, BoardSnapshot] = {}
+
+    def register(self, board_id: str, store) -> BoardSnapshot:
+        """Attach a store (EventStore, JournalStore, ...) under `board_id`."""
+        with self._lock:
+            self._stores[board_id] = store
+            return self._reload(board_id)
+
+    def board_ids(self):
+        with self._lock:
+            return list(self._stores)
+
+    def snapshot(self, board_id: str) -> BoardSnapshot:
+        with self._lock:
+            return self._snapshots[board_id]
+
+    def store(self, board_id: str):
+        with self._lock:
+            return self._stores[board_id]
+
+    def _publish(self, board_id: str, events: Dict[str, Event]) -> BoardSnapshot:
+        """Publish `events` (owned by the snapshot from now on) as the next version."""
+        previous = self._snapshots.get(board_id)
+        version = previous.version + 1 if previous else 1
+        snapshot = BoardSnapshot(
+            board_id=board_id,
+            version=version,
+            events=MappingProxyType(events),
+            read_store=partial(self._read_store, board_id, version),
+            max_cached=self.max_cached,
+        )
+        self._snapshots[board_id] = snapshot
+        return snapshot
+
+    def _read_store(self, board_id: str, version: int, read: Callable[[object], object]):
+        """`read(store)` if `version` is still current (edits wait meanwhile), else None."""
+        with self._lock:
+            if self._snapshots[board_id].version != version:
+                return None
+            return read(self._stores[board_id])
+
+    def _reload(self, board_id: str) -> BoardSnapshot:
+        return self._publish(board_id, {e.id: e for e in self._stores[board_id].all()})
+
+    def _current(self, board_id: str) -> Dict[str, Event]:
+        """A private copy of the current id -> event map, to edit and publish."""
+        return dict(self._snapshots[board_id].events)
+
+    def invalidate(self, board_id: str) -> BoardSnapshot:
+        """Re-read the store after it was changed directly and publish a new version."""
+        with self._lock:
+            return self._reload(board_id)
+
+    # --- Copy-on-write edits -----------------------------------
+
+    def add(self, board_id: str, event: Event) -> BoardSnapshot:
+        return self.add_many(board_id, [event])
+
+    def add_many(self, board_id: str, events: Iterable[Event]) -> BoardSnapshot:
+        # Copies, so later changes to the callers' objects cannot reach the snapshot
+        events = [replace(e) for e in events]
+        with self._lock:
+            self._stores[board_id].add_many(events)
+            current = self._current(board_id)
+            current.update((e.id, e) for e in events)
+            return self._publish(board_id, current)
+
+    def update(self, board_id: str, event: Event) -> BoardSnapshot:
+        return self.update_many(board_id, [event])
+
+    def update_many(self, board_id: str, events: Iterable[Event]) -> BoardSnapshot:
+        events = [replace(e) for e in events]
+        with self._lock:
+            self._stores[board_id].update_many(events)
+            current = self._current(board_id)
+            # Like the stores: unknown ids are skipped
+            current.update((e.id, e) for e in events if e.id in current)
+            return self._publish(board_id, current)
+
+    def delete(self, board_id: str, event_id: str) -> BoardSnapshot:
+        return self.delete_many(board_id, [event_id])
+
+    def delete_many(self, board_id: str, event_ids: Iterable[str]) -> BoardSnapshot:
+        event_ids = list(event_ids)
+        with self._lock:
+            self._stores[board_id].delete_many(event_ids)
+            current = self._current(board_id)
+            for event_id in event_ids:
+                current.pop(event_id, None)
+            return self._publish(board_id, current)
@@ -0,0 +1,167 @@
+# timeboard_core/calendar_tables.py
+"""
+Precomputed Gregorian calendar tables for O(1) month arithmetic.
+
+For every month of a configurable year span the table stores the epoch
+day of the 1st, the month length and the weekday of the 1st; a per-day
+array maps epoch days back to their month. With those, "nth / last
+weekday of a month", "does day D exist in month M", "week of month" and
+epoch day -> (year, month, day) are a few array reads. Days outside the
+span fall back to `datetime.date`.
+
+Epoch days count from 1970-01-01 (a Thursday); weekdays are 0=Mon..6=Sun.
+"""
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import Optional, Tuple
+
+DEFAULT_FIRST_YEAR = 1900
+DEFAULT_LAST_YEAR = 2200
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def weekday_of(day: int) -> int:
+    """Weekday (0=Mon) of an epoch day."""
+    return (day + 3) % 7
+
+
+def week_of_month(day_of_month: int) -> int:
+    """0-based week index: days 1-7 -> 0, 8-14 -> 1, ..."""
+    return (day_of_month - 1) // 7
+
+
+class CalendarTable:
+
+    def __init__(self, first_year: int = DEFAULT_FIRST_YEAR, last_year: int = DEFAULT_LAST_YEAR):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.month_start = array("l")    # epoch day of the 1st, per month index
+        self.month_length = array("b")
+        self.first_weekday = array("b")
+        self.month_of_day = array("H")   # month index per epoch day in the span
+
+        for year in range(first_year, last_year + 1):
+            for month in range(1, 13):
+                start = date(year, month, 1).toordinal() - _EPOCH_ORDINAL
+                nxt = date(year + (month == 12), month % 12 + 1, 1).toordinal() - _EPOCH_ORDINAL
+                self.month_start.append(start)
+                self.month_length.append(nxt - start)
+                self.first_weekday.append(weekday_of(start))
+                self.month_of_day.extend([len(self.month_start) - 1] * (nxt - start))
+
+        self.first_day = self.month_start[0]
+        self.end_day = self.first_day + len(self.month_of_day)   # exclusive
+        self.n_months = len(self.month_start)
+        self._month_sets = {}
+
+    # --- Months -------------------------------------------------
+
+    def _index(self, year: int, month: int) -> Optional[int]:
+        if not self.first_year <= year <= self.last_year:
+            return None
+        return (year - self.first_year) * 12 + month - 1
+
+    def days_in_month(self, year: int, month: int) -> int:
+        i = self._index(year, month)
+        if i is None:
+            nxt = date(year + (month == 12), month % 12 + 1, 1)
+            return (nxt - date(year, month, 1)).days
+        return self.month_length[i]
+
+    def day_exists(self, year: int, month: int, day: int) -> bool:
+        """Whether `day` (1-31) exists in the month (e.g. no 31st in April)."""
+        return 1 <= day <= self.days_in_month(year, month)
+
+    def nth_weekday(self, year: int, month: int, weekday: int, n: int) -> Optional[int]:
+        """
+        Day of month of the nth `weekday` (n=1 first .. 5; n=-1, like any
+        n <= 0, last), or None if the month has no such day.
+        """
+        i = self._index(year, month)
+        if i is None:
+            first_wd, length = date(year, month, 1).weekday(), self.days_in_month(year, month)
+        else:
+            first_wd, length = self.first_weekday[i], self.month_length[i]
+        first = 1 + (weekday - first_wd) % 7
+        if n <= 0:
+            return first + 7 * ((length - first) // 7)
+        day = first + 7 * (n - 1)
+        return day if day <= length else None
+
+    def month_index(self, day: int) -> Optional[int]:
+        """Month index (0 = January of first_year) of an epoch day, None outside the span."""
+        if not self.first_day <= day < self.end_day:
+            return None
+        return self.month_of_day[day - self.first_day]
+
+    # --- Month sets ---------------------------------------------
+    #
+    # Months having a 29th/30th/31st day or a 5th Monday..Sunday, as
+    # prefix counts (how many such months precede index i) and positions
+    # (index of the k-th such month), so counting and k-th lookups over
+    # month ranges are O(1).
+
+    def has_day(self, i: int, day_of_month: int) -> bool:
+        return day_of_month <= self.month_length[i]
+
+    def has_fifth_weekday(self, i: int, weekday: int) -> bool:
+        return 1 + (weekday - self.first_weekday[i]) % 7 + 28 <= self.month_length[i]
+
+    def _month_set(self, key: Tuple[str, int]) -> Tuple[array, array]:
+        month_set = self._month_sets.get(key)
+        if month_set is None:
+            kind, value = key
+            test = self.has_day if kind == "day" else self.has_fifth_weekday
+            prefix, positions = array("l", [0]), array("l")
+            for i in range(self.n_months):
+                if test(i, value):
+                    positions.append(i)
+                prefix.append(len(positions))
+            month_set = self._month_sets[key] = (prefix, positions)
+        return month_set
+
+    def count_months(self, key: Tuple[str, int], lo: int, hi: int) -> int:
+        """Months in [lo, hi) belonging to set `key`, e.g. ("day", 31) or ("fifth", 4)."""
+        prefix = self._month_set(key)[0]
+        return prefix[hi] - prefix[lo]
+
+    def nth_month(self, key: Tuple[str, int], k: int) -> Optional[int]:
+        """Index of the k-th (0-based) month of set `key`, None past the span."""
+        positions = self._month_set(key)[1]
+        return positions[k] if 0 <= k < len(positions) else None
+
+    # --- Days ---------------------------------------------------
+
+    def ymd(self, day: int) -> Tuple[int, int, int]:
+        """(year, month, day of month) of an epoch day."""
+        if not self.first_day <= day < self.end_day:
+            d = date.fromordinal(day + _EPOCH_ORDINAL)
+            return d.year, d.month, d.day
+        i = self.month_of_day[day - self.first_day]
+        return self.first_year + i // 12, i % 12 + 1, day - self.month_start[i] + 1
+
+    def day_of_month(self, day: int) -> int:
+        if not self.first_day <= day < self.end_day:
+            return date.fromordinal(day + _EPOCH_ORDINAL).day
+        return day - self.month_start[self.month_of_day[day - self.first_day]] + 1
+
+    def month_info(self, day: int) -> Tuple[int, int]:
+        """(day of month, month length) of an epoch day."""
+        if not self.first_day <= day < self.end_day:
+            d = date.fromordinal(day + _EPOCH_ORDINAL)
+            return d.day, self.days_in_month(d.year, d.month)
+        i = self.month_of_day[day - self.first_day]
+        return day - self.month_start[i] + 1, self.month_length[i]
+
+    def is_last_weekday(self, day: int) -> bool:
+        """Whether the epoch day is the last of its weekday in its month."""
+        dom, length = self.month_info(day)
+        return dom + 7 > length
+
+
+@lru_cache(maxsize=None)
+def calendar_table(first_year: int = DEFAULT_FIRST_YEAR, last_year: int = DEFAULT_LAST_YEAR) -> CalendarTable:
+    """Shared (read-only) table for a year span."""
+    return CalendarTable(first_year, last_year)
@@ -0,0 +1,457 @@
+# timeboard_core/columnar.py
+"""
+Columnar export of expanded occurrences for analytics.
+
+Usage:
+    python -m timeboard_core.columnar boards/ --out occurrences.parquet --start 2025-01-01 --days 365
+    python -m timeboard_core.columnar boards/ --out occurrences.arrow --zones Europe/Berlin America/New_York
+    python -m timeboard_core.columnar boards/ --out occurrences.csv       # no pyarrow needed
+
+One row per occurrence starting in [start, start + days) (UTC):
+
+    start_epoch, end_epoch   int64, UTC epoch seconds
+    local_<zone>             timestamp[s], wall-clock start in each --zones zone
+    category                 dictionary<int16, string>
+    title_id, rule_id        int32, keys into the rules table
+
+The rules table (rule_id, board, event_id, title_id, title, category,
+reference_tz, recurrence) is written next to the occurrences as
+`<stem>.rules<suffix>`. Rows are grouped by rule, not sorted by time.
+
+Boards are encoded into `batch.RuleColumns` and cut into rule-range
+shards like the batch recompute. Workers expand a shard straight into
+integer columns (no Event or datetime per occurrence) and the parent
+appends them to chunks of `chunk_rows` rows, each written as one record
+batch / row group as soon as it fills. Only a few shards are in flight
+at a time, so memory is bounded by the chunk size and the worker count,
+not by the range. Arrow IPC and Parquet wrap the column buffers without
+copying and need pyarrow (`pip install "timeboard[arrow]"`); CSV writes
+the same columns with the standard library.
+"""
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfoNotFoundError
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+from .batch import RuleColumns, _load_boards, decode_rules, encode_rules
+from .board import Board
+from .time_accounting import occurrence_spans
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+# Rows per record batch / Parquet row group
+DEFAULT_CHUNK_ROWS = 1 << 20
+# Rules per worker task; smaller than the batch default to bound result size
+DEFAULT_EXPORT_SHARD_RULES = 500
+
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".csv": "csv"}
+
+_UTC = timezone.utc
+
+
+def local_column(zone: str) -> str:
+    """Column name of the wall-clock start in `zone` (local_europe_berlin)."""
+    return "local_" + re.sub(r"[^0-9a-z]+", "_", zone.lower()).strip("_")
+
+
+# --- Rules table --------------------------------------------------
+
+@dataclass
+class RuleTable:
+    """Every exported rule with interned boards, titles and categories."""
+    boards: List[str] = field(default_factory=list)
+    titles: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    board: array = field(default_factory=lambda: array("i"))
+    title: array = field(default_factory=lambda: array("i"))
+    category: array = field(default_factory=lambda: array("i"))
+    event_ids: List[str] = field(default_factory=list)
+    reference_tz: List[str] = field(default_factory=list)
+    recurrence: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+
+# (first rule id, zones, lo ts, hi ts, columns)
+ExportShard = Tuple[int, Tuple[str, ...], int, int, RuleColumns]
+
+
+def plan_export(
+    boards: Iterable[Board],
+    start_ts: int,
+    end_ts: int,
+    zones: Sequence[str] = (),
+    shard_rules: int = DEFAULT_EXPORT_SHARD_RULES,
+) -> Tuple[RuleTable, List[ExportShard]]:
+    """The rules table and the shards (in rule order) for an export."""
+    rules = RuleTable()
+    titles: Dict[str, int] = {}
+    categories: Dict[str, int] = {}
+    zones = tuple(zones)
+    shards = []
+    for board in boards:
+        base = len(rules)
+        board_index = len(rules.boards)
+        rules.boards.append(board.name)
+        for event in board.events:
+            rules.board.append(board_index)
+            rules.title.append(titles.setdefault(event.title, len(titles)))
+            rules.category.append(categories.setdefault(event.category_id, len(categories)))
+            rules.event_ids.append(event.id)
+            rules.reference_tz.append(event.reference_tz or "UTC")
+            rules.recurrence.append(event.recurrence or "once")
+        columns = encode_rules(board.events)
+        for lo in range(0, len(columns), shard_rules):
+            hi = min(lo + shard_rules, len(columns))
+            shards.append((base + lo, zones, start_ts, end_ts, columns.slice(lo, hi)))
+    rules.titles = list(titles)
+    rules.categories = list(categories)
+    return rules, shards
+
+
+# --- Expansion ----------------------------------------------------
+
+@dataclass
+class OccurrenceChunk:
+    """Occurrence columns; `local` holds one wall-clock column per zone."""
+    start: array = field(default_factory=lambda: array("q"))
+    end: array = field(default_factory=lambda: array("q"))
+    rule: array = field(default_factory=lambda: array("i"))
+    local: Dict[str, array] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def extend(self, other: "OccurrenceChunk") -> None:
+        self.start.extend(other.start)
+        self.end.extend(other.end)
+        self.rule.extend(other.rule)
+        for zone, values in other.local.items():
+            self.local.setdefault(zone, array("q")).extend(values)
+
+    def split(self, n: int) -> Tuple["OccurrenceChunk", "OccurrenceChunk"]:
+        """(first n rows, the rest)."""
+        head = OccurrenceChunk(self.start[:n], self.end[:n], self.rule[:n],
+                               {zone: values[:n] for zone, values in self.local.items()})
+        tail = OccurrenceChunk(self.start[n:], self.end[n:], self.rule[n:],
+                               {zone: values[n:] for zone, values in self.local.items()})
+        return head, tail
+
+
+def expand_shard_columns(shard: ExportShard) -> Tuple[bytes, bytes, bytes, Dict[str, bytes]]:
+    """Worker: (starts, ends, rule ids, zone -> local starts) of one shard, as bytes."""
+    first_rule, zones, lo, hi, columns = shard
+    # Local days of any reference zone are within a day of UTC days
+    lo_day, hi_day = lo // SECONDS_PER_DAY - 2, hi // SECONDS_PER_DAY + 3
+
+    starts, ends, rules = array("q"), array("q"), array("i")
+    for i, event in enumerate(decode_rules(columns)):
+        n = len(starts)
+        for start, end in occurrence_spans(event, lo_day, hi_day):
+            if lo <= start < hi:
+                starts.append(start)
+                ends.append(end)
+        rules.extend([first_rule + i] * (len(starts) - n))
+
+    local = {}
+    for zone in zones:
+        local[zone] = array("q", map(zone_table(zone).to_local, starts)).tobytes()
+    return starts.tobytes(), ends.tobytes(), rules.tobytes(), local
+
+
+def _chunk_of(part: Tuple[bytes, bytes, bytes, Dict[str, bytes]]) -> OccurrenceChunk:
+    starts, ends, rules, local = part
+    chunk = OccurrenceChunk()
+    chunk.start.frombytes(starts)
+    chunk.end.frombytes(ends)
+    chunk.rule.frombytes(rules)
+    for zone, data in local.items():
+        chunk.local[zone] = array("q")
+        chunk.local[zone].frombytes(data)
+    return chunk
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, items: Iterable, in_flight: int) -> Iterator:
+    """Like pool.map, in order, with at most `in_flight` unconsumed results."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_occurrence_chunks(
+    shards: List[ExportShard],
+    zones: Sequence[str] = (),
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: Optional[int] = None,
+) -> Iterator[OccurrenceChunk]:
+    """Chunks of exactly `chunk_rows` rows (the last one shorter), in rule order."""
+    pending = OccurrenceChunk(local={zone: array("q") for zone in zones})
+
+    def parts():
+        if workers == 1 or len(shards) <= 1:
+            yield from map(expand_shard_columns, shards)
+            return
+        n_workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            yield from _bounded_map(pool, expand_shard_columns, shards, 2 * n_workers)
+
+    for part in parts():
+        pending.extend(_chunk_of(part))
+        while len(pending) >= chunk_rows:
+            chunk, pending = pending.split(chunk_rows)
+            yield chunk
+    if len(pending):
+        yield pending
+
+
+# --- Writers ------------------------------------------------------
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            'Arrow and Parquet export need pyarrow (pip install "timeboard[arrow]"); '
+            "CSV works without it"
+        ) from exc
+    return pyarrow
+
+
+class _ArrowWriter:
+    """Arrow IPC file or Parquet; one record batch / row group per chunk."""
+
+    def __init__(self, path: str, fmt: str, rules: RuleTable, zones: Sequence[str],
+                 compression: Optional[str] = None):
+        pa = self.pa = _require_pyarrow()
+        fields = [pa.field("start_epoch", pa.int64()), pa.field("end_epoch", pa.int64())]
+        fields += [pa.field(local_column(zone), pa.timestamp("s")) for zone in zones]
+        fields += [
+            pa.field("category", pa.dictionary(pa.int16(), pa.string())),
+            pa.field("title_id", pa.int32()),
+            pa.field("rule_id", pa.int32()),
+        ]
+        zone_columns = {local_column(zone): zone for zone in zones}
+        self.schema = pa.schema(fields, metadata={"timeboard.zones": json.dumps(zone_columns)})
+        self.zones = list(zones)
+        # Per-rule lookups; category and title columns are gathered by rule id
+        self._categories = pa.array(rules.categories, pa.string())
+        self._rule_category = pa.array(rules.category, pa.int16())
+        self._rule_title = self._column(pa.int32(), rules.title)
+
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression or "snappy")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self._writer = pa.ipc.new_file(path, self.schema, options=options)
+        self._fmt = fmt
+
+    def _column(self, type_, values: array):
+        # Zero-copy: the array's buffer becomes the Arrow data buffer
+        return self.pa.Array.from_buffers(type_, len(values), [None, self.pa.py_buffer(values)])
+
+    def write(self, chunk: OccurrenceChunk) -> None:
+        pa = self.pa
+        rule = self._column(pa.int32(), chunk.rule)
+        columns = [self._column(pa.int64(), chunk.start), self._column(pa.int64(), chunk.end)]
+        columns += [self._column(pa.timestamp("s"), chunk.local[zone]) for zone in self.zones]
+        columns += [
+            pa.DictionaryArray.from_arrays(self._rule_category.take(rule), self._categories),
+            self._rule_title.take(rule),
+            rule,
+        ]
+        batch = pa.RecordBatch.from_arrays(columns, schema=self.schema)
+        if self._fmt == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class _CsvWriter:
+    """Same columns as text; category and title resolved per row."""
+
+    def __init__(self, path: str, rules: RuleTable, zones: Sequence[str]):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(["start_epoch", "end_epoch", *map(local_column, zones), "category", "title_id", "rule_id"])
+        self.zones = list(zones)
+        self._rule_category = [rules.categories[c] for c in rules.category]
+        self._rule_title = rules.title
+        # Formatting dominates CSV; days and times of day repeat a lot
+        self._days: Dict[int, str] = {}
+        self._times: Dict[int, str] = {}
+
+    def _local_text(self, ts: int) -> str:
+        day, second = divmod(ts, SECONDS_PER_DAY)
+        day_text = self._days.get(day)
+        if day_text is None:
+            day_text = self._days[day] = time.strftime("%Y-%m-%d ", time.gmtime(day * SECONDS_PER_DAY))
+        time_text = self._times.get(second)
+        if time_text is None:
+            time_text = self._times[second] = "%02d:%02d:%02d" % (second // 3600, second // 60 % 60, second % 60)
+        return day_text + time_text
+
+    def write(self, chunk: OccurrenceChunk) -> None:
+        locals_ = [map(self._local_text, chunk.local[zone]) for zone in self.zones]
+        self._csv.writerows(zip(
+            chunk.start,
+            chunk.end,
+            *locals_,
+            map(self._rule_category.__getitem__, chunk.rule),
+            map(self._rule_title.__getitem__, chunk.rule),
+            chunk.rule,
+        ))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def rules_path(path: str) -> str:
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}.rules{suffix}"
+
+
+def write_rules_table(path: str, fmt: str, rules: RuleTable) -> None:
+    columns = {
+        "rule_id": list(range(len(rules))),
+        "board": [rules.boards[b] for b in rules.board],
+        "event_id": rules.event_ids,
+        "title_id": list(rules.title),
+        "title": [rules.titles[t] for t in rules.title],
+        "category": [rules.categories[c] for c in rules.category],
+        "reference_tz": rules.reference_tz,
+        "recurrence": rules.recurrence,
+    }
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*columns.values()))
+        return
+    pa = _require_pyarrow()
+    table = pa.table({
+        name: pa.array(values, pa.int32() if name in ("rule_id", "title_id") else pa.string())
+        for name, values in columns.items()
+    })
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+
+
+# --- Export -------------------------------------------------------
+
+@dataclass
+class ColumnarExportResult:
+    path: str
+    rules_path: str
+    n_rules: int = 0
+    n_rows: int = 0
+    n_chunks: int = 0
+    bytes_written: int = 0
+    elapsed_s: float = 0.0
+
+
+def format_of(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format for {path!r} (use {', '.join(COLUMNAR_FORMATS)})")
+    return COLUMNAR_FORMATS[suffix]
+
+
+def export_occurrences(
+    boards: Iterable[Board],
+    path: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    zones: Sequence[str] = (),
+    fmt: Optional[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: Optional[int] = None,
+    shard_rules: int = DEFAULT_EXPORT_SHARD_RULES,
+    compression: Optional[str] = None,
+) -> ColumnarExportResult:
+    """Write the occurrences of `boards` starting in [start_utc, end_utc) to `path`."""
+    fmt = fmt or format_of(path)
+    zones = list(dict.fromkeys(zones))
+    for zone in zones:
+        try:
+            zone_table(zone)        # unknown zones fail before any work
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {zone}") from None
+    t0 = time.perf_counter()
+
+    rules, shards = plan_export(boards, int(start_utc.timestamp()), int(end_utc.timestamp()), zones, shard_rules)
+    result = ColumnarExportResult(path=path, rules_path=rules_path(path), n_rules=len(rules))
+    # Before the occurrences, so a missing pyarrow fails fast
+    write_rules_table(result.rules_path, fmt, rules)
+
+    writer = _CsvWriter(path, rules, zones) if fmt == "csv" else _ArrowWriter(path, fmt, rules, zones, compression)
+    try:
+        for chunk in iter_occurrence_chunks(shards, zones, chunk_rows, workers):
+            writer.write(chunk)
+            result.n_rows += len(chunk)
+            result.n_chunks += 1
+    finally:
+        writer.close()
+
+    result.bytes_written = os.path.getsize(path)
+    result.elapsed_s = time.perf_counter() - t0
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="timeboard-columnar",
+        description="Export expanded occurrences of many boards as Parquet, Arrow IPC or CSV.",
+    )
+    parser.add_argument("sources", nargs="+", help="Board JSON files, globs or directories")
+    parser.add_argument("--out", required=True, help="Output file (.parquet, .arrow / .feather / .ipc, .csv)")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD, UTC); default: today")
+    parser.add_argument("--days", type=int, default=365, help="Days to export (default: 365)")
+    parser.add_argument("--zones", nargs="*", default=[], help="Zones to add wall-clock start columns for")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows per record batch / row group (default: {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--compression", default=None, help="Parquet / Arrow IPC codec (e.g. zstd)")
+    args = parser.parse_args(argv)
+
+    start = datetime.fromisoformat(args.start) if args.start else datetime.now(_UTC)
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=_UTC)
+    try:
+        result = export_occurrences(
+            _load_boards(args.sources), args.out, start, start + timedelta(days=args.days),
+            zones=args.zones, chunk_rows=args.chunk_rows, workers=args.workers, compression=args.compression,
+        )
+    except (ImportError, ValueError) as exc:
+        print(f"FAILED: {exc}", file=sys.stderr)
+        return 1
+
+    rate = result.n_rows / result.elapsed_s if result.elapsed_s else 0
+    print(f"{result.n_rows} occurrences of {result.n_rules} rules in {result.n_chunks} chunk(s), "
+          f"{result.bytes_written / 1e6:.1f} MB in {result.elapsed_s:.2f}s ({rate:.0f} rows/s)")
+    print(f"Wrote {result.path} and {result.rules_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+# timeboard_core/csv_import.py
+"""
+Bulk import of schedules from CSV.
+
+Usage:
+    python -m timeboard_core.csv_import rota.csv                      # into timeboard.db
+    python -m timeboard_core.csv_import rota.csv --journal journal/ --default-tz Europe/Berlin
+    python -m timeboard_core.csv_import rota.csv --dry-run            # validate only
+
+Columns (header names are case-insensitive; `tz` / `timezone` and
+`start_time` / `end_time` are accepted too):
+
+    title         empty -> the category's label, as in the event form
+    category      id or label ("work", "Bible Reading")
+    date          YYYY-MM-DD or DD.MM.YYYY
+    start, end    HH:MM; an end at or before the start ends the next day
+    reference_tz  catalog zone; empty -> the default zone
+    recurrence    RECURRENCE_TYPES key or label; empty -> once
+    end_date      optional last date of a recurring event (23:59 local)
+    color         optional #RRGGBB (or #RGB), otherwise the category color
+
+Rows are read one at a time and turned into events with `create_event`,
+exactly like a form submission. Zones are resolved once per name. A bad
+row is reported with its line number and skipped; valid rows are stored
+in batches of `batch_size`, one board version per batch.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import argparse
+import csv
+import re
+import sys
+
+from .events import EVENT_CATEGORIES, RECURRENCE_TYPES, Event, category_by_name, create_event
+from .repository import EventRepository
+from .settings import AVAILABLE_TIMEZONES
+
+DEFAULT_BATCH_SIZE = 1000
+# Errors kept in an ImportResult; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+COLUMNS = ("title", "category", "date", "start", "end", "reference_tz", "recurrence", "end_date", "color")
+_ALIASES = {
+    "tz": "reference_tz",
+    "timezone": "reference_tz",
+    "reference_timezone": "reference_tz",
+    "start_time": "start",
+    "end_time": "end",
+}
+_REQUIRED = ("category", "date", "start", "end")
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")
+_TIME_FORMATS = ("%H:%M", "%H:%M:%S")
+# Colors end up in inline styles, so only plain hex values are accepted
+_COLOR_RE = re.compile(r"#(?:[0-9A-Fa-f]{6}|[0-9A-Fa-f]{3})")
+
+
+class RowError(ValueError):
+    """A CSV row that cannot become an event."""
+
+
+@dataclass
+class RejectedRow:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    n_errors: int = 0
+    batches: int = 0
+    errors: List[RejectedRow] = field(default_factory=list)
+
+
+# Called after each batch with (rows read, rows imported, errors)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def _column_name(header: str) -> str:
+    name = header.strip().lower().replace(" ", "_").replace("-", "_")
+    return _ALIASES.get(name, name)
+
+
+def _parse_date(value: str) -> date:
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f"bad date {value!r} (use YYYY-MM-DD or DD.MM.YYYY)")
+
+
+def _parse_time(value: str, column: str) -> time:
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise RowError(f"bad {column} time {value!r} (use HH:MM)")
+
+
+def _parse_color(value: str) -> str:
+    """#RRGGBB of a hex color; the #RGB short form is expanded."""
+    if not _COLOR_RE.fullmatch(value):
+        raise RowError(f"bad color {value!r} (use #RRGGBB)")
+    if len(value) == 4:
+        value = "#" + "".join(c * 2 for c in value[1:])
+    return value
+
+
+def _recurrence(value: str) -> str:
+    key = value.strip().lower()
+    if not key:
+        return "once"
+    for recurrence, label in RECURRENCE_TYPES.items():
+        if key in (recurrence, label.lower()):
+            return recurrence
+    raise RowError(f"unknown recurrence {value!r}")
+
+
+class RowParser:
+    """Turns CSV rows into events; zone lookups are cached per name."""
+
+    def __init__(self, default_tz: str = "UTC", catalog: Optional[Collection[str]] = AVAILABLE_TIMEZONES):
+        self.catalog = catalog
+        self._zones: Dict[str, object] = {}     # name -> ZoneInfo or error message
+        self.default_tz = default_tz
+        zone = self.zone(default_tz)
+        if isinstance(zone, str):
+            raise ValueError(f"Default zone: {zone}")
+
+    def zone(self, name: str):
+        """ZoneInfo for `name`, or the reason it is rejected (cached either way)."""
+        cached = self._zones.get(name)
+        if cached is None:
+            if self.catalog is not None and name not in self.catalog:
+                cached = f"timezone {name!r} is not in the catalog"
+            else:
+                try:
+                    cached = ZoneInfo(name)
+                except (ZoneInfoNotFoundError, ValueError):
+                    cached = f"unknown timezone {name!r}"
+            self._zones[name] = cached
+        return cached
+
+    def parse(self, row: Dict[str, str]) -> Event:
+        """The event of one row (keys are normalized column names)."""
+        values = {k: (v or "").strip() for k, v in row.items() if k}
+        missing = [c for c in _REQUIRED if not values.get(c)]
+        if missing:
+            raise RowError(f"missing {', '.join(missing)}")
+
+        category_id = category_by_name(values["category"])
+        if category_id is None:
+            raise RowError(f"unknown category {values['category']!r}")
+        tz_name = values.get("reference_tz") or self.default_tz
+        tz = self.zone(tz_name)
+        if isinstance(tz, str):
+            raise RowError(tz)
+
+        day = _parse_date(values["date"])
+        start = _parse_time(values["start"], "start")
+        end = _parse_time(values["end"], "end")
+        # Same rule as the event form: an end at or before the start is overnight
+        start_minutes = start.hour * 60 + start.minute
+        end_minutes = end.hour * 60 + end.minute
+        if end_minutes <= start_minutes:
+            end_minutes += 1440
+
+        recurrence = _recurrence(values.get("recurrence", ""))
+        end_dt = None
+        if values.get("end_date"):
+            if recurrence == "once":
+                raise RowError("end_date needs a recurrence")
+            end_day = _parse_date(values["end_date"])
+            if end_day < day:
+                raise RowError(f"end_date {end_day} is before date {day}")
+            end_dt = datetime.combine(end_day, time(23, 59)).replace(tzinfo=tz)
+
+        return create_event(
+            title=values.get("title") or EVENT_CATEGORIES[category_id]["label"],
+            category_id=category_id,
+            start_dt=datetime.combine(day, start).replace(tzinfo=tz),
+            duration_min=end_minutes - start_minutes,
+            reference_tz=tz_name,
+            color=_parse_color(values["color"]) if values.get("color") else None,
+            recurrence=recurrence,
+            end_date=end_dt,
+        )
+
+
+def iter_rows(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """(line number, row with normalized column names), streamed."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [_column_name(h) for h in header]
+    missing = [c for c in _REQUIRED if c not in names]
+    if missing:
+        raise ValueError(f"CSV header lacks column(s): {', '.join(missing)}")
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, dict(zip(names, row))
+
+
+def import_csv(
+    lines: Iterable[str],
+    repository: Optional[EventRepository],
+    default_tz: str = "UTC",
+    catalog: Optional[Collection[str]] = AVAILABLE_TIMEZONES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> ImportResult:
+    """
+    Import CSV `lines` into `repository` (None: validate only). Raises
+    ValueError for an unusable header or default zone; row problems are
+    collected in the result.
+    """
+    parser = RowParser(default_tz, catalog)
+    result = ImportResult()
+    pending: List[Event] = []
+
+    def flush():
+        if repository is not None and pending:
+            repository.add_many(pending)
+            result.batches += 1
+        result.imported += len(pending)
+        pending.clear()
+        if progress:
+            progress(result.rows, result.imported, result.n_errors)
+
+    for line, row in iter_rows(lines):
+        result.rows += 1
+        try:
+            pending.append(parser.parse(row))
+        except Exception as exc:  # one bad row must not stop the import
+            message = str(exc) if isinstance(exc, RowError) else f"{type(exc).__name__}: {exc}"
+            result.n_errors += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(RejectedRow(line, message))
+        if len(pending) >= batch_size:
+            flush()
+    flush()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .api import open_source
+    from .board_registry import BoardRegistry
+
+    parser = argparse.ArgumentParser(prog="timeboard-import", description="Import events from a CSV file.")
+    parser.add_argument("csv", help="CSV file ('-' for stdin)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="SQLite event store (default: timeboard.db)")
+    source.add_argument("--journal", help="Journal directory")
+    parser.add_argument("--default-tz", default="UTC", help="Zone for rows without reference_tz (default: UTC)")
+    parser.add_argument("--any-zone", action="store_true", help="Accept any IANA zone, not only catalog zones")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Events per commit (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without importing")
+    args = parser.parse_args(argv)
+
+    repository = None
+    if not args.dry_run:
+        registry = BoardRegistry()
+        registry.register("import", open_source(args.db, args.journal))
+        repository = EventRepository(registry, "import")
+
+    def progress(rows: int, imported: int, errors: int):
+        print(f"\r{rows} rows, {imported} imported, {errors} error(s)", end="", file=sys.stderr, flush=True)
+
+    f = sys.stdin if args.csv == "-" else open(args.csv, newline="", encoding="utf-8-sig")
+    try:
+        result = import_csv(
+            f, repository, args.default_tz, catalog=None if args.any_zone else AVAILABLE_TIMEZONES,
+            batch_size=args.batch_size, progress=progress,
+        )
+    except ValueError as exc:
+        print(f"FAILED: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    print(file=sys.stderr)
+
+    for error in result.errors:
+        print(f"line {error.line}: {error.message}", file=sys.stderr)
+    if result.n_errors > len(result.errors):
+        print(f"... and {result.n_errors - len(result.errors)} more error(s)", file=sys.stderr)
+    verb = "Validated" if args.dry_run else "Imported"
+    print(f"{verb} {result.imported} of {result.rows} row(s), {result.n_errors} error(s)")
+    return 1 if result.n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# timeboard_core/daily_aggregate.py
+"""
+Booked seconds per local day (and category), kept up to date incrementally.
+
+`DailyAggregate` holds one per-day array per category over a span of
+local days (one calendar year for the heatmap). `sync(version, events)`
+diffs a board version against the events it last saw: only added,
+removed or edited rules are expanded (removal re-expands the old rule
+with a negative sign), so an edit costs that rule's occurrences and a
+365-cell view is a slice of arrays, never a per-day expansion.
+"""
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+
+from .events import Event, rule_signature
+from .occurrence_sets import date_of_day, day_of_date
+from .time_accounting import accumulate_event, day_bounds
+
+
+class DailyAggregate:
+
+    def __init__(self, tz: str, first: date, last: date):
+        self.tz = tz
+        self.first_day = day_of_date(first)
+        self.n_days = day_of_date(last) - self.first_day + 1
+        self.version: Optional[int] = None
+        self._bounds = day_bounds(tz, self.first_day, self.n_days)
+        self._lock = threading.Lock()
+        self.by_category: Dict[str, array] = {}
+        self._events: Dict[str, Tuple[tuple, Event]] = {}
+
+    def _add(self, event: Event, sign: int):
+        if event.duration_min <= 0:
+            return
+        days = self.by_category.get(event.category_id)
+        if days is None:
+            days = self.by_category[event.category_id] = array("q", bytes(8 * self.n_days))
+        accumulate_event(days, event, self.first_day, self._bounds, sign)
+
+    def sync(self, version: Optional[int], events: Iterable[Event]) -> int:
+        """
+        Apply the difference between the last synced events and `events`;
+        returns the number of changed events. A repeated version is a no-op.
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            current = {e.id: e for e in events}
+            changed = 0
+            for event_id in [i for i in self._events if i not in current]:
+                self._add(self._events.pop(event_id)[1], -1)
+                changed += 1
+            for event_id, event in current.items():
+                signature = rule_signature(event)
+                known = self._events.get(event_id)
+                if known is not None and known[0] == signature:
+                    continue
+                if known is not None:
+                    self._add(known[1], -1)
+                self._add(event, +1)
+                self._events[event_id] = (signature, event)
+                changed += 1
+            self.version = version
+            return changed
+
+    # --- Queries ------------------------------------------------
+
+    def categories(self) -> List[str]:
+        return [c for c, days in self.by_category.items() if any(days)]
+
+    def seconds_per_day(self, category_id: Optional[str] = None) -> List[int]:
+        """Booked seconds for every day of the span (all categories when None)."""
+        if category_id is not None:
+            days = self.by_category.get(category_id)
+            return days.tolist() if days is not None else [0] * self.n_days
+        with self._lock:
+            return [sum(column) for column in zip(*self.by_category.values())] or [0] * self.n_days
+
+    def daily_hours(self, category_id: Optional[str] = None) -> List[Tuple[date, float]]:
+        """(date, hours) for every day of the span."""
+        return [
+            (date_of_day(self.first_day + i), seconds / 3600)
+            for i, seconds in enumerate(self.seconds_per_day(category_id))
+        ]
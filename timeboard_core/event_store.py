@@ -0,0 +1,514 @@
+# timeboard_core/event_store.py
+"""
+Persistent event store on stdlib sqlite3 (WAL mode).
+
+Events are stored one row per rule with id-based CRUD. Every row also
+carries the UTC day range in which the rule can produce occurrences
+(`start_day`/`end_day`, epoch days, NULL = forever), indexed so that
+`events_in_range` only loads rules whose validity window intersects the
+visible days.
+
+Optionally the store also keeps a materialized `occurrences` table for a
+rolling horizon around today (default -90 .. +365 days). It is built once
+by `ensure_horizon`, maintained per rule on add/update/delete, and
+extended/trimmed day-by-day as the horizon moves. Timeline windows
+(`window_occurrences`) and free-slot searches (`occurrence_rows`, via
+`queries.busy_intervals`) read it whenever it covers their range.
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo
+import json
+import os
+import sqlite3
+import threading
+
+from .events import Event, instantiate_for_day
+from .timeline_layout import collect_occurrences
+
+UTC = ZoneInfo("UTC")
+EPOCH_DATE = date(1970, 1, 1)
+MIN_DAY = (date.min - EPOCH_DATE).days  # "no lower bound"
+
+DEFAULT_DB_PATH = os.environ.get("TIMEBOARD_DB", "timeboard.db")
+DEFAULT_MATERIALIZE = os.environ.get("TIMEBOARD_MATERIALIZE", "") not in ("", "0")
+
+# Rolling horizon of the occurrence table, in days around today
+HORIZON_PAST_DAYS = 90
+HORIZON_FUTURE_DAYS = 365
+
+# Occurrences start on their day and may run into the next one
+MAX_OCCURRENCE_SPAN_DAYS = 1
+# ... where "their day" (the `day` column) may also be the UTC day before
+# the start: recurrences keep the UTC day of their first start's local
+# date, and a DST change can push later starts past UTC midnight
+OCCURRENCE_LOOKBACK_DAYS = MAX_OCCURRENCE_SPAN_DAYS + 1
+
+SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id            TEXT PRIMARY KEY,
+    title         TEXT NOT NULL,
+    category_id   TEXT NOT NULL,
+    start_utc     INTEGER NOT NULL,   -- epoch seconds
+    duration_min  INTEGER NOT NULL,
+    color         TEXT NOT NULL,
+    reminders_min TEXT NOT NULL,      -- JSON list
+    recurrence    TEXT NOT NULL,
+    weekday       INTEGER,
+    month_day     INTEGER,
+    reference_tz  TEXT NOT NULL,
+    start_date    INTEGER,            -- epoch seconds
+    end_date      INTEGER,            -- epoch seconds
+    start_day     INTEGER NOT NULL,   -- first possible occurrence day (epoch days, UTC)
+    end_day       INTEGER             -- last possible occurrence day, NULL = forever
+);
+CREATE INDEX IF NOT EXISTS idx_events_dates ON events (start_day, end_day);
+CREATE INDEX IF NOT EXISTS idx_events_recurrence ON events (recurrence);
+CREATE INDEX IF NOT EXISTS idx_events_category ON events (category_id);
+"""
+
+_OCCURRENCE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS occurrences (
+    event_id    TEXT NOT NULL,
+    day         INTEGER NOT NULL,     -- UTC day passed to instantiate_for_day (epoch days)
+    start_ts    INTEGER NOT NULL,     -- epoch seconds
+    end_ts      INTEGER NOT NULL,
+    category_id TEXT NOT NULL,
+    PRIMARY KEY (event_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_occurrences_day ON occurrences (day);
+CREATE INDEX IF NOT EXISTS idx_occurrences_start ON occurrences (start_ts);
+CREATE TABLE IF NOT EXISTS occurrence_horizon (
+    id        INTEGER PRIMARY KEY CHECK (id = 1),
+    first_day INTEGER NOT NULL,
+    last_day  INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "id", "title", "category_id", "start_utc", "duration_min", "color",
+    "reminders_min", "recurrence", "weekday", "month_day", "reference_tz",
+    "start_date", "end_date", "start_day", "end_day", "revision",
+)
+
+
+# --- Conversion helpers ----------------------------------------
+
+def epoch_day(dt: datetime) -> int:
+    """UTC calendar day of `dt` as days since 1970-01-01."""
+    return (dt.astimezone(UTC).date() - EPOCH_DATE).days
+
+
+def day_start_utc(day: int) -> datetime:
+    """UTC midnight of an epoch day."""
+    return datetime(1970, 1, 1, tzinfo=UTC) + timedelta(days=day)
+
+
+def _to_ts(dt: Optional[datetime]) -> Optional[int]:
+    return int(dt.timestamp()) if dt is not None else None
+
+
+def _from_ts(ts: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts, tz=UTC) if ts is not None else None
+
+
+def event_day_window(event: Event):
+    """
+    (start_day, end_day) in epoch days on which `instantiate_for_day`
+    can return an occurrence; end_day is None for open-ended rules.
+    """
+    if event.recurrence == "once" or event.recurrence is None:
+        day = epoch_day(event.start_utc)
+        return day, day
+    # Recurrences run on reference-zone dates, which may map to the
+    # neighbouring UTC day (see events.wall_clock_anchor)
+    start_day = epoch_day(event.start_date) - 1 if event.start_date is not None else MIN_DAY
+    end_day = epoch_day(event.end_date) + 1 if event.end_date is not None else None
+    return start_day, end_day
+
+
+def _event_to_row(event: Event) -> tuple:
+    start_day, end_day = event_day_window(event)
+    return (
+        event.id,
+        event.title,
+        event.category_id,
+        _to_ts(event.start_utc),
+        event.duration_min,
+        event.color,
+        json.dumps(list(event.reminders_min)),
+        event.recurrence or "once",
+        event.weekday,
+        event.month_day,
+        event.reference_tz,
+        _to_ts(event.start_date),
+        _to_ts(event.end_date),
+        start_day,
+        end_day,
+        event.revision,
+    )
+
+
+def _expand_rows(event: Event, first_day: int, last_day: int) -> List[tuple]:
+    """Occurrence rows of one rule for the epoch days first_day..last_day."""
+    start_day, end_day = event_day_window(event)
+    first_day = max(first_day, start_day)
+    if end_day is not None:
+        last_day = min(last_day, end_day)
+
+    rows = []
+    for day in range(first_day, last_day + 1):
+        inst = instantiate_for_day(event, day_start_utc(day))
+        if inst is None:
+            continue
+        start_ts = _to_ts(inst.start_utc)
+        rows.append((event.id, day, start_ts, start_ts + inst.duration_min * 60, event.category_id))
+    return rows
+
+
+def _row_to_event(row: sqlite3.Row) -> Event:
+    return Event(
+        id=row["id"],
+        title=row["title"],
+        category_id=row["category_id"],
+        start_utc=_from_ts(row["start_utc"]),
+        duration_min=row["duration_min"],
+        color=row["color"],
+        reminders_min=json.loads(row["reminders_min"]),
+        recurrence=row["recurrence"],
+        weekday=row["weekday"],
+        month_day=row["month_day"],
+        reference_tz=row["reference_tz"],
+        start_date=_from_ts(row["start_date"]),
+        end_date=_from_ts(row["end_date"]),
+        revision=row["revision"],
+    )
+
+
+# --- Store -----------------------------------------------------
+
+class EventStore:
+    """
+    sqlite3-backed event repository.
+
+    One connection is shared by all threads (Streamlit reruns scripts on
+    worker threads), serialized by a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, materialize: bool = False):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._horizon = self._load_horizon()
+        self._data_version = None
+        if materialize:
+            self.ensure_horizon()
+
+    def _migrate(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._conn.executescript(_SCHEMA)
+            if version < 2:
+                self._conn.executescript(_OCCURRENCE_SCHEMA)
+            if version < 3:
+                self._conn.execute("ALTER TABLE events ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            if 2 <= version < 4:
+                # Recurrences moved to reference-zone wall-clock time: widen the
+                # stored day windows and re-expand occurrences on next use
+                rows = self._conn.execute("SELECT * FROM events").fetchall()
+                self._conn.executemany(
+                    "UPDATE events SET start_day = ?, end_day = ? WHERE id = ?",
+                    [event_day_window(_row_to_event(r)) + (r["id"],) for r in rows],
+                )
+                self._conn.execute("DELETE FROM occurrences")
+                self._conn.execute("DELETE FROM occurrence_horizon")
+            if version < SCHEMA_VERSION:
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- CRUD ---------------------------------------------------
+
+    def add(self, event: Event) -> Event:
+        self.add_many([event])
+        return event
+
+    def add_many(self, events: Iterable[Event]) -> int:
+        """Insert (or replace) events in one transaction."""
+        events = list(events)
+        rows = [_event_to_row(e) for e in events]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO events ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+            self._rematerialize(events)
+        return len(rows)
+
+    def get(self, event_id: str) -> Optional[Event]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+        return _row_to_event(row) if row else None
+
+    def update(self, event: Event) -> bool:
+        """Replace the stored row for `event.id`; False if it does not exist."""
+        return self.update_many([event]) > 0
+
+    def update_many(self, events: Iterable[Event]) -> int:
+        """Replace existing events in one transaction; unknown ids are skipped."""
+        assignments = ", ".join(f"{c} = ?" for c in _COLUMNS[1:])
+        sql = f"UPDATE events SET {assignments} WHERE id = ?"
+        updated = []
+        with self._lock, self._conn:
+            for event in events:
+                row = _event_to_row(event)
+                if self._conn.execute(sql, row[1:] + (row[0],)).rowcount:
+                    updated.append(event)
+            self._rematerialize(updated)
+        return len(updated)
+
+    def delete(self, event_id: str) -> bool:
+        return self.delete_many([event_id]) > 0
+
+    def delete_many(self, event_ids: Iterable[str]) -> int:
+        params = [(i,) for i in event_ids]
+        with self._lock, self._conn:
+            cur = self._conn.executemany("DELETE FROM events WHERE id = ?", params)
+            if self._horizon is not None:
+                self._conn.executemany("DELETE FROM occurrences WHERE event_id = ?", params)
+        return cur.rowcount
+
+    def data_version(self) -> int:
+        """
+        Changes whenever another connection commits to the database; the
+        occurrence horizon (which another process may have moved) is
+        re-read when it does.
+        """
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self._horizon = self._load_horizon()
+            return version
+
+    # --- Queries ------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def all(self) -> List[Event]:
+        return self.list_events()
+
+    def list_events(self, limit: Optional[int] = None, offset: int = 0) -> List[Event]:
+        """Events ordered by start time, optionally paged."""
+        sql = "SELECT * FROM events ORDER BY start_utc, id"
+        params: tuple = ()
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_event(r) for r in rows]
+
+    def events_in_range(self, start_utc: datetime, end_utc: datetime) -> List[Event]:
+        """
+        Rules that can occur on any UTC day from start_utc to end_utc
+        (inclusive), i.e. whose validity window intersects the view.
+        """
+        first_day = epoch_day(start_utc)
+        last_day = epoch_day(end_utc)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM events "
+                "WHERE start_day <= ? AND (end_day IS NULL OR end_day >= ?) "
+                "ORDER BY start_utc, id",
+                (last_day, first_day),
+            ).fetchall()
+        return [_row_to_event(r) for r in rows]
+
+    def events_by_category(self, category_id: str) -> List[Event]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM events WHERE category_id = ? ORDER BY start_utc, id", (category_id,)
+            ).fetchall()
+        return [_row_to_event(r) for r in rows]
+
+    def events_by_recurrence(self, recurrence: str) -> List[Event]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM events WHERE recurrence = ? ORDER BY start_utc, id", (recurrence,)
+            ).fetchall()
+        return [_row_to_event(r) for r in rows]
+
+    # --- Materialized occurrences -------------------------------
+
+    @property
+    def materialized(self) -> bool:
+        return self._horizon is not None
+
+    @property
+    def horizon(self) -> Optional[tuple]:
+        """(first_day, last_day) of the occurrence table, or None."""
+        return self._horizon
+
+    def _load_horizon(self) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_day, last_day FROM occurrence_horizon WHERE id = 1"
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _rematerialize(self, events: List[Event]):
+        """Re-expand single rules inside the horizon (caller holds the transaction)."""
+        if self._horizon is None:
+            return
+        first_day, last_day = self._horizon
+        self._conn.executemany(
+            "DELETE FROM occurrences WHERE event_id = ?", [(e.id,) for e in events]
+        )
+        for event in events:
+            self._conn.executemany(
+                "INSERT INTO occurrences VALUES (?, ?, ?, ?, ?)",
+                _expand_rows(event, first_day, last_day),
+            )
+
+    def _materialize_days(self, first_day: int, last_day: int):
+        """Expand every rule active on first_day..last_day (caller holds the transaction)."""
+        if last_day < first_day:
+            return
+        rows = self._conn.execute(
+            "SELECT * FROM events WHERE start_day <= ? AND (end_day IS NULL OR end_day >= ?)",
+            (last_day, first_day),
+        ).fetchall()
+        for row in rows:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO occurrences VALUES (?, ?, ?, ?, ?)",
+                _expand_rows(_row_to_event(row), first_day, last_day),
+            )
+
+    def ensure_horizon(
+        self,
+        today_utc: Optional[datetime] = None,
+        past_days: int = HORIZON_PAST_DAYS,
+        future_days: int = HORIZON_FUTURE_DAYS,
+    ) -> tuple:
+        """
+        Make the occurrence table cover today-past_days .. today+future_days.
+
+        The first call builds the table; later calls only expand the days
+        that entered the horizon and drop the days that left it.
+        """
+        today = epoch_day(today_utc or datetime.now(tz=UTC))
+        new_first, new_last = today - past_days, today + future_days
+        if self._horizon == (new_first, new_last):
+            # Same day: no lock or transaction (this runs on every app rerun)
+            return self._horizon
+
+        with self._lock, self._conn:
+            if self._horizon == (new_first, new_last):
+                return self._horizon
+
+            if self._horizon is None:
+                self._materialize_days(new_first, new_last)
+            else:
+                old_first, old_last = self._horizon
+                if new_last < old_first or new_first > old_last:
+                    # Jumped past the old horizon: nothing to keep
+                    self._conn.execute("DELETE FROM occurrences")
+                    self._materialize_days(new_first, new_last)
+                else:
+                    self._materialize_days(new_first, old_first - 1)
+                    self._materialize_days(old_last + 1, new_last)
+                    self._conn.execute(
+                        "DELETE FROM occurrences WHERE day < ? OR day > ?", (new_first, new_last)
+                    )
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO occurrence_horizon (id, first_day, last_day) VALUES (1, ?, ?)",
+                (new_first, new_last),
+            )
+            self._horizon = (new_first, new_last)
+        return self._horizon
+
+    def drop_occurrences(self):
+        """Turn materialization off and discard the occurrence table."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM occurrences")
+            self._conn.execute("DELETE FROM occurrence_horizon")
+            self._horizon = None
+
+    def covers(self, start_utc: datetime, end_utc: datetime) -> bool:
+        """True if the occurrence table holds every day from start_utc to end_utc."""
+        if self._horizon is None:
+            return False
+        first_day, last_day = self._horizon
+        return first_day <= epoch_day(start_utc) and epoch_day(end_utc) <= last_day
+
+    def window_occurrences(self, start_utc: datetime, days: int) -> List[Event]:
+        """
+        Occurrences for `days` + 1 UTC days from `start_utc`, in the same
+        order as `collect_occurrences`: read from the occurrence table when
+        the horizon covers the window, expanded on the fly otherwise.
+        """
+        end_utc = start_utc + timedelta(days=days)
+        if not self.covers(start_utc, end_utc):
+            return collect_occurrences(self.events_in_range(start_utc, end_utc), start_utc, days)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT e.*, o.start_ts AS occ_start FROM occurrences o "
+                "JOIN events e ON e.id = o.event_id "
+                "WHERE o.day BETWEEN ? AND ? "
+                "ORDER BY o.day, e.start_utc, e.id",
+                (epoch_day(start_utc), epoch_day(end_utc)),
+            ).fetchall()
+
+        occurrences = []
+        for row in rows:
+            event = _row_to_event(row)
+            event.start_utc = _from_ts(row["occ_start"])
+            occurrences.append(event)
+        return occurrences
+
+    def occurrence_rows(
+        self,
+        start_utc: datetime,
+        end_utc: datetime,
+        category_id: Optional[str] = None,
+    ) -> List[tuple]:
+        """
+        (event_id, start_ts, end_ts, category_id) of materialized
+        occurrences overlapping [start_utc, end_utc), ordered by start.
+        Intended for analytics, reminders and free-slot searches.
+        """
+        if not self.covers(start_utc - timedelta(days=OCCURRENCE_LOOKBACK_DAYS), end_utc):
+            raise ValueError("Range is outside the materialized occurrence horizon")
+
+        sql = (
+            "SELECT event_id, start_ts, end_ts, category_id FROM occurrences "
+            "WHERE day BETWEEN ? AND ? AND start_ts < ? AND end_ts > ?"
+        )
+        params = [
+            epoch_day(start_utc) - OCCURRENCE_LOOKBACK_DAYS,
+            epoch_day(end_utc),
+            _to_ts(end_utc),
+            _to_ts(start_utc),
+        ]
+        if category_id is not None:
+            sql += " AND category_id = ?"
+            params.append(category_id)
+        sql += " ORDER BY start_ts, event_id"
+        with self._lock:
+            return [tuple(r) for r in self._conn.execute(sql, params).fetchall()]
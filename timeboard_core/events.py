@@ -1,9 +1,25 @@
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict
 from zoneinfo import ZoneInfo
 import uuid
 
+from .calendar_tables import calendar_table, week_of_month
+from .tz_tables import SECONDS_PER_DAY, UTC, zone_table
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_CALENDAR = calendar_table()
+
+# Per-rule wall-clock anchors by id(event) (see wall_clock_anchor)
+_ANCHOR_CACHE: Dict[int, tuple] = {}
+_ANCHOR_CACHE_SIZE = 65536
+
+# A rule's local date is its UTC day shifted by at most one day, so these
+# UTC weekday distances / days of month can never match (see instantiate_for_day)
+_NEAR_WEEKDAY = frozenset((0, 1, 6))
+_NEAR_BIMONTHLY = frozenset((28, 29, 30, 31, 1, 2, 14, 15, 16))
+_WEEKDAY_RULES = frozenset(("weekly", "biweekly", "monthly_weekday", "monthly_last_weekday"))
+
 # --- Defaults -------------------------------------------------
 
 DEFAULT_REMINDERS_MIN = [30, 10]  # 30 min & 10 min before event
@@ -99,6 +115,7 @@ RECURRENCE_TYPES = {
     "biweekly": "Every 2 weeks",
     "monthly_date": "Monthly (same date)",
     "monthly_weekday": "Monthly (same weekday)",
+    "monthly_last_weekday": "Monthly (last weekday, e.g. last Friday)",
     "bimonthly": "2x per month (1st & 15th)",
 }
 
@@ -120,8 +137,8 @@ class Event:
     )
 
     # Recurrence settings
-    recurrence: str = "once"  # once | daily | weekly | biweekly | monthly_date | monthly_weekday | bimonthly
-    weekday: Optional[int] = None     # 0=Mon .. 6=Sun (for weekly/biweekly/monthly_weekday)
+    recurrence: str = "once"  # once | daily | weekly | biweekly | monthly_date | monthly_weekday | monthly_last_weekday | bimonthly
+    weekday: Optional[int] = None     # 0=Mon .. 6=Sun (for weekly/biweekly/monthly_weekday/monthly_last_weekday)
     month_day: Optional[int] = None   # 1-31 (for monthly_date)
     
     # Reference timezone (for display purposes)
@@ -131,6 +148,9 @@ class Event:
     start_date: Optional[datetime] = None  # First occurrence
     end_date: Optional[datetime] = None    # Last occurrence (None = forever)
 
+    # Bumped on every edit (optimistic concurrency for in-place edits)
+    revision: int = 0
+
     @property
     def end_utc(self) -> datetime:
         return self.start_utc + timedelta(minutes=self.duration_min)
@@ -150,6 +170,24 @@ class Event:
         return EVENT_CATEGORIES.get(self.category_id, EVENT_CATEGORIES["custom"])
 
 
+def rule_signature(event: Event) -> tuple:
+    """Fields that decide where and how long an event's occurrences are booked."""
+    return (
+        event.category_id, event.start_utc, event.duration_min, event.recurrence,
+        event.weekday, event.month_day, event.reference_tz, event.start_date, event.end_date,
+    )
+
+
+def category_by_name(name: str) -> Optional[str]:
+    """Category id for an id or a label with or without its icon ("Bible Reading"); None if unknown."""
+    key = name.strip().lower()
+    for category_id, category in EVENT_CATEGORIES.items():
+        label = category["label"].lower()
+        if key in (category_id, label, label.split(" ", 1)[-1]):
+            return category_id
+    return None
+
+
 # --- Factory --------------------------------------------------
 
 def create_event(
@@ -202,6 +240,24 @@ def create_event(
     )
 
 
+def shift_event(event: Event, delta: timedelta) -> Event:
+    """
+    Copy of `event` moved by `delta`, with weekday/month_day re-derived
+    from the new start in the reference timezone (as in create_event).
+    """
+    start_utc = event.start_utc + delta
+    start_local = start_utc.astimezone(ZoneInfo(event.reference_tz))
+    return replace(
+        event,
+        start_utc=start_utc,
+        start_date=event.start_date + delta if event.start_date else None,
+        end_date=event.end_date + delta if event.end_date else None,
+        weekday=start_local.weekday(),
+        month_day=start_local.day,
+        reminders_min=list(event.reminders_min),
+    )
+
+
 # Legacy factory for backwards compatibility
 def create_event_from_local(
     title: str,
@@ -231,29 +287,65 @@ def create_event_from_local(
 
 def _get_nth_weekday_of_month(year: int, month: int, weekday: int, n: int) -> Optional[datetime]:
     """Get the nth occurrence of a weekday in a month (n=1 for first, n=-1 for last)"""
-    if n > 0:
-        # First day of month
-        first_day = datetime(year, month, 1, tzinfo=ZoneInfo("UTC"))
-        # Days until the target weekday
-        days_until = (weekday - first_day.weekday()) % 7
-        # First occurrence
-        first_occurrence = first_day + timedelta(days=days_until)
-        # Nth occurrence
-        target = first_occurrence + timedelta(weeks=n-1)
-        # Check if still in same month
-        if target.month == month:
-            return target
+    day = _CALENDAR.nth_weekday(year, month, weekday, n)
+    if day is None:
         return None
-    else:
-        # Last occurrence - start from next month and go back
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1, tzinfo=ZoneInfo("UTC"))
-        else:
-            next_month = datetime(year, month + 1, 1, tzinfo=ZoneInfo("UTC"))
-        last_day = next_month - timedelta(days=1)
-        # Days back to target weekday
-        days_back = (last_day.weekday() - weekday) % 7
-        return last_day - timedelta(days=days_back)
+    return datetime(year, month, day, tzinfo=ZoneInfo("UTC"))
+
+
+def wall_clock_anchor(event: Event):
+    """
+    (zone table, wall-clock seconds of day, slot shift, first local day,
+    last local day) of a recurring event, memoized per rule definition.
+
+    Occurrences follow the start's wall-clock time in `reference_tz`. The
+    occurrence on local date L is returned for UTC day L + slot shift,
+    the shift being the UTC-vs-local day difference at the first start,
+    so each UTC day maps to exactly one local date.
+    """
+    # Keyed by object identity and validated by the (immutable) field
+    # values' identity: hashing tz-aware datetimes would cost a zone lookup
+    cached = _ANCHOR_CACHE.get(id(event))
+    if (
+        cached is not None
+        and cached[0] is event.start_utc
+        and cached[1] is event.start_date
+        and cached[2] is event.end_date
+        and cached[3] is event.reference_tz
+    ):
+        return cached[4]
+    return _cache_anchor(event)
+
+
+def _utc_seconds(dt: datetime) -> int:
+    """int(dt.timestamp()), without the tzinfo call for whole-second UTC datetimes."""
+    if dt.tzinfo is not UTC or dt.microsecond:
+        return int(dt.timestamp())
+    return (dt.toordinal() - _EPOCH_ORDINAL) * SECONDS_PER_DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+def _cache_anchor(event: Event):
+    table = zone_table(event.reference_tz or "UTC")
+    start_ts = _utc_seconds(event.start_utc)
+    local = table.to_local(start_ts)
+    first_day = last_day = None
+    if event.start_date is event.start_utc:
+        first_day = local // SECONDS_PER_DAY
+    elif event.start_date:
+        first_day = table.to_local(_utc_seconds(event.start_date)) // SECONDS_PER_DAY
+    if event.end_date:
+        last_day = table.to_local(_utc_seconds(event.end_date)) // SECONDS_PER_DAY
+    anchor = (
+        table,
+        local % SECONDS_PER_DAY,
+        start_ts // SECONDS_PER_DAY - local // SECONDS_PER_DAY,
+        first_day,
+        last_day,
+    )
+    if len(_ANCHOR_CACHE) >= _ANCHOR_CACHE_SIZE:
+        _ANCHOR_CACHE.clear()
+    _ANCHOR_CACHE[id(event)] = (event.start_utc, event.start_date, event.end_date, event.reference_tz, anchor)
+    return anchor
 
 
 def instantiate_for_day(
@@ -263,129 +355,138 @@ def instantiate_for_day(
     """
     Returns a concrete Event instance for the given UTC day,
     or None if the event does not occur on that day.
+    
+    Recurring events keep their wall-clock time in `reference_tz` across
+    DST changes; the recurrence and date-range tests use the local date.
     """
     
-    # Check date range if set
-    if event.start_date:
-        if day_utc.date() < event.start_date.date():
+    recurrence = event.recurrence
+
+    # --- ONCE (no recurrence) ---
+    if recurrence == "once" or recurrence is None:
+        # Check if this is the day of the event (first: it rejects most days)
+        day_date = day_utc.date()
+        if event.start_utc.date() != day_date:
             return None
-    
-    if event.end_date:
-        if day_utc.date() > event.end_date.date():
+        if event.start_date and day_date < event.start_date.date():
+            return None
+        if event.end_date and day_date > event.end_date.date():
             return None
+        return event
 
-    # --- ONCE (no recurrence) ---
-    if event.recurrence == "once" or event.recurrence is None:
-        # Check if this is the day of the event
-        if event.start_utc.date() == day_utc.date():
-            return event
-        return None
+    # Most days are rejected on the UTC day alone, before the anchor lookup:
+    # the local date is at most one day off
+    day_ordinal = day_utc.toordinal()
+    if recurrence in _WEEKDAY_RULES:
+        if event.weekday is None or (day_ordinal + 6 - event.weekday) % 7 not in _NEAR_WEEKDAY:
+            return None
+    elif recurrence == "bimonthly":
+        if day_utc.day not in _NEAR_BIMONTHLY:
+            return None
+    elif recurrence == "monthly_date":
+        month_day = event.month_day
+        if month_day is None:
+            return None
+        dom = day_utc.day
+        if abs(dom - month_day) > 1 and not (dom == 1 and month_day >= 28 or month_day == 1 and dom >= 28):
+            return None
 
+    # wall_clock_anchor, inlined: this is the hot path of every expansion
+    cached = _ANCHOR_CACHE.get(id(event))
+    if (
+        cached is not None
+        and cached[0] is event.start_utc
+        and cached[1] is event.start_date
+        and cached[2] is event.end_date
+        and cached[3] is event.reference_tz
+    ):
+        table, wall, slot_shift, start_day, end_day = cached[4]
+    else:
+        table, wall, slot_shift, start_day, end_day = _cache_anchor(event)
+    day = day_ordinal - _EPOCH_ORDINAL - slot_shift   # local date in reference_tz
+    
+    # Check date range if set (local dates)
+    if start_day is not None and day < start_day:
+        return None
+    
+    if end_day is not None and day > end_day:
+        return None
+    
+    weekday = (day + 3) % 7   # 1970-01-01 was a Thursday
+    
     # --- DAILY ---
-    if event.recurrence == "daily":
-        start = event.start_utc.replace(
-            year=day_utc.year,
-            month=day_utc.month,
-            day=day_utc.day
-        )
-        return Event(**{**event.__dict__, "start_utc": start})
+    if recurrence == "daily":
+        pass
 
     # --- WEEKLY ---
-    if event.recurrence == "weekly":
-        if event.weekday is None:
-            return None
-
-        if day_utc.weekday() != event.weekday:
+    elif recurrence == "weekly":
+        if event.weekday is None or weekday != event.weekday:
             return None
 
-        start = event.start_utc.replace(
-            year=day_utc.year,
-            month=day_utc.month,
-            day=day_utc.day
-        )
-        return Event(**{**event.__dict__, "start_utc": start})
-
     # --- BIWEEKLY (every 2 weeks) ---
-    if event.recurrence == "biweekly":
+    elif recurrence == "biweekly":
         if event.weekday is None or event.start_date is None:
             return None
         
-        if day_utc.weekday() != event.weekday:
+        if weekday != event.weekday:
             return None
         
-        # Calculate weeks since start
-        days_diff = (day_utc.date() - event.start_date.date()).days
-        weeks_diff = days_diff // 7
-        
-        # Check if it's an even week (0, 2, 4, ...)
-        if weeks_diff % 2 != 0:
+        # Check if it's an even week (0, 2, 4, ...) since the start
+        if ((day - start_day) // 7) % 2 != 0:
             return None
-        
-        start = event.start_utc.replace(
-            year=day_utc.year,
-            month=day_utc.month,
-            day=day_utc.day
-        )
-        return Event(**{**event.__dict__, "start_utc": start})
 
     # --- MONTHLY (same date) ---
-    if event.recurrence == "monthly_date":
-        if event.month_day is None:
-            return None
-        
-        if day_utc.day != event.month_day:
-            return None
-        
-        try:
-            start = event.start_utc.replace(
-                year=day_utc.year,
-                month=day_utc.month,
-                day=day_utc.day
-            )
-            return Event(**{**event.__dict__, "start_utc": start})
-        except ValueError:
-            # Day doesn't exist in this month (e.g., 31st in February)
+    elif recurrence == "monthly_date":
+        # Days that don't exist in a month (e.g., 31st in February) are skipped
+        if event.month_day is None or _CALENDAR.day_of_month(day) != event.month_day:
             return None
 
     # --- MONTHLY (same weekday, e.g., "2nd Tuesday") ---
-    if event.recurrence == "monthly_weekday":
+    elif recurrence == "monthly_weekday":
         if event.weekday is None or event.start_date is None:
             return None
         
-        if day_utc.weekday() != event.weekday:
+        if weekday != event.weekday:
             return None
         
-        # Determine which occurrence of this weekday in the month
-        # the original event was (1st, 2nd, 3rd, 4th, or last)
-        original_day = event.start_date.day
-        original_week = (original_day - 1) // 7 + 1  # 1-based week number
-        
-        # Check if this day is the same week occurrence
-        day_week = (day_utc.day - 1) // 7 + 1
-        
-        if day_week != original_week:
+        # Same week-of-month occurrence (1st, 2nd, ...) as the first event
+        if week_of_month(_CALENDAR.day_of_month(day)) != week_of_month(_CALENDAR.day_of_month(start_day)):
+            return None
+
+    # --- MONTHLY (last weekday, e.g., "last Friday") ---
+    elif recurrence == "monthly_last_weekday":
+        if event.weekday is None or weekday != event.weekday:
             return None
         
-        start = event.start_utc.replace(
-            year=day_utc.year,
-            month=day_utc.month,
-            day=day_utc.day
-        )
-        return Event(**{**event.__dict__, "start_utc": start})
+        if not _CALENDAR.is_last_weekday(day):
+            return None
 
     # --- BIMONTHLY (1st and 15th) ---
-    if event.recurrence == "bimonthly":
-        if day_utc.day not in [1, 15]:
+    elif recurrence == "bimonthly":
+        if _CALENDAR.day_of_month(day) not in (1, 15):
             return None
-        
-        start = event.start_utc.replace(
-            year=day_utc.year,
-            month=day_utc.month,
-            day=day_utc.day
-        )
-        return Event(**{**event.__dict__, "start_utc": start})
 
-    return None
+    else:
+        return None
+
+    tzinfo = event.start_utc.tzinfo
+    if tzinfo is UTC:
+        start = table.utc_datetime(day * SECONDS_PER_DAY + wall)
+    else:
+        start = datetime.fromtimestamp(table.to_utc(day * SECONDS_PER_DAY + wall), tzinfo)
+    return _with_start(event, start)
+
+
+def _with_start(event: Event, start_utc: datetime) -> Event:
+    """
+    Occurrence of `event` starting at `start_utc`: a shallow copy like
+    `Event(**fields)`, without running `__init__` (the costliest step of
+    an expansion).
+    """
+    occurrence = object.__new__(Event)
+    occurrence.__dict__.update(event.__dict__)
+    occurrence.start_utc = start_utc
+    return occurrence
 
 
 # --- Helper Functions ----------------------------------------
@@ -421,6 +522,9 @@ def format_recurrence(event: Event) -> str:
             ordinal = ["1st", "2nd", "3rd", "4th", "5th"][week_num - 1] if week_num <= 5 else f"{week_num}th"
             return f"Monthly on the {ordinal} {day_name}"
         return f"Monthly on {day_name}"
+    elif event.recurrence == "monthly_last_weekday":
+        day_name = WEEKDAY_NAMES[event.weekday] if event.weekday is not None else "?"
+        return f"Monthly on the last {day_name}"
     elif event.recurrence == "bimonthly":
         return "Twice monthly (1st & 15th)"
     return event.recurrence
@@ -0,0 +1,209 @@
+# timeboard_core/export.py
+"""
+Headless batch export of board timelines to static HTML/SVG files.
+
+Usage:
+    python -m timeboard_core.export boards/*.json --out exports/
+    python -m timeboard_core.export boards/ --format svg --workers 8
+
+Each board JSON holds {"name", "settings", "events"} (see
+`timeboard_core.board`). Boards are rendered on a process pool; workers
+receive only file paths, load and render their board, and write the
+output themselves so nothing large is pickled back. Outputs are named
+`<board file stem>_<start day>.<format>`; boards whose names would
+collide (same stem in different directories) get a `-2`, `-3`, ...
+suffix in input order.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import argparse
+import glob
+import os
+import sys
+import time
+
+from .board import Board, load_board
+from .settings import ZOOM_LEVELS
+from .timeline_html import standalone_html, timeline_svg
+from .timeline_layout import build_timeline_layout
+
+EXPORT_FORMATS = ("html", "svg")
+
+
+@dataclass
+class ExportResult:
+    source: str
+    output: str = ""
+    board: str = ""
+    n_events: int = 0
+    n_bytes: int = 0
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def week_start_utc(day: datetime) -> datetime:
+    """UTC midnight of the Monday of `day`'s week."""
+    day = day.astimezone(ZoneInfo("UTC")).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def render_board(
+    board: Board,
+    start_utc: datetime,
+    now_utc: datetime,
+    fmt: str = "html",
+    zoom_level: Optional[str] = "week",
+) -> str:
+    """Render one board's timeline starting at `start_utc`."""
+    settings = board.settings
+    if zoom_level:
+        settings.zoom_level = zoom_level
+
+    layout = build_timeline_layout(
+        settings.active_timezones,
+        settings,
+        board.events,
+        start_utc,
+        now_utc,
+    )
+    if fmt == "svg":
+        return timeline_svg(layout, title=board.name)
+    return standalone_html(layout, title=board.name)
+
+
+def _export_one(job: Tuple[str, str, str, datetime, datetime, Optional[str]]) -> ExportResult:
+    source, output, fmt, start_utc, now_utc, zoom_level = job
+    result = ExportResult(source=source)
+    t0 = time.perf_counter()
+    try:
+        board = load_board(source)
+        content = render_board(board, start_utc, now_utc, fmt, zoom_level)
+        data = content.encode("utf-8")
+        with open(output, "wb") as fh:
+            fh.write(data)
+        result.board = board.name
+        result.output = output
+        result.n_events = len(board.events)
+        result.n_bytes = len(data)
+    except Exception as exc:  # one bad board must not stop the batch
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.elapsed_ms = (time.perf_counter() - t0) * 1000
+    return result
+
+
+def _expand_sources(sources: List[str]) -> List[str]:
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, "*.json")) + glob.glob(os.path.join(source, "*.tbb"))))
+        else:
+            paths.extend(sorted(glob.glob(source)) or [source])
+    return paths
+
+
+def _output_paths(sources: List[str], out_dir: str, fmt: str, start_utc: datetime) -> List[str]:
+    """One output file per source, unique even when board file stems repeat."""
+    outputs, taken = [], set()
+    for source in sources:
+        stem = f"{os.path.splitext(os.path.basename(source))[0]}_{start_utc:%Y-%m-%d}"
+        name, n = stem, 1
+        while name.lower() in taken:       # case-insensitive file systems
+            n += 1
+            name = f"{stem}-{n}"
+        taken.add(name.lower())
+        outputs.append(os.path.join(out_dir, f"{name}.{fmt}"))
+    return outputs
+
+
+def export_boards(
+    sources: List[str],
+    out_dir: str,
+    fmt: str = "html",
+    start_utc: Optional[datetime] = None,
+    now_utc: Optional[datetime] = None,
+    zoom_level: Optional[str] = "week",
+    workers: Optional[int] = None,
+) -> Iterator[ExportResult]:
+    """
+    Export every board in `sources` to `out_dir`; returns an iterator of
+    ExportResults, one per board as it completes (in input order). Bad
+    arguments raise ValueError right away, before anything is rendered.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if zoom_level is not None and zoom_level not in ZOOM_LEVELS:
+        raise ValueError(f"Unknown zoom level: {zoom_level}")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    now_utc = now_utc or datetime.now(tz=ZoneInfo("UTC"))
+    start_utc = start_utc or week_start_utc(now_utc)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = _expand_sources(sources)
+    jobs = [(path, output, fmt, start_utc, now_utc, zoom_level)
+            for path, output in zip(paths, _output_paths(paths, out_dir, fmt, start_utc))]
+    return _run_jobs(jobs, workers)
+
+
+def _run_jobs(jobs: List[tuple], workers: Optional[int]) -> Iterator[ExportResult]:
+    if not jobs:
+        return
+
+    if workers == 1:
+        for job in jobs:
+            yield _export_one(job)
+        return
+
+    n_workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (n_workers * 4))
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield from pool.map(_export_one, jobs, chunksize=chunksize)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="timeboard-export",
+        description="Render board timelines to standalone HTML/SVG files.",
+    )
+    parser.add_argument("sources", nargs="+", help="Board JSON files, globs or directories")
+    parser.add_argument("--out", default="exports", help="Output directory (default: exports)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="html")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD, UTC); default: Monday of this week")
+    parser.add_argument("--zoom", default="week", choices=list(ZOOM_LEVELS) + ["board"],
+                        help="Zoom level override; 'board' keeps each board's setting (default: week)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    start_utc = None
+    if args.start:
+        start_utc = datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=ZoneInfo("UTC"))
+    zoom_level = None if args.zoom == "board" else args.zoom
+
+    t0 = time.perf_counter()
+    n_ok = n_failed = 0
+    for result in export_boards(args.sources, args.out, args.format, start_utc,
+                                zoom_level=zoom_level, workers=args.workers):
+        if result.error:
+            n_failed += 1
+            print(f"FAILED {result.source}: {result.error}", file=sys.stderr)
+            continue
+        n_ok += 1
+        if not args.quiet:
+            print(f"{result.elapsed_ms:8.1f} ms  {result.n_events:6d} events  "
+                  f"{result.n_bytes:9d} B  {result.output}")
+    elapsed = time.perf_counter() - t0
+
+    print(f"Exported {n_ok} board(s) in {elapsed:.2f}s"
+          + (f", {n_failed} failed" if n_failed else ""))
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
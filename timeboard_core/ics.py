@@ -0,0 +1,331 @@
+# timeboard_core/ics.py
+"""
+iCalendar (.ics) VEVENTs as TimeBoard events (standard library only).
+
+`split_vevents` cuts a calendar into raw VEVENT blocks without parsing
+them, so callers can hash blocks and convert only the ones that changed;
+`vevent_to_events` converts one block with `create_event` semantics.
+Recurrence rules map onto the board's recurrence types:
+
+    FREQ=DAILY                      -> daily
+    FREQ=WEEKLY (INTERVAL=1 / 2)    -> weekly / biweekly (one event per BYDAY)
+    FREQ=MONTHLY;BYMONTHDAY=d       -> monthly_date
+    FREQ=MONTHLY;BYMONTHDAY=1,15    -> bimonthly
+    FREQ=MONTHLY;BYDAY=2TU / -1FR   -> monthly_weekday / monthly_last_weekday
+
+UNTIL and COUNT become the end date. Anything else (yearly rules, other
+intervals, EXDATE, RECURRENCE-ID overrides) is imported as its first
+occurrence only, with a warning.
+
+Board events last at most a day (MAX_DURATION_MIN). A longer single
+event (a multi-day all-day DTEND, a long DURATION) is split into one
+event per local day of its zone; a longer recurring one is cut to a day,
+with a warning.
+"""
+from dataclasses import replace
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import re
+
+from .event_store import MAX_OCCURRENCE_SPAN_DAYS
+from .events import Event, category_by_name, create_event
+from .series import end_date_for_count
+
+UTC = ZoneInfo("UTC")
+# Longest board event (the event form's cap as well)
+MAX_DURATION_MIN = MAX_OCCURRENCE_SPAN_DAYS * 1440
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_DURATION = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+_BYDAY = re.compile(r"^([+-]?\d)?(MO|TU|WE|TH|FR|SA|SU)$")
+_TEXT_ESCAPES = {"n": "\n", "N": "\n", ",": ",", ";": ";", "\\": "\\"}
+
+Property = Tuple[Dict[str, str], str]   # (parameters, raw value)
+
+
+# --- Lexing ---------------------------------------------------------
+
+def unfold(text: str) -> List[str]:
+    """Content lines with folded continuations joined (RFC 5545 3.1)."""
+    lines: List[str] = []
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+
+def split_vevents(text: str) -> List[str]:
+    """Raw VEVENT blocks (unfolded lines joined by newlines), in file order."""
+    blocks, current = [], None
+    for line in unfold(text):
+        upper = line.upper()
+        if upper == "BEGIN:VEVENT":
+            current = [line]
+        elif current is not None:
+            current.append(line)
+            if upper == "END:VEVENT":
+                blocks.append("\n".join(current))
+                current = None
+    return blocks
+
+
+def parse_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """NAME;PARAM=VALUE;...:value -> (NAME, params, value); quotes respected."""
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ":" and not in_quotes:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *params = re.split(r';(?=(?:[^"]*"[^"]*")*[^"]*$)', head)
+    parsed = {}
+    for param in params:
+        key, _, val = param.partition("=")
+        parsed[key.upper()] = val.strip('"')
+    return name.upper(), parsed, value
+
+
+def unescape_text(value: str) -> str:
+    return re.sub(r"\\(.)", lambda m: _TEXT_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def parse_vevent(block: str) -> Tuple[Dict[str, Property], List[Property]]:
+    """First value of each VEVENT property, plus the TRIGGERs of its VALARMs."""
+    props: Dict[str, Property] = {}
+    triggers: List[Property] = []
+    depth = 0
+    for line in block.split("\n")[1:-1]:
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            depth -= 1
+        elif depth == 0:
+            props.setdefault(name, (params, value))
+        elif name == "TRIGGER":
+            triggers.append((params, value))
+    return props, triggers
+
+
+# --- Values ---------------------------------------------------------
+
+def _zone(params: Dict[str, str], default_tz: str, warnings: List[str]) -> str:
+    tzid = params.get("TZID")
+    if not tzid:
+        return default_tz
+    try:
+        ZoneInfo(tzid)
+        return tzid
+    except (ZoneInfoNotFoundError, ValueError):
+        warnings.append(f"unknown TZID {tzid!r}, using {default_tz}")
+        return default_tz
+
+
+def parse_datetime(prop: Property, default_tz: str, warnings: List[str]) -> Tuple[datetime, str, bool]:
+    """(aware datetime, reference zone, all-day) of a DTSTART / DTEND / UNTIL value."""
+    params, value = prop
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        d = datetime.strptime(value[:8], "%Y%m%d")
+        return d.replace(tzinfo=ZoneInfo(default_tz)), default_tz, True
+    if value.endswith("Z"):
+        return datetime.strptime(value[:15], "%Y%m%dT%H%M%S").replace(tzinfo=UTC), "UTC", False
+    zone = _zone(params, default_tz, warnings)
+    return datetime.strptime(value[:15], "%Y%m%dT%H%M%S").replace(tzinfo=ZoneInfo(zone)), zone, False
+
+
+def parse_duration(value: str) -> Optional[timedelta]:
+    m = _DURATION.match(value.strip().upper())
+    if not m:
+        return None
+    sign, weeks, days, hours, minutes, seconds = m.groups()
+    delta = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -delta if sign == "-" else delta
+
+
+def parse_rrule(value: str) -> Dict[str, str]:
+    return {k.upper(): v for k, _, v in (part.partition("=") for part in value.split(";") if part)}
+
+
+def _reminders(triggers: List[Property]) -> List[int]:
+    """Minutes-before of the alarms that fire before the start."""
+    minutes = set()
+    for params, value in triggers:
+        if params.get("VALUE", "").upper() == "DATE-TIME" or params.get("RELATED", "START").upper() != "START":
+            continue
+        delta = parse_duration(value)
+        if delta is not None and delta <= timedelta(0):
+            minutes.add(int(-delta.total_seconds() // 60))
+    return sorted(minutes)
+
+
+def _category(props: Dict[str, Property], default_category: str) -> str:
+    if "CATEGORIES" not in props:
+        return default_category
+    for name in unescape_text(props["CATEGORIES"][1]).split(","):
+        category_id = category_by_name(name)
+        if category_id:
+            return category_id
+    return default_category
+
+
+# --- Conversion -----------------------------------------------------
+
+def _recurrence(rule: Dict[str, str], start: datetime, warnings: List[str]) -> Tuple[str, List[int]]:
+    """(recurrence type, weekdays to split a weekly rule into) for an RRULE."""
+    freq = rule.get("FREQ", "").upper()
+    interval = int(rule.get("INTERVAL", "1") or 1)
+    if freq == "DAILY" and interval == 1 and "BYDAY" not in rule:
+        return "daily", []
+    if freq == "WEEKLY" and interval in (1, 2):
+        days = [_WEEKDAYS[d] for d in rule.get("BYDAY", "").upper().split(",") if d in _WEEKDAYS]
+        return ("weekly" if interval == 1 else "biweekly"), sorted(set(days)) or [start.weekday()]
+    if freq == "MONTHLY" and interval == 1:
+        monthdays = rule.get("BYMONTHDAY")
+        byday = rule.get("BYDAY", "").upper()
+        if not byday and monthdays in (None, str(start.day)):
+            return "monthly_date", []
+        if not byday and sorted(monthdays.split(",")) == ["1", "15"] and start.day in (1, 15):
+            return "bimonthly", []
+        m = _BYDAY.match(byday)
+        if m and m.group(1) and _WEEKDAYS[m.group(2)] == start.weekday():
+            n = int(m.group(1))
+            if n == -1 and (start + timedelta(days=7)).month != start.month:
+                return "monthly_last_weekday", []
+            if n == (start.day - 1) // 7 + 1:
+                return "monthly_weekday", []
+    warnings.append(f"unsupported RRULE {';'.join(f'{k}={v}' for k, v in rule.items())}; first occurrence only")
+    return "once", []
+
+
+def _day_pieces(start: datetime, duration_min: int) -> List[Tuple[datetime, int]]:
+    """(start, minutes) of the parts of [start, start + duration) on each local day of start's zone."""
+    tz = start.tzinfo
+    current = start.astimezone(UTC)
+    end = current + timedelta(minutes=duration_min)
+    pieces = []
+    while current < end:
+        local = current.astimezone(tz)
+        midnight = datetime.combine(local.date() + timedelta(days=1), time(0), tzinfo=tz).astimezone(UTC)
+        piece_end = min(midnight, end)
+        pieces.append((local, int((piece_end - current).total_seconds() // 60)))
+        current = piece_end
+    return pieces
+
+
+def _weekly_count_end(starts: List[datetime], period_days: int, count: int) -> datetime:
+    """Date of the count-th occurrence of a weekly rule split over `starts`."""
+    week = 0
+    while True:
+        for start in starts:
+            count -= 1
+            if count == 0:
+                return start + timedelta(days=period_days * week)
+        week += 1
+
+
+def vevent_to_events(
+    block: str,
+    id_prefix: str,
+    default_category: str = "custom",
+    default_tz: str = "UTC",
+    color: Optional[str] = None,
+) -> Tuple[Optional[str], List[Event], List[str]]:
+    """
+    (UID, events, warnings) of one VEVENT block. Event ids are
+    `id_prefix + UID` (plus `#<weekday>` when a weekly rule is split and
+    `@<n>` for the later days of a multi-day event);
+    cancelled events and RECURRENCE-ID overrides yield no events.
+    """
+    props, triggers = parse_vevent(block)
+    warnings: List[str] = []
+    uid = props.get("UID", ({}, ""))[1].strip() or None
+    if uid is None or "DTSTART" not in props:
+        return uid, [], ["VEVENT without UID or DTSTART skipped"]
+    if props.get("STATUS", ({}, ""))[1].upper() == "CANCELLED":
+        return uid, [], []
+    if "RECURRENCE-ID" in props:
+        return uid, [], ["RECURRENCE-ID override ignored"]
+
+    start, zone, all_day = parse_datetime(props["DTSTART"], default_tz, warnings)
+    if "DTEND" in props:
+        end = parse_datetime(props["DTEND"], zone, warnings)[0]
+        # Elapsed time (aware datetimes of one zone subtract as wall-clock times)
+        duration_min = int((end.astimezone(UTC) - start.astimezone(UTC)).total_seconds() // 60)
+    elif "DURATION" in props:
+        delta = parse_duration(props["DURATION"][1]) or timedelta(0)
+        duration_min = int(delta.total_seconds() // 60)
+    else:
+        duration_min = 1440 if all_day else 0
+    duration_min = max(duration_min, 0)
+
+    recurrence, split_days = "once", []
+    rule = parse_rrule(props["RRULE"][1]) if "RRULE" in props else None
+    if rule:
+        recurrence, split_days = _recurrence(rule, start, warnings)
+        if "EXDATE" in props:
+            warnings.append("EXDATE ignored")
+
+    pieces = None
+    if duration_min > MAX_DURATION_MIN:
+        if recurrence == "once":
+            pieces = _day_pieces(start, duration_min)
+        else:
+            warnings.append(f"recurring event of {duration_min} min cut to {MAX_DURATION_MIN} min")
+            duration_min = MAX_DURATION_MIN
+
+    end_date = None
+    if rule and recurrence != "once" and "UNTIL" in rule:
+        end_date = parse_datetime(({}, rule["UNTIL"]), zone, warnings)[0]
+
+    title = unescape_text(props.get("SUMMARY", ({}, ""))[1]) or "(no title)"
+    common = dict(
+        title=title,
+        category_id=_category(props, default_category),
+        duration_min=duration_min,
+        reference_tz=zone,
+        color=color,
+        recurrence=recurrence,
+        reminders_min=_reminders(triggers),
+        end_date=end_date,
+    )
+
+    if pieces:
+        # Multi-day event: one event per local day, reminders on the first
+        events = []
+        for n, (piece_start, minutes) in enumerate(pieces):
+            piece = dict(common, duration_min=minutes, reminders_min=common["reminders_min"] if n == 0 else [])
+            events.append(replace(
+                create_event(start_dt=piece_start, **piece),
+                id=id_prefix + uid + (f"@{n}" if n else ""),
+            ))
+        return uid, events, warnings
+
+    if not split_days:
+        event = replace(create_event(start_dt=start, **common), id=id_prefix + uid)
+        if rule and recurrence != "once" and "COUNT" in rule:
+            event.end_date = end_date_for_count(event, int(rule["COUNT"]))
+        return uid, [event], warnings
+
+    # Weekly rule on several weekdays: one event per weekday, same UID
+    starts = [start + timedelta(days=(day - start.weekday()) % 7) for day in split_days]
+    if "COUNT" in rule:
+        period = 14 if recurrence == "biweekly" else 7
+        last = _weekly_count_end(sorted(starts), period, int(rule["COUNT"]))
+        common["end_date"] = last.replace(hour=23, minute=59, second=0)
+    suffix = len(starts) > 1
+    events = [
+        replace(
+            create_event(start_dt=day_start, **common),
+            id=id_prefix + uid + (f"#{day_start.weekday()}" if suffix else ""),
+        )
+        for day_start in starts
+    ]
+    return uid, events, warnings
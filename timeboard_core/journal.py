@@ -0,0 +1,348 @@
+# timeboard_core/journal.py
+"""
+Append-only journal + periodic snapshots for a board (events + settings).
+
+Layout of a journal directory:
+
+    snapshot-000000001000.tbb    full board state up to seq 1000 (binary, see board_binary)
+    journal-000000001001.log     records from seq 1001 on
+
+Every create/update/delete/settings change is one journal line
+`<crc32> <json>\\n`, written with a single sequential append. On open the
+newest readable snapshot is loaded and only the journal tail after it is
+replayed. A torn or corrupt tail line (crash mid-write) fails its
+checksum and is cut off; snapshots are written to a temp file and
+renamed into place, and the previous snapshot with its journal segments
+is kept as a fallback. JSON snapshots of older versions are still read.
+"""
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import glob
+import json
+import os
+import threading
+import zlib
+
+from .board import (
+    Board, board_from_dict, event_from_dict, event_to_dict,
+    settings_from_dict, settings_to_dict,
+)
+from .board_binary import open_image, write_board
+from .event_store import epoch_day, event_day_window
+from .events import Event
+from .settings import UserSettings
+from .timeline_layout import collect_occurrences
+
+DEFAULT_JOURNAL_DIR = os.environ.get("TIMEBOARD_JOURNAL_DIR", "")
+
+SNAPSHOT_VERSION = 2            # 1: JSON snapshots, 2: binary .tbb
+DEFAULT_SNAPSHOT_EVERY = 1000   # journal records between snapshots
+
+_SNAPSHOT_PATTERN = "snapshot-{:012d}.tbb"
+_SEGMENT_PATTERN = "journal-{:012d}.log"
+
+
+def _seq_of(path: str) -> int:
+    return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+
+def encode_record(record: Dict) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def decode_record(line: bytes) -> Optional[Dict]:
+    """Parse one journal line; None if it is torn or corrupt."""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _snapshots(directory: str) -> List[str]:
+    """Snapshot files (binary and legacy JSON), oldest first."""
+    paths = glob.glob(os.path.join(directory, "snapshot-*.tbb"))
+    paths += glob.glob(os.path.join(directory, "snapshot-*.json"))
+    return sorted(paths, key=_seq_of)
+
+
+def _read_snapshot(path: str, default_name: str):
+    """(seq, board) of a snapshot file."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data["seq"], board_from_dict(data["board"], default_name=default_name)
+    image = open_image(path)
+    return image.extra["seq"], image.board()
+
+
+def _fsync_dir(directory: str):
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournalStore:
+    """
+    Board state kept in memory and persisted as journal + snapshots.
+
+    Offers the same event API as `EventStore` plus settings, so the app
+    can use either backend.
+    """
+
+    materialized = False
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        fsync: bool = True,
+        name: str = "board",
+    ):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._events: Dict[str, Event] = {}
+        self._settings = UserSettings()
+        self._name = name
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._fh = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # --- Loading ------------------------------------------------
+
+    def _load(self):
+        for path in reversed(_snapshots(self.directory)):
+            try:
+                seq, board = _read_snapshot(path, self._name)
+            except (OSError, ValueError, KeyError, TypeError):
+                continue  # unreadable snapshot: fall back to the previous one
+            self._name = board.name
+            self._settings = board.settings
+            self._events = {e.id: e for e in board.events}
+            self._seq = self._snapshot_seq = seq
+            break
+
+        segments = sorted(glob.glob(os.path.join(self.directory, "journal-*.log")), key=_seq_of)
+        for path, following in zip(segments, segments[1:] + [None]):
+            if following is not None and _seq_of(following) - 1 <= self._seq:
+                continue  # every record is already in the snapshot
+            self._replay_segment(path)
+
+        if segments and _seq_of(segments[-1]) > self._snapshot_seq:
+            self._fh = open(segments[-1], "ab")
+        else:
+            self._open_segment(self._seq + 1)
+
+    def _replay_segment(self, path: str):
+        good_until = 0
+        with open(path, "rb") as fh:
+            for line in fh:
+                record = decode_record(line)
+                if record is None:
+                    break
+                good_until += len(line)
+                if record["seq"] > self._seq:
+                    self._apply(record)
+                    self._seq = record["seq"]
+        if good_until < os.path.getsize(path):
+            # Torn tail from a crash: drop it so new appends stay readable
+            with open(path, "r+b") as fh:
+                fh.truncate(good_until)
+
+    def _apply(self, record: Dict):
+        op = record["op"]
+        if op in ("create", "update"):
+            event = event_from_dict(record["event"])
+            self._events[event.id] = event
+        elif op == "delete":
+            self._events.pop(record["id"], None)
+        elif op == "settings":
+            self._settings = settings_from_dict(record["settings"])
+
+    # --- Writing ------------------------------------------------
+
+    def _open_segment(self, first_seq: int):
+        if self._fh is not None:
+            self._fh.close()
+        path = os.path.join(self.directory, _SEGMENT_PATTERN.format(first_seq))
+        self._fh = open(path, "ab")
+        _fsync_dir(self.directory)
+
+    def _append(self, records: List[Dict]):
+        """Apply and persist records with one write (caller holds the lock)."""
+        if not records:
+            return
+        seq = self._seq
+        chunks = []
+        for record in records:
+            seq += 1
+            record["seq"] = seq
+            chunks.append(encode_record(record))
+        if self._fh is None:
+            self._open_segment(self._seq + 1)
+        position = self._fh.tell()
+        try:
+            self._fh.write(b"".join(chunks))
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+        except BaseException:
+            # ENOSPC, EIO, ...: later appends must not land after a torn line
+            self._rollback(position, seq)
+            raise
+        self._seq = seq
+        for record in records:
+            self._apply(record)
+        if self._seq - self._snapshot_seq >= self.snapshot_every:
+            self.snapshot()
+
+    def _rollback(self, position: int, failed_seq: int):
+        """Cut the current segment back to `position` after a failed append up to `failed_seq`."""
+        path = self._fh.name
+        try:
+            self._fh.close()
+        except OSError:
+            pass  # flushing the rest of the failed write
+        self._fh = None
+        try:
+            with open(path, "r+b") as fh:
+                fh.truncate(position)
+                if self.fsync:
+                    os.fsync(fh.fileno())
+            self._fh = open(path, "ab")
+        except OSError:
+            # Replay stops reading this segment at a torn line and goes on with
+            # the next one, so continue in a new segment. Its numbers start
+            # after the failed records, which may have reached the disk whole.
+            self._seq = failed_seq
+            self._open_segment(self._seq + 1)
+
+    def snapshot(self):
+        """Write a full snapshot and start a new journal segment."""
+        with self._lock:
+            board = Board(self._name, self._settings, list(self._events.values()))
+            path = os.path.join(self.directory, _SNAPSHOT_PATTERN.format(self._seq))
+            write_board(board, path, extra={"version": SNAPSHOT_VERSION, "seq": self._seq}, fsync=True)
+            _fsync_dir(self.directory)
+
+            previous_seq = self._snapshot_seq
+            self._snapshot_seq = self._seq
+            self._open_segment(self._seq + 1)
+            self._prune(previous_seq)
+
+    def _prune(self, keep_from_seq: int):
+        """Delete snapshots and segments superseded by the previous snapshot."""
+        for path in _snapshots(self.directory):
+            if _seq_of(path) < keep_from_seq:
+                os.remove(path)
+        segments = sorted(glob.glob(os.path.join(self.directory, "journal-*.log")), key=_seq_of)
+        for path, following in zip(segments, segments[1:]):
+            if _seq_of(following) - 1 <= keep_from_seq:
+                os.remove(path)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    # --- Settings -----------------------------------------------
+
+    @property
+    def settings(self) -> UserSettings:
+        """A copy of the stored settings."""
+        with self._lock:
+            return settings_from_dict(settings_to_dict(self._settings))
+
+    def save_settings(self, settings: UserSettings) -> bool:
+        """Journal `settings` if they differ from the stored ones."""
+        data = settings_to_dict(settings)
+        with self._lock:
+            if data == settings_to_dict(self._settings):
+                return False
+            self._append([{"op": "settings", "settings": data}])
+        return True
+
+    # --- CRUD ---------------------------------------------------
+
+    def add(self, event: Event) -> Event:
+        self.add_many([event])
+        return event
+
+    def add_many(self, events: Iterable[Event]) -> int:
+        with self._lock:
+            records = [
+                {"op": "update" if e.id in self._events else "create", "event": event_to_dict(e)}
+                for e in events
+            ]
+            self._append(records)
+        return len(records)
+
+    def get(self, event_id: str) -> Optional[Event]:
+        with self._lock:
+            event = self._events.get(event_id)
+        return replace(event) if event else None
+
+    def update(self, event: Event) -> bool:
+        return self.update_many([event]) > 0
+
+    def update_many(self, events: Iterable[Event]) -> int:
+        """Journal updates of existing events with one append; unknown ids are skipped."""
+        with self._lock:
+            records = [{"op": "update", "event": event_to_dict(e)} for e in events if e.id in self._events]
+            self._append(records)
+        return len(records)
+
+    def delete(self, event_id: str) -> bool:
+        return self.delete_many([event_id]) > 0
+
+    def delete_many(self, event_ids: Iterable[str]) -> int:
+        with self._lock:
+            records = [{"op": "delete", "id": i} for i in dict.fromkeys(event_ids) if i in self._events]
+            self._append(records)
+        return len(records)
+
+    # --- Queries ------------------------------------------------
+
+    def count(self) -> int:
+        return len(self._events)
+
+    def _sorted(self, events: Iterable[Event]) -> List[Event]:
+        return [replace(e) for e in sorted(events, key=lambda e: (e.start_utc, e.id))]
+
+    def all(self) -> List[Event]:
+        return self.list_events()
+
+    def list_events(self, limit: Optional[int] = None, offset: int = 0) -> List[Event]:
+        with self._lock:
+            events = self._sorted(self._events.values())
+        return events[offset:offset + limit] if limit is not None else events[offset:]
+
+    def events_in_range(self, start_utc: datetime, end_utc: datetime) -> List[Event]:
+        first_day, last_day = epoch_day(start_utc), epoch_day(end_utc)
+        with self._lock:
+            matches = []
+            for event in self._events.values():
+                start_day, end_day = event_day_window(event)
+                if start_day <= last_day and (end_day is None or end_day >= first_day):
+                    matches.append(event)
+            return self._sorted(matches)
+
+    def window_occurrences(self, start_utc: datetime, days: int) -> List[Event]:
+        end_utc = start_utc + timedelta(days=days)
+        return collect_occurrences(self.events_in_range(start_utc, end_utc), start_utc, days)
@@ -0,0 +1,284 @@
+# timeboard_core/occurrence_sets.py
+"""
+Symbolic sets of occurrence days with lazy set algebra.
+
+An `OccurrenceSet` is a set of local calendar days (epoch days, see
+calendar_tables) described symbolically:
+
+    Progression    every `period` days from a residue, optionally bounded
+                   (daily / weekly / biweekly rules, weekday filters)
+    RuleDays       days of any recurrence rule via RuleSeries arithmetic
+                   (monthly types)
+    DaySet         a finite sorted list (holidays, one-off events)
+
+`a | b`, `a & b` and `a - b` build expression trees without expanding
+anything, e.g. `event_days(gym) - date_set(holidays)`. Days are only
+produced by `iter_days(lo, hi)` for a window, so a multi-year horizon
+costs memory per rule, not per occurrence. Progression & Progression is
+folded into a single progression (CRT).
+"""
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from heapq import merge
+from math import gcd
+from typing import Iterable, Iterator, List, Optional
+
+from .events import Event, instantiate_for_day, wall_clock_anchor
+from .series import RuleSeries
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_of_date(d: date) -> int:
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def date_of_day(day: int) -> date:
+    return date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+class OccurrenceSet:
+    """Base class: membership test plus ordered iteration over a window."""
+
+    def contains(self, day: int) -> bool:
+        raise NotImplementedError
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        """Member days in [lo, hi), ascending."""
+        raise NotImplementedError
+
+    def __contains__(self, day: int) -> bool:
+        return self.contains(day)
+
+    def days(self, lo: int, hi: int) -> List[int]:
+        return list(self.iter_days(lo, hi))
+
+    def count(self, lo: int, hi: int) -> int:
+        return sum(1 for _ in self.iter_days(lo, hi))
+
+    def __or__(self, other: "OccurrenceSet") -> "OccurrenceSet":
+        return Union(self, other)
+
+    def __and__(self, other: "OccurrenceSet") -> "OccurrenceSet":
+        return Intersection(self, other)
+
+    def __sub__(self, other: "OccurrenceSet") -> "OccurrenceSet":
+        return Difference(self, other)
+
+
+# --- Leaves -------------------------------------------------------
+
+class Empty(OccurrenceSet):
+
+    def contains(self, day: int) -> bool:
+        return False
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        return iter(())
+
+    def __repr__(self) -> str:
+        return "Empty()"
+
+
+class Progression(OccurrenceSet):
+    """Days d with d % period == residue, within [lo, hi] (inclusive, None = open)."""
+
+    def __init__(self, residue: int, period: int, lo: Optional[int] = None, hi: Optional[int] = None):
+        self.period = period
+        self.residue = residue % period
+        self.lo = lo
+        self.hi = hi
+
+    def contains(self, day: int) -> bool:
+        return (
+            day % self.period == self.residue
+            and (self.lo is None or day >= self.lo)
+            and (self.hi is None or day <= self.hi)
+        )
+
+    def _clip(self, lo: int, hi: int):
+        if self.lo is not None:
+            lo = max(lo, self.lo)
+        if self.hi is not None:
+            hi = min(hi, self.hi + 1)
+        return lo, hi
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        lo, hi = self._clip(lo, hi)
+        first = lo + (self.residue - lo) % self.period
+        return iter(range(first, hi, self.period))
+
+    def count(self, lo: int, hi: int) -> int:
+        lo, hi = self._clip(lo, hi)
+        if hi <= lo:
+            return 0
+        return (hi - 1 - self.residue) // self.period - (lo - 1 - self.residue) // self.period
+
+    def __and__(self, other: OccurrenceSet) -> OccurrenceSet:
+        if not isinstance(other, Progression):
+            return Intersection(self, other)
+        # d = r1 (mod p1) and d = r2 (mod p2): solvable iff r1 = r2 (mod gcd)
+        g = gcd(self.period, other.period)
+        if (self.residue - other.residue) % g:
+            return Empty()
+        period = self.period // g * other.period
+        residue = next(
+            r for r in range(self.residue, period, self.period) if r % other.period == other.residue
+        )
+        lo = max((b for b in (self.lo, other.lo) if b is not None), default=None)
+        hi = min((b for b in (self.hi, other.hi) if b is not None), default=None)
+        return Progression(residue, period, lo, hi)
+
+    def __repr__(self) -> str:
+        return f"Progression(residue={self.residue}, period={self.period}, lo={self.lo}, hi={self.hi})"
+
+
+class DaySet(OccurrenceSet):
+    """A finite set of days."""
+
+    def __init__(self, days: Iterable[int]):
+        self.sorted_days = sorted(set(days))
+
+    def contains(self, day: int) -> bool:
+        i = bisect_left(self.sorted_days, day)
+        return i < len(self.sorted_days) and self.sorted_days[i] == day
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        days = self.sorted_days
+        i, j = bisect_left(days, lo), bisect_left(days, hi)
+        return iter(days[i:j])
+
+    def count(self, lo: int, hi: int) -> int:
+        return bisect_left(self.sorted_days, hi) - bisect_left(self.sorted_days, lo)
+
+    def __repr__(self) -> str:
+        return f"DaySet({len(self.sorted_days)} days)"
+
+
+class RuleDays(OccurrenceSet):
+    """Local days of a recurrence rule, answered by RuleSeries arithmetic."""
+
+    def __init__(self, event: Event):
+        self.series = RuleSeries(event)
+
+    def contains(self, day: int) -> bool:
+        return self.series.count_days(day, day + 1) == 1
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        series = self.series
+        if lo >= series.first_day:
+            k = series.count_days(series.first_day, lo)
+        else:
+            k = -series.count_days(lo, series.first_day)
+        while True:
+            day = series.nth_day(k)
+            if day is None or day >= hi:
+                return
+            if day >= lo:
+                yield day
+            k += 1
+
+    def count(self, lo: int, hi: int) -> int:
+        return self.series.count_days(lo, hi)
+
+    def __repr__(self) -> str:
+        return f"RuleDays({self.series.event.title!r}, {self.series.recurrence})"
+
+
+# --- Combinators --------------------------------------------------
+
+class Union(OccurrenceSet):
+
+    def __init__(self, left: OccurrenceSet, right: OccurrenceSet):
+        self.left, self.right = left, right
+
+    def contains(self, day: int) -> bool:
+        return self.left.contains(day) or self.right.contains(day)
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        previous = None
+        for day in merge(self.left.iter_days(lo, hi), self.right.iter_days(lo, hi)):
+            if day != previous:
+                yield day
+                previous = day
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} | {self.right!r})"
+
+
+class Intersection(OccurrenceSet):
+
+    def __init__(self, left: OccurrenceSet, right: OccurrenceSet):
+        self.left, self.right = left, right
+
+    def contains(self, day: int) -> bool:
+        return self.left.contains(day) and self.right.contains(day)
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        return (d for d in self.left.iter_days(lo, hi) if self.right.contains(d))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} & {self.right!r})"
+
+
+class Difference(OccurrenceSet):
+
+    def __init__(self, left: OccurrenceSet, right: OccurrenceSet):
+        self.left, self.right = left, right
+
+    def contains(self, day: int) -> bool:
+        return self.left.contains(day) and not self.right.contains(day)
+
+    def iter_days(self, lo: int, hi: int) -> Iterator[int]:
+        return (d for d in self.left.iter_days(lo, hi) if not self.right.contains(d))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} - {self.right!r})"
+
+
+# --- Constructors -------------------------------------------------
+
+def event_days(event: Event) -> OccurrenceSet:
+    """Local days (in the event's reference zone) on which `event` occurs."""
+    series = RuleSeries(event)
+    if series.recurrence == "once":
+        return DaySet([series.once_day])
+    if series.empty:
+        return Empty()
+    if series.recurrence in ("daily", "weekly", "biweekly"):
+        return Progression(series.residue, series.period, series.start_day, series.last_day)
+    return RuleDays(event)
+
+
+def weekdays(*weekday_numbers: int, lo: Optional[int] = None, hi: Optional[int] = None) -> OccurrenceSet:
+    """Days falling on the given weekdays (0=Mon), e.g. weekdays(0, 1, 2, 3, 4)."""
+    result: OccurrenceSet = Empty()
+    for w in weekday_numbers:
+        day = Progression((w - 3) % 7, 7, lo, hi)
+        result = day if isinstance(result, Empty) else result | day
+    return result
+
+
+def date_set(dates: Iterable[date]) -> DaySet:
+    """A DaySet from calendar dates (e.g. a holiday list)."""
+    return DaySet(day_of_date(d) for d in dates)
+
+
+def materialize(event: Event, days: OccurrenceSet, start_utc: datetime, n_days: int) -> List[Event]:
+    """
+    Occurrences of `event` restricted to `days`, for the same UTC-day
+    window `collect_occurrences(..., start_utc, n_days)` expands.
+    """
+    first_slot = start_utc.toordinal() - _EPOCH_ORDINAL
+    if (event.recurrence or "once") == "once":
+        in_window = 0 <= event.start_utc.toordinal() - _EPOCH_ORDINAL - first_slot <= n_days
+        local_day = event_days(event).sorted_days[0]
+        return [event] if in_window and local_day in days else []
+
+    slot_shift = wall_clock_anchor(event)[2]
+    result = []
+    for day in days.iter_days(first_slot - slot_shift, first_slot + n_days + 1 - slot_shift):
+        occ = instantiate_for_day(event, start_utc + timedelta(days=day + slot_shift - first_slot))
+        if occ is not None:
+            result.append(occ)
+    return result
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from datetime import time
 
+from .settings import DEFAULT_TRADING_EXCHANGES
+from .trading_calendar import exchanges
+
 @dataclass(frozen=True)
 class TradingSession:
     name: str
@@ -8,9 +11,18 @@ class TradingSession:
     start: time
     end: time
     color: str
+    exchange_id: str = ""
 
+# Regular hours of the default exchanges; the full calendars (lunch
+# breaks, half days, holidays) live in timeboard_core.trading_calendar
 TRADING_SESSIONS = [
-    TradingSession("Tokyo Session",  "Asia/Tokyo", time(0, 0),  time(9, 0),  "#DADADA"),
-    TradingSession("London Session", "Europe/London", time(8, 0),  time(17, 0), "#CFCFCF"),
-    TradingSession("NY Session",     "America/New_York", time(13, 0), time(22, 0), "#BFBFBF"),
+    TradingSession(
+        exchange.name,
+        exchange.zone,
+        time(exchange.open_minute // 60, exchange.open_minute % 60),
+        time(exchange.close_minute // 60, exchange.close_minute % 60),
+        exchange.color,
+        exchange.id,
+    )
+    for exchange in (exchanges()[e] for e in DEFAULT_TRADING_EXCHANGES)
 ]
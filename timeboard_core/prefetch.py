@@ -0,0 +1,112 @@
+# timeboard_core/prefetch.py
+"""
+Speculative computation of the timeline windows next to the one shown.
+
+After a render, `WindowPrefetcher.prefetch` queues the frames (see
+`BoardSnapshot.timeline_frame`) of the windows the navigation buttons
+lead to on a shared thread pool, so paging back and forth finds them in
+the snapshot's cache. Each prefetcher belongs to one viewer and tags its
+work with a generation (board version + zones + settings): when the
+generation changes, everything still queued is cancelled and tasks that
+already started are dropped before they compute. A task that is running
+cannot be interrupted; its frame still lands in the cache of the version
+it was computed for, which is harmless.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+import threading
+
+from .timeline_layout import layout_settings_key
+
+# Background threads per process; frames are GIL-bound, so more rarely helps
+DEFAULT_PREFETCH_WORKERS = 2
+
+
+def prefetch_executor(max_workers: int = DEFAULT_PREFETCH_WORKERS) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timeboard-prefetch")
+
+
+def neighbour_offsets(steps: Iterable[int]) -> list:
+    """Day offsets reachable with one click of each step, forward first."""
+    offsets = []
+    for step in steps:
+        for offset in (step, -step):
+            if offset and offset not in offsets:
+                offsets.append(offset)
+    return offsets
+
+
+class WindowPrefetcher:
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._generation: Optional[tuple] = None
+        self._pending: Dict[datetime, Future] = {}
+
+    def cancel(self):
+        """Cancel queued work and drop tasks that have not started yet."""
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._generation = None
+
+    @staticmethod
+    def _generation_of(snapshot, zones, settings) -> tuple:
+        return (snapshot.board_id, snapshot.version, tuple(zones), layout_settings_key(settings))
+
+    def _switch_locked(self, generation: tuple):
+        if generation != self._generation:
+            self._cancel_locked()
+            self._generation = generation
+
+    def frame(self, snapshot, zones, settings, start_utc: datetime):
+        """
+        The frame of `start_utc`: a prefetch of it that is still running is
+        awaited (instead of computing it twice), otherwise it is computed or
+        read from the snapshot's cache here.
+        """
+        with self._lock:
+            self._switch_locked(self._generation_of(snapshot, zones, settings))
+            future = self._pending.get(start_utc)
+        if future is not None and not future.cancelled():
+            try:
+                future.result()
+            except Exception:
+                # Prefetching is best effort; compute the frame below
+                pass
+        return snapshot.timeline_frame(tuple(zones), settings, start_utc)
+
+    def prefetch(self, snapshot, zones, settings, start_utc: datetime, offsets: Iterable[int]) -> int:
+        """
+        Queue the frames of `start_utc` shifted by each of `offsets` days;
+        returns how many were queued. A new generation cancels the old one.
+        """
+        zones = tuple(zones)
+        generation = self._generation_of(snapshot, zones, settings)
+        # The viewer may edit its settings while a task runs
+        settings = deepcopy(settings)
+        queued = 0
+        with self._lock:
+            self._switch_locked(generation)
+            self._pending = {s: f for s, f in self._pending.items() if not f.done()}
+            for offset in offsets:
+                window_start = start_utc + timedelta(days=offset)
+                if window_start in self._pending:
+                    continue
+                self._pending[window_start] = self._executor.submit(
+                    self._run, generation, snapshot, zones, settings, window_start
+                )
+                queued += 1
+        return queued
+
+    def _run(self, generation: tuple, snapshot, zones, settings, window_start: datetime):
+        if generation != self._generation:
+            return None
+        return snapshot.timeline_frame(zones, settings, window_start)
@@ -0,0 +1,106 @@
+# timeboard_core/queries.py
+"""
+Instant- and range-based queries over expanded occurrences.
+
+`source` is anything with `window_occurrences(start_utc, days)`: an
+EventStore, JournalStore or a BoardSnapshot. With a BoardSnapshot the
+sorted per-window index is built once and shared by later queries.
+`busy_intervals` reads the materialized occurrence table directly when
+the source has one covering the range.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from .event_store import OCCURRENCE_LOOKBACK_DAYS
+from .events import Event
+
+UTC = ZoneInfo("UTC")
+
+
+def _utc_midnight(dt: datetime) -> datetime:
+    return dt.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class OccurrenceIndex:
+    """Occurrences sorted by start with epoch arrays for bisect lookups."""
+
+    def __init__(self, occurrences: Sequence[Event]):
+        self.occurrences = sorted(occurrences, key=lambda e: (e.start_utc, e.id))
+        self.starts = [occ.start_utc.timestamp() for occ in self.occurrences]
+        self.ends = [s + occ.duration_min * 60 for s, occ in zip(self.starts, self.occurrences)]
+        self.max_span = max((e - s for s, e in zip(self.starts, self.ends)), default=0)
+
+    def overlapping(self, start_utc: datetime, end_utc: datetime) -> List[Event]:
+        start_ts, end_ts = start_utc.timestamp(), end_utc.timestamp()
+        lo = bisect_left(self.starts, start_ts - self.max_span)
+        hi = bisect_left(self.starts, end_ts)
+        ends = self.ends
+        return [self.occurrences[i] for i in range(lo, hi) if ends[i] > start_ts]
+
+
+def window_index(source, start_utc: datetime, days: int) -> OccurrenceIndex:
+    """Index of a window's occurrences, memoized on sources that support it."""
+    build = lambda: OccurrenceIndex(source.window_occurrences(start_utc, days))
+    cached = getattr(source, "cached", None)
+    return cached(("index", start_utc, days), build) if cached else build()
+
+
+def occurrences_between(source, start_utc: datetime, end_utc: datetime) -> List[Event]:
+    """Occurrences overlapping [start_utc, end_utc), ordered by start."""
+    first = _utc_midnight(start_utc) - timedelta(days=OCCURRENCE_LOOKBACK_DAYS)
+    days = (_utc_midnight(end_utc) - first).days
+    return window_index(source, first, days).overlapping(start_utc, end_utc)
+
+
+def active_at(source, instant_utc: datetime) -> List[Event]:
+    """Occurrences running at `instant_utc` (start <= instant < end)."""
+    return occurrences_between(source, instant_utc, instant_utc + timedelta(microseconds=1))
+
+
+def busy_intervals(source, start_utc: datetime, end_utc: datetime) -> List[Tuple[datetime, datetime]]:
+    """
+    (start, end) of the occurrences overlapping [start_utc, end_utc),
+    ordered by start: from the source's `occurrence_rows` when it has a
+    materialized table covering the range (no events are built),
+    expanded otherwise.
+    """
+    occurrence_rows = getattr(source, "occurrence_rows", None)
+    if occurrence_rows is not None:
+        try:
+            rows = occurrence_rows(start_utc, end_utc)
+        except ValueError:
+            pass
+        else:
+            return [(datetime.fromtimestamp(start_ts, UTC), datetime.fromtimestamp(end_ts, UTC))
+                    for _, start_ts, end_ts, _ in rows]
+    return [(occ.start_utc, occ.end_utc) for occ in occurrences_between(source, start_utc, end_utc)]
+
+
+def free_slots(
+    busy: Sequence[Tuple[datetime, datetime]],
+    start_utc: datetime,
+    end_utc: datetime,
+    min_minutes: int = 0,
+) -> List[Tuple[datetime, datetime]]:
+    """Gaps of at least `min_minutes` in [start_utc, end_utc) not covered by any busy (start, end)."""
+    slots = []
+    cursor = start_utc
+    for busy_start, busy_end in sorted(busy):
+        if busy_start > cursor:
+            slots.append((cursor, min(busy_start, end_utc)))
+        cursor = max(cursor, busy_end)
+        if cursor >= end_utc:
+            break
+    if cursor < end_utc:
+        slots.append((cursor, end_utc))
+    min_len = timedelta(minutes=min_minutes)
+    return [(a, b) for a, b in slots if b > a and b - a >= min_len]
+
+
+def convert_time(dt: datetime, zones: Sequence[str]) -> Dict[str, datetime]:
+    """The instant `dt` (tz-aware) as wall-clock time in each of `zones`."""
+    if dt.tzinfo is None:
+        raise ValueError("dt must be timezone-aware")
+    return {zone: dt.astimezone(ZoneInfo(zone)) for zone in zones}
@@ -0,0 +1,109 @@
+# timeboard_core/relocate.py
+"""
+Re-anchor events into a new reference timezone (e.g. after a move).
+
+Two modes:
+
+    keep_wall_clock  08:00 in the old zone becomes 08:00 in the new zone
+                     (the UTC instant changes)
+    keep_instant     the UTC instant stays; only the reference zone (and
+                     the weekday/day-of-month derived from it) changes
+
+`plan_relocation` is a dry run returning one `RelocationChange` per event
+that would change; `relocate_events` returns the re-anchored copies. Both
+run in a single pass with one ZoneInfo per distinct zone.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from .events import Event
+
+UTC = ZoneInfo("UTC")
+
+RELOCATION_MODES = {
+    "keep_wall_clock": "Keep wall-clock time",
+    "keep_instant": "Keep UTC instant",
+}
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+@dataclass(frozen=True)
+class RelocationChange:
+    event_id: str
+    title: str
+    from_tz: str
+    to_tz: str
+    start_before: datetime        # local time in from_tz
+    start_after: datetime         # local time in to_tz
+    shift_min: int                # change of the UTC instant
+    adjusted: bool = False        # wall time did not exist in to_tz (DST gap)
+
+
+def _rebase(dt: Optional[datetime], old_tz: ZoneInfo, new_tz: ZoneInfo) -> Optional[datetime]:
+    """Same wall-clock time, read in `new_tz`, as UTC."""
+    if dt is None:
+        return None
+    wall = dt.astimezone(old_tz).replace(tzinfo=new_tz)
+    return wall.astimezone(UTC)
+
+
+def _relocate(event: Event, target_tz: str, mode: str) -> Tuple[Event, bool]:
+    old_tz, new_tz = _zone(event.reference_tz), _zone(target_tz)
+    adjusted = False
+    if mode == "keep_wall_clock":
+        wall = event.start_utc.astimezone(old_tz).replace(tzinfo=new_tz)
+        start_utc = wall.astimezone(UTC)
+        adjusted = start_utc.astimezone(new_tz).replace(tzinfo=None) != wall.replace(tzinfo=None)
+        start_date = _rebase(event.start_date, old_tz, new_tz)
+        end_date = _rebase(event.end_date, old_tz, new_tz)
+    elif mode == "keep_instant":
+        start_utc, start_date, end_date = event.start_utc, event.start_date, event.end_date
+    else:
+        raise ValueError(f"Unknown relocation mode: {mode}")
+
+    start_local = start_utc.astimezone(new_tz)
+    relocated = replace(
+        event,
+        start_utc=start_utc,
+        start_date=start_date,
+        end_date=end_date,
+        reference_tz=target_tz,
+        weekday=start_local.weekday(),
+        month_day=start_local.day,
+        reminders_min=list(event.reminders_min),
+    )
+    return relocated, adjusted
+
+
+def plan_relocation(events: Iterable[Event], target_tz: str, mode: str) -> List[RelocationChange]:
+    """Dry run: what relocating `events` would change (unchanged events are left out)."""
+    _zone(target_tz)  # fail early on unknown zones
+    changes = []
+    for event in events:
+        if event.reference_tz == target_tz:
+            continue
+        relocated, adjusted = _relocate(event, target_tz, mode)
+        changes.append(RelocationChange(
+            event_id=event.id,
+            title=event.title,
+            from_tz=event.reference_tz,
+            to_tz=target_tz,
+            start_before=event.start_utc.astimezone(_zone(event.reference_tz)),
+            start_after=relocated.start_utc.astimezone(_zone(target_tz)),
+            shift_min=int((relocated.start_utc - event.start_utc).total_seconds() // 60),
+            adjusted=adjusted,
+        ))
+    return changes
+
+
+def relocate_events(events: Iterable[Event], target_tz: str, mode: str) -> List[Event]:
+    """Re-anchored copies of the events not already in `target_tz`."""
+    _zone(target_tz)
+    return [_relocate(e, target_tz, mode)[0] for e in events if e.reference_tz != target_tz]
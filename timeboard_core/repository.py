@@ -0,0 +1,126 @@
+# timeboard_core/repository.py
+"""
+Id-addressed editing of one board on top of the board registry.
+
+Lookups go through the snapshot's id -> event map (O(1), built once per
+board version). Every edit bumps the event's revision; bulk actions
+transform the whole selection in one pass and are written with a single
+store call, publishing exactly one new board version.
+"""
+from dataclasses import replace
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .board_registry import BoardRegistry, BoardSnapshot
+from .events import EVENT_CATEGORIES, Event, shift_event
+from .relocate import RelocationChange, plan_relocation, relocate_events
+
+
+class StaleRevisionError(ValueError):
+    """The event was changed by someone else since it was read."""
+
+
+class EventRepository:
+
+    def __init__(self, registry: BoardRegistry, board_id: str):
+        self.registry = registry
+        self.board_id = board_id
+
+    @property
+    def snapshot(self) -> BoardSnapshot:
+        return self.registry.snapshot(self.board_id)
+
+    def _by_id(self) -> Dict[str, Event]:
+        return self.snapshot.events_by_id()
+
+    def __len__(self) -> int:
+        return len(self._by_id())
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._by_id()
+
+    def get(self, event_id: str) -> Optional[Event]:
+        return self._by_id().get(event_id)
+
+    # --- Single events -----------------------------------------
+
+    def add(self, event: Event) -> Event:
+        self.registry.add(self.board_id, event)
+        return event
+
+    def edit(self, event_id: str, expected_revision: Optional[int] = None, **changes) -> Event:
+        """
+        Replace fields of one event in place and bump its revision.
+
+        Raises KeyError for unknown ids and StaleRevisionError if
+        `expected_revision` no longer matches the stored event.
+        """
+        current = self._by_id().get(event_id)
+        if current is None:
+            raise KeyError(event_id)
+        if expected_revision is not None and current.revision != expected_revision:
+            raise StaleRevisionError(
+                f"Event {event_id} is at revision {current.revision}, expected {expected_revision}"
+            )
+        changes.pop("id", None)
+        edited = replace(current, **changes, revision=current.revision + 1)
+        self.registry.update(self.board_id, edited)
+        return edited
+
+    # --- Bulk actions ------------------------------------------
+
+    def add_many(self, events: List[Event]) -> int:
+        """Store new events with one call (one board version)."""
+        if events:
+            self.registry.add_many(self.board_id, events)
+        return len(events)
+
+    def _select(self, event_ids: Iterable[str]) -> List[Event]:
+        by_id = self._by_id()
+        return [by_id[i] for i in dict.fromkeys(event_ids) if i in by_id]
+
+    def _write(self, edited: List[Event]) -> int:
+        """Bump revisions and store all edited events with one call."""
+        edited = [replace(e, revision=e.revision + 1) for e in edited]
+        if edited:
+            self.registry.update_many(self.board_id, edited)
+        return len(edited)
+
+    def _bulk(self, event_ids: Iterable[str], transform: Callable[[Event], Event]) -> int:
+        """Apply `transform` to every known id and write all results at once."""
+        return self._write([transform(e) for e in self._select(event_ids)])
+
+    def delete(self, event_ids: Iterable[str]) -> int:
+        ids = [e.id for e in self._select(event_ids)]
+        if ids:
+            self.registry.delete_many(self.board_id, ids)
+        return len(ids)
+
+    def recolor(self, event_ids: Iterable[str], color: str) -> int:
+        return self._bulk(event_ids, lambda e: replace(e, color=color))
+
+    def recategorize(self, event_ids: Iterable[str], category_id: str, recolor: bool = False) -> int:
+        """Move events to `category_id`, optionally taking the category's color."""
+        if category_id not in EVENT_CATEGORIES:
+            raise ValueError(f"Unknown category: {category_id}")
+        color = EVENT_CATEGORIES[category_id]["color"]
+        if recolor:
+            return self._bulk(event_ids, lambda e: replace(e, category_id=category_id, color=color))
+        return self._bulk(event_ids, lambda e: replace(e, category_id=category_id))
+
+    def shift(self, event_ids: Iterable[str], minutes: int) -> int:
+        """Move events (and their recurrence date range) by `minutes`."""
+        delta = timedelta(minutes=minutes)
+        return self._bulk(event_ids, lambda e: shift_event(e, delta))
+
+    def plan_relocation(self, event_ids: Iterable[str], target_tz: str, mode: str) -> List[RelocationChange]:
+        """Dry-run diff of `relocate` (nothing is written; memoized per board version)."""
+        ids = frozenset(event_ids)
+        return self.snapshot.cached(
+            ("relocation", ids, target_tz, mode),
+            lambda: plan_relocation(self._select(ids), target_tz, mode),
+        )
+
+    def relocate(self, event_ids: Iterable[str], target_tz: str, mode: str) -> int:
+        """Re-anchor events into `target_tz` (see timeboard_core.relocate)."""
+        return self._write(relocate_events(self._select(event_ids), target_tz, mode))
@@ -0,0 +1,272 @@
+# timeboard_core/series.py
+"""
+Arithmetic occurrence counting and random access per recurrence rule.
+
+`RuleSeries(event)` answers "how many occurrences start in [A, B)" and
+"what is the k-th occurrence" without expanding day by day, matching
+`instantiate_for_day` exactly:
+
+    daily / weekly / biweekly      arithmetic progressions of local days
+                                   (period 1, 7 or 14): floor division
+    monthly_* / bimonthly          one (two) slot(s) per month: month
+                                   arithmetic on the calendar table, with
+                                   prefix counts for months lacking the
+                                   day (31st, 5th Friday, ...)
+
+Occurrences are numbered from 0 starting at the series start (the event's
+start_date, else its first start) in the reference zone. Month-based
+rules are bounded by the calendar table's year span.
+"""
+from dataclasses import replace
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .calendar_tables import calendar_table, weekday_of, week_of_month
+from .events import Event, instantiate_for_day, wall_clock_anchor
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+_PERIODS = {"daily": 1, "weekly": 7, "biweekly": 14}
+_MONTHLY = ("monthly_date", "monthly_weekday", "monthly_last_weekday", "bimonthly")
+
+
+def _count_progression(residue: int, period: int, lo: int, hi: int) -> int:
+    """Integers d in [lo, hi) with d % period == residue."""
+    if hi <= lo:
+        return 0
+    return (hi - 1 - residue) // period - (lo - 1 - residue) // period
+
+
+class RuleSeries:
+    """Occurrence arithmetic for one event (any recurrence type)."""
+
+    def __init__(self, event: Event):
+        self.event = event
+        self.calendar = calendar_table()
+        self.recurrence = event.recurrence or "once"
+        self.empty = False
+
+        if self.recurrence == "once":
+            self.first_day = self.last_day = None
+            # Its local day in the reference zone, like the recurring rules' days
+            self.once_day = zone_table(event.reference_tz or "UTC").to_local(
+                int(event.start_utc.timestamp())) // SECONDS_PER_DAY
+            return
+
+        self.table, self.wall, self.slot_shift, start_day, end_day = wall_clock_anchor(event)
+        anchor_day = (self.table.to_local(int(event.start_utc.timestamp()))) // SECONDS_PER_DAY
+        self.start_day = start_day       # inclusive, None = no lower bound
+        self.last_day = end_day          # inclusive, None = forever
+        self.first_day = start_day if start_day is not None else anchor_day   # occurrence 0 from here
+
+        weekday = event.weekday
+        if self.recurrence in _PERIODS:
+            self.period = _PERIODS[self.recurrence]
+            if self.recurrence == "daily":
+                self.residue = 0
+            elif weekday is None or (self.recurrence == "biweekly" and start_day is None):
+                self.empty = True
+            elif self.recurrence == "weekly":
+                self.residue = (weekday - 3) % 7
+            else:
+                first = start_day + (weekday - weekday_of(start_day)) % 7
+                self.residue = first % 14
+        elif self.recurrence in _MONTHLY:
+            self.slots = self._month_slots(start_day)
+            self.empty = not self.slots
+        else:
+            self.empty = True
+
+    # --- Monthly slots ------------------------------------------
+
+    def _month_slots(self, start_day: Optional[int]) -> List[Tuple[Optional[tuple], object]]:
+        """
+        (month set key or None for "every month", day(month index) -> epoch day)
+        per occurrence slot of a month, in calendar order.
+        """
+        cal, event = self.calendar, self.event
+        starts, lengths, first_wd = cal.month_start, cal.month_length, cal.first_weekday
+        rec = self.recurrence
+
+        if rec == "monthly_date":
+            d = event.month_day
+            if d is None or not 1 <= d <= 31:
+                return []
+            return [(("day", d) if d > 28 else None, lambda i: starts[i] + d - 1)]
+        if rec == "bimonthly":
+            return [(None, lambda i: starts[i]), (None, lambda i: starts[i] + 14)]
+
+        w = event.weekday
+        if w is None:
+            return []
+        if rec == "monthly_last_weekday":
+            def last(i):
+                first = (w - first_wd[i]) % 7
+                return starts[i] + first + 7 * ((lengths[i] - 1 - first) // 7)
+            return [(None, last)]
+
+        # monthly_weekday: same week-of-month as the series start
+        if start_day is None:
+            return []
+        n = week_of_month(cal.day_of_month(start_day))
+        return [(("fifth", w) if n == 4 else None, lambda i: starts[i] + (w - first_wd[i]) % 7 + 7 * n)]
+
+    def _slot_exists(self, key, i: int) -> bool:
+        if key is None:
+            return True
+        kind, value = key
+        return self.calendar.has_day(i, value) if kind == "day" else self.calendar.has_fifth_weekday(i, value)
+
+    def _slot_count(self, key, lo: int, hi: int) -> int:
+        return hi - lo if key is None else self.calendar.count_months(key, lo, hi)
+
+    def _month_range(self, lo: int, hi: int) -> Tuple[int, int, int, int]:
+        """Clip local days [lo, hi) to the calendar span; returns (lo, hi, first month, last month)."""
+        cal = self.calendar
+        lo, hi = max(lo, cal.first_day), min(hi, cal.end_day)
+        if hi <= lo:
+            return lo, hi, 0, -1
+        return lo, hi, cal.month_index(lo), cal.month_index(hi - 1)
+
+    # --- Counting -----------------------------------------------
+
+    def count_days(self, lo: int, hi: int) -> int:
+        """Occurrences on local days [lo, hi)."""
+        if self.empty:
+            return 0
+        if self.recurrence == "once":
+            return 1 if lo <= self.once_day < hi else 0
+        if self.start_day is not None:
+            lo = max(lo, self.start_day)
+        if self.last_day is not None:
+            hi = min(hi, self.last_day + 1)
+        if hi <= lo:
+            return 0
+
+        if self.recurrence in _PERIODS:
+            return _count_progression(self.residue, self.period, lo, hi)
+
+        lo, hi, m_lo, m_hi = self._month_range(lo, hi)
+        total = 0
+        for key, day_of in self.slots:
+            if m_hi < m_lo:
+                break
+            n = self._slot_count(key, m_lo, m_hi + 1)
+            if self._slot_exists(key, m_lo) and day_of(m_lo) < lo:
+                n -= 1
+            if self._slot_exists(key, m_hi) and day_of(m_hi) >= hi:
+                n -= 1
+            total += n
+        return total
+
+    def _local_day_at(self, utc_ts: int) -> int:
+        """First local day whose occurrence starts at or after `utc_ts`."""
+        day = self.table.to_local(utc_ts) // SECONDS_PER_DAY - 1
+        while self.table.to_utc(day * SECONDS_PER_DAY + self.wall) < utc_ts:
+            day += 1
+        return day
+
+    def count(self, start_utc: datetime, end_utc: datetime) -> int:
+        """Occurrences starting in [start_utc, end_utc)."""
+        if self.recurrence == "once" or self.empty:
+            return 0 if self.empty else int(start_utc <= self.event.start_utc < end_utc)
+        lo = self._local_day_at(int(start_utc.timestamp()))
+        hi = self._local_day_at(int(end_utc.timestamp()))
+        return self.count_days(lo, hi)
+
+    def total(self) -> Optional[int]:
+        """Number of occurrences of a bounded series (None if it never ends)."""
+        if self.recurrence == "once":
+            return 1
+        if self.empty:
+            return 0
+        if self.start_day is None or self.last_day is None:
+            return None
+        return self.count_days(self.start_day, self.last_day + 1)
+
+    def index_at(self, instant_utc: datetime) -> int:
+        """Index of the first occurrence starting at or after `instant_utc`."""
+        if self.recurrence == "once" or self.empty:
+            return 0 if self.empty or instant_utc <= self.event.start_utc else 1
+        return self.count_days(self.first_day, self._local_day_at(int(instant_utc.timestamp())))
+
+    # --- Random access ------------------------------------------
+
+    def nth_day(self, k: int) -> Optional[int]:
+        """Local day of the k-th (0-based) occurrence, None if the series is shorter."""
+        if self.empty or self.recurrence == "once":
+            return None
+        if k < 0 and self.start_day is not None:
+            return None   # negative indices only reach back in open-ended series
+        origin = self.first_day
+
+        if self.recurrence in _PERIODS:
+            day = origin + (self.residue - origin) % self.period + k * self.period
+        else:
+            day = self._nth_monthly(origin, k)
+            if day is None:
+                return None
+
+        if self.last_day is not None and day > self.last_day:
+            return None
+        return day
+
+    def _nth_monthly(self, origin: int, k: int) -> Optional[int]:
+        m0 = self.calendar.month_index(origin)
+        if m0 is None:
+            return None
+        slots = self.slots
+        if len(slots) == 1:
+            key, day_of = slots[0]
+            # occurrences before the origin, counted from month 0
+            rank = self._slot_count(key, 0, m0)
+            if self._slot_exists(key, m0) and day_of(m0) < origin:
+                rank += 1
+            month = rank + k if key is None else self.calendar.nth_month(key, rank + k)
+            if month is None or not 0 <= month < self.calendar.n_months:
+                return None
+            return day_of(month)
+
+        # Several slots, each in every month (bimonthly)
+        per_month = len(slots)
+        rank = m0 * per_month + sum(1 for _, day_of in slots if day_of(m0) < origin)
+        month, slot = divmod(rank + k, per_month)
+        if not 0 <= month < self.calendar.n_months:
+            return None
+        return slots[slot][1](month)
+
+    def nth(self, k: int) -> Optional[Event]:
+        """The k-th (0-based) occurrence as a concrete Event."""
+        if self.recurrence == "once":
+            return self.event if k == 0 else None
+        day = self.nth_day(k)
+        if day is None:
+            return None
+        slot_day_utc = datetime.fromtimestamp((day + self.slot_shift) * SECONDS_PER_DAY, self.event.start_utc.tzinfo)
+        return instantiate_for_day(self.event, slot_day_utc)
+
+    def page(self, offset: int, limit: int) -> List[Event]:
+        """Occurrences offset .. offset+limit-1 (shorter at the end of the series)."""
+        page = []
+        for k in range(offset, offset + limit):
+            occ = self.nth(k)
+            if occ is None:
+                break
+            page.append(occ)
+        return page
+
+    def last_occurrence_day(self, count: int) -> Optional[int]:
+        """Local day of the count-th occurrence: the end date of a COUNT-limited series."""
+        return self.nth_day(count - 1) if count > 0 else None
+
+
+def end_date_for_count(event: Event, count: int) -> Optional[datetime]:
+    """
+    end_date making `event` stop after `count` occurrences (23:59 local
+    time on the last one's date, like an end date picked in the form).
+    """
+    series = RuleSeries(replace(event, end_date=None))
+    day = series.last_occurrence_day(count)
+    if day is None:
+        return None
+    return datetime.fromtimestamp(series.table.to_utc(day * SECONDS_PER_DAY + 23 * 3600 + 59 * 60),
+                                  event.start_utc.tzinfo)
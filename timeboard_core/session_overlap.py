@@ -0,0 +1,169 @@
+# timeboard_core/session_overlap.py
+"""
+How much of each category's time falls into each exchange's trading hours.
+
+Per category, occurrences over the report range are collected as UTC
+intervals, merged (overlapping events count once) and cut at the report's
+bucket boundaries (weeks / months in a report timezone). The overlap with
+an exchange is read off the category's cumulative busy time at each of
+the exchange's precomputed session starts and ends: a bisect each, and
+there are only a few hundred sessions per exchange and year. No per-day
+datetime work is involved, so a year across all categories and exchanges
+is cheap enough to recompute for every board version.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .events import EVENT_CATEGORIES, Event
+from .occurrence_sets import date_of_day, day_of_date
+from .time_accounting import REPORT_PERIODS, bucket_end, occurrence_spans
+from .trading_calendar import Interval, session_intervals
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sorted union of intervals."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def category_intervals(events: Iterable[Event], start_ts: int, end_ts: int) -> Dict[str, List[Interval]]:
+    """Merged occurrence intervals per category, clipped to [start_ts, end_ts)."""
+    # Reference-zone local days that can hold an occurrence touching the range
+    lo_day = start_ts // SECONDS_PER_DAY - 2
+    hi_day = end_ts // SECONDS_PER_DAY + 2
+    spans: Dict[str, List[Interval]] = {}
+    for event in events:
+        if event.duration_min <= 0:
+            continue
+        target = spans.setdefault(event.category_id, [])
+        for start, end in occurrence_spans(event, lo_day - event.duration_min // 1440, hi_day):
+            if end > start_ts and start < end_ts:
+                target.append((max(start, start_ts), min(end, end_ts)))
+    return {c: merge_intervals(iv) for c, iv in spans.items() if iv}
+
+
+def _split(intervals: Sequence[Interval], bounds: Sequence[int]) -> List[Tuple[int, int, int]]:
+    """(bucket, start, end) pieces of `intervals` cut at `bounds`."""
+    pieces = []
+    for start, end in intervals:
+        i = bisect_right(bounds, start) - 1
+        while start < end and 0 <= i < len(bounds) - 1:
+            piece_end = min(end, bounds[i + 1])
+            pieces.append((i, start, piece_end))
+            start = piece_end
+            i += 1
+    return pieces
+
+
+def _covered_before(intervals: Sequence[Interval], times: Sequence[int]) -> List[int]:
+    """Seconds of sorted, disjoint `intervals` before each of `times` (a bisect each)."""
+    starts = [a for a, _ in intervals]
+    cumulative = [0]
+    for a, b in intervals:
+        cumulative.append(cumulative[-1] + b - a)
+    result = []
+    for t in times:
+        i = bisect_right(starts, t) - 1
+        if i < 0:
+            result.append(0)
+        else:
+            a, b = intervals[i]
+            result.append(cumulative[i] + (t if t < b else b) - a)
+    return result
+
+
+@dataclass(frozen=True)
+class SessionOverlapReport:
+    tz: str
+    period: str
+    buckets: Tuple[date, ...]                              # bucket start dates
+    exchange_ids: Tuple[str, ...]
+    category_hours: Dict[str, Tuple[float, ...]]           # category -> hours per bucket
+    overlap_hours: Dict[Tuple[str, str], Tuple[float, ...]]  # (category, exchange) -> hours per bucket
+
+    @property
+    def categories(self) -> List[str]:
+        order = list(EVENT_CATEGORIES)
+        return sorted(self.category_hours, key=lambda c: (order.index(c) if c in order else len(order), c))
+
+    def share(self, category_id: str, exchange_id: str, bucket: int) -> float:
+        """Fraction of the category's hours in `bucket` that fall into the exchange's sessions."""
+        total = self.category_hours[category_id][bucket]
+        return self.overlap_hours[(category_id, exchange_id)][bucket] / total if total else 0.0
+
+    def rows(self) -> List[Dict]:
+        """One flat row per (bucket, category, exchange) with time in the category."""
+        rows = []
+        for b, bucket in enumerate(self.buckets):
+            for category_id in self.categories:
+                hours = self.category_hours[category_id][b]
+                if not hours:
+                    continue
+                for exchange_id in self.exchange_ids:
+                    rows.append({
+                        "bucket": bucket,
+                        "category_id": category_id,
+                        "exchange_id": exchange_id,
+                        "category_hours": hours,
+                        "overlap_hours": self.overlap_hours[(category_id, exchange_id)][b],
+                    })
+        return rows
+
+
+def session_overlap_report(
+    events: Iterable[Event],
+    exchange_ids: Sequence[str],
+    tz: str,
+    start: date,
+    end: date,
+    period: str = "week",
+) -> SessionOverlapReport:
+    """Category time vs. exchange sessions per week / month (or day) of [start, end) in `tz`."""
+    if period not in REPORT_PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    table = zone_table(tz)
+    days = [day_of_date(start)]
+    while days[-1] < day_of_date(end):
+        days.append(min(bucket_end(days[-1], period), day_of_date(end)))
+    bounds = [table.to_utc(day * SECONDS_PER_DAY) for day in days]
+    start_ts, end_ts = bounds[0], bounds[-1]
+
+    n_buckets = len(days) - 1
+    # Session pieces and their (start, end) times flattened in ascending order
+    session_pieces = {}
+    for exchange_id in exchange_ids:
+        pieces = _split(session_intervals(exchange_id, start_ts, end_ts), bounds)
+        session_pieces[exchange_id] = (pieces, [t for _, a, b in pieces for t in (a, b)])
+
+    category_hours = {}
+    overlap_hours = {}
+    for category_id, intervals in category_intervals(events, start_ts, end_ts).items():
+        seconds = [0] * n_buckets
+        for bucket, piece_start, piece_end in _split(intervals, bounds):
+            seconds[bucket] += piece_end - piece_start
+        category_hours[category_id] = tuple(x / 3600 for x in seconds)
+
+        for exchange_id, (pieces, times) in session_pieces.items():
+            covered = _covered_before(intervals, times)
+            seconds = [0] * n_buckets
+            for k, (bucket, _, _) in enumerate(pieces):
+                seconds[bucket] += covered[2 * k + 1] - covered[2 * k]
+            overlap_hours[(category_id, exchange_id)] = tuple(x / 3600 for x in seconds)
+
+    return SessionOverlapReport(
+        tz=tz,
+        period=period,
+        buckets=tuple(date_of_day(d) for d in days[:-1]),
+        exchange_ids=tuple(exchange_ids),
+        category_hours=category_hours,
+        overlap_hours=overlap_hours,
+    )
@@ -83,6 +83,17 @@ MINUTE_STEPS = {
     30: "30 min",
 }
 
+# Exchanges shown by the trading-session overlay (see timeboard_core/exchanges)
+DEFAULT_TRADING_EXCHANGES = ["tokyo", "london", "new_york"]
+
+# Weekly hour targets per event category (plan-vs-target budgets)
+DEFAULT_CATEGORY_BUDGETS: Dict[str, float] = {
+    "sleep": 56.0,
+    "work": 40.0,
+    "gym": 4.0,
+    "bible_reading": 3.5,
+}
+
 
 @dataclass
 class UserSettings:
@@ -98,6 +109,7 @@ class UserSettings:
     
     # Show trading sessions (default: off)
     show_trading_sessions: bool = False
+    trading_exchanges: List[str] = field(default_factory=lambda: DEFAULT_TRADING_EXCHANGES.copy())
     
     # Show daylight/sunrise/sunset visualization (default: off)
     show_daylight: bool = False
@@ -111,4 +123,7 @@ class UserSettings:
     zoom_level: str = "week"
     
     # Minute steps for time selection: 1, 5, 15, 30
-    minute_step: int = 5
\ No newline at end of file
+    minute_step: int = 5
+
+    # Weekly hour targets per category for the time summary
+    category_budgets: Dict[str, float] = field(default_factory=lambda: DEFAULT_CATEGORY_BUDGETS.copy())
\ No newline at end of file
@@ -0,0 +1,227 @@
+# timeboard_core/sleep_analytics.py
+"""
+Rolling sleep totals, sleep debt and short-night detection.
+
+A `SleepTracker` keeps per-day arrays over a span of local days (in one
+timezone): night sleep (attributed to the wake-up day), naps (attributed
+to their day) and rolling 7/14/30-day sums of both. It is fed by
+`sync(version, events)`, which diffs the board's sleep events against the
+last sync and only expands the ones that were added, edited or removed:
+
+    - each event's per-day contribution is remembered, so removing it
+      needs no re-expansion
+    - rolling sums are re-accumulated with a sliding window only from
+      the first changed day to the last changed day + window, so editing
+      a one-off night costs O(window)
+
+Sleep debt for a window is `window * target - rolling total` (positive =
+behind), the target being an input of the query, not of the tracker.
+
+The span is fixed between syncs; `cover` grows it (to whole years) when
+the board's sleep events (`sleep_span`) or a query reach past it, and
+the next sync then re-expands every sleep event once.
+"""
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+
+from .events import EVENT_CATEGORIES, Event, rule_signature
+from .occurrence_sets import date_of_day, day_of_date
+from .time_accounting import occurrence_spans
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+SLEEP_CATEGORY = "sleep"
+ROLLING_WINDOWS = (7, 14, 30)
+
+DEFAULT_TARGET_HOURS = 8.0
+# Sleep blocks up to this long count as naps, longer ones as nights
+NAP_MAX_MIN = 180
+# Nights shorter than this (without a nap that day) are flagged
+SHORT_NIGHT_MIN = EVENT_CATEGORIES[SLEEP_CATEGORY].get("min_duration_warning", 360)
+
+
+@dataclass(frozen=True)
+class SleepDay:
+    day: date
+    night_hours: float
+    nap_hours: float
+    rolling_hours: Dict[int, float]     # window (days) -> total hours ending this day
+    short_night_no_nap: bool
+
+    @property
+    def total_hours(self) -> float:
+        return self.night_hours + self.nap_hours
+
+    def debt_hours(self, window: int, target_hours: float = DEFAULT_TARGET_HOURS) -> float:
+        """Hours behind `target_hours` per day over the window ending this day."""
+        return window * target_hours - self.rolling_hours[window]
+
+
+def sleep_span(events: Iterable[Event]) -> Optional[Tuple[date, date]]:
+    """
+    (first, last) dates the board's sleep events reach, with a day of
+    slack for the zone; open-ended rules only count up to their start.
+    None without sleep events.
+    """
+    first = last = None
+    for event in events:
+        if event.category_id != SLEEP_CATEGORY:
+            continue
+        start = (event.start_date or event.start_utc).date() - timedelta(days=1)
+        end = max(event.end_date or event.start_utc, event.start_utc).date() + timedelta(days=2)
+        first = start if first is None else min(first, start)
+        last = end if last is None else max(last, end)
+    return None if first is None else (first, last)
+
+
+class SleepTracker:
+
+    def __init__(self, tz: str, first: date, last: date):
+        self.tz = tz
+        self._table = zone_table(tz)
+        self._lock = threading.Lock()
+        self._reset(day_of_date(first), day_of_date(last))
+
+    def _reset(self, first_day: int, last_day: int):
+        """Empty span first_day..last_day; the next sync expands every event."""
+        self.first_day = first_day
+        self.n_days = last_day - first_day + 1
+        self.version: Optional[int] = None
+
+        zeros = bytes(8 * self.n_days)
+        self.night = array("q", zeros)          # seconds per day
+        self.nap = array("q", zeros)
+        self.rolling = {w: array("q", zeros) for w in ROLLING_WINDOWS}
+        self._flagged: List[int] = []           # sorted day indexes
+        self._events: Dict[str, Tuple[tuple, List[Tuple[int, int, int]]]] = {}
+
+    def covers(self, first: date, last: date) -> bool:
+        return self.first_day <= day_of_date(first) and day_of_date(last) < self.first_day + self.n_days
+
+    def cover(self, first: date, last: date) -> bool:
+        """
+        Grow the span to whole years including first..last (it never
+        shrinks). Returns True if it grew; sync again before querying.
+        """
+        with self._lock:
+            if self.covers(first, last):
+                return False
+            lo = min(day_of_date(first), self.first_day)
+            hi = max(day_of_date(last), self.first_day + self.n_days - 1)
+            self._reset(day_of_date(date(date_of_day(lo).year, 1, 1)),
+                        day_of_date(date(date_of_day(hi).year, 12, 31)))
+            return True
+
+    # --- Sync ---------------------------------------------------
+
+    def _contribution(self, event: Event) -> List[Tuple[int, int, int]]:
+        """(day index, night seconds, nap seconds) per occurrence inside the span."""
+        to_local = self._table.to_local
+        slack = 2 + event.duration_min // 1440
+        entries = []
+        for start, end in occurrence_spans(event, self.first_day - slack, self.first_day + self.n_days + slack):
+            seconds = end - start
+            if event.duration_min > NAP_MAX_MIN:
+                i, night, nap = to_local(end) // SECONDS_PER_DAY - self.first_day, seconds, 0
+            else:
+                i, night, nap = to_local(start) // SECONDS_PER_DAY - self.first_day, 0, seconds
+            if 0 <= i < self.n_days:
+                entries.append((i, night, nap))
+        return entries
+
+    def sync(self, version: Optional[int], events: Iterable[Event]) -> int:
+        """
+        Bring the tracker up to `events` (a board version's events) and
+        return how many sleep events changed. A repeated version is a no-op.
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            changes: Dict[int, List[int]] = {}
+
+            def apply(entries, sign):
+                for i, night, nap in entries:
+                    delta = changes.setdefault(i, [0, 0])
+                    delta[0] += sign * night
+                    delta[1] += sign * nap
+
+            current = {e.id: e for e in events if e.category_id == SLEEP_CATEGORY}
+            changed = 0
+            for event_id in [i for i in self._events if i not in current]:
+                apply(self._events.pop(event_id)[1], -1)
+                changed += 1
+            for event_id, event in current.items():
+                signature = rule_signature(event)
+                known = self._events.get(event_id)
+                if known is not None and known[0] == signature:
+                    continue
+                if known is not None:
+                    apply(known[1], -1)
+                entries = self._contribution(event)
+                apply(entries, +1)
+                self._events[event_id] = (signature, entries)
+                changed += 1
+
+            self._apply(changes)
+            self.version = version
+            return changed
+
+    def _apply(self, changes: Dict[int, List[int]]):
+        changes = {i: d for i, d in changes.items() if d[0] or d[1]}
+        if not changes:
+            return
+        for i, (night, nap) in changes.items():
+            self.night[i] += night
+            self.nap[i] += nap
+            self._reflag(i)
+
+        night, nap, n = self.night, self.nap, self.n_days
+        lo, hi = min(changes), max(changes)
+        for window, rolling in self.rolling.items():
+            # Sliding sum from the first changed day until the last change leaves the window
+            acc = rolling[lo - 1] if lo else 0
+            for i in range(lo, min(hi + window, n)):
+                acc += night[i] + nap[i]
+                if i >= window:
+                    acc -= night[i - window] + nap[i - window]
+                rolling[i] = acc
+
+    def _reflag(self, i: int):
+        short = 0 < self.night[i] < SHORT_NIGHT_MIN * 60 and self.nap[i] == 0
+        pos = bisect_left(self._flagged, i)
+        present = pos < len(self._flagged) and self._flagged[pos] == i
+        if short and not present:
+            insort(self._flagged, i)
+        elif present and not short:
+            del self._flagged[pos]
+
+    # --- Queries ------------------------------------------------
+
+    def _index(self, day: int) -> int:
+        return min(max(day - self.first_day, 0), self.n_days)
+
+    def day(self, d: date) -> Optional[SleepDay]:
+        i = day_of_date(d) - self.first_day
+        if not 0 <= i < self.n_days:
+            return None
+        return SleepDay(
+            day=d,
+            night_hours=self.night[i] / 3600,
+            nap_hours=self.nap[i] / 3600,
+            rolling_hours={w: r[i] / 3600 for w, r in self.rolling.items()},
+            short_night_no_nap=0 < self.night[i] < SHORT_NIGHT_MIN * 60 and self.nap[i] == 0,
+        )
+
+    def series(self, start: date, end: date) -> List[SleepDay]:
+        """SleepDay per day in [start, end) (clipped to the span)."""
+        lo, hi = self._index(day_of_date(start)), self._index(day_of_date(end))
+        return [self.day(date_of_day(self.first_day + i)) for i in range(lo, hi)]
+
+    def short_nights(self, start: date, end: date) -> List[date]:
+        """Days in [start, end) with a short night and no nap."""
+        lo, hi = self._index(day_of_date(start)), self._index(day_of_date(end))
+        flagged = self._flagged
+        return [date_of_day(self.first_day + i) for i in flagged[bisect_left(flagged, lo):bisect_left(flagged, hi)]]
@@ -0,0 +1,464 @@
+# timeboard_core/subscriptions.py
+"""
+Board subscriptions to external calendars (.ics URLs or local files).
+
+Usage:
+    python -m timeboard_core.subscriptions add https://example.com/team.ics --category work
+    python -m timeboard_core.subscriptions refresh          # all, concurrently
+    python -m timeboard_core.subscriptions list
+
+Subscriptions live in a JSON file (TIMEBOARD_SUBSCRIPTIONS, default
+subscriptions.json) together with the validators of their last fetch;
+other boards of the app use their own file (`subscriptions_path`), so
+neither the list nor the validators are shared between boards.
+`SubscriptionRefresher.refresh` polls them concurrently on an asyncio
+loop (blocking I/O and parsing run in worker threads):
+
+    - URLs are fetched with If-None-Match / If-Modified-Since; a 304, or a
+      body identical to the last one, ends the refresh there
+    - files are skipped while their mtime and size are unchanged
+    - VEVENT blocks are hashed and only new or changed blocks are
+      converted to events (per subscription, kept in memory)
+    - board events of a subscription have the id `ics:<subscription>:<UID>`,
+      so the diff against the board is by UID and the board receives only
+      the creates, updates and deletes that are needed
+
+The app runs refreshes on a background thread (`BackgroundRefresh`), so
+the UI never waits for the network.
+"""
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import urllib.request
+import uuid
+
+from .board_registry import BoardRegistry
+from .events import Event, rule_signature
+from .ics import split_vevents, vevent_to_events
+
+DEFAULT_SUBSCRIPTIONS_PATH = os.environ.get("TIMEBOARD_SUBSCRIPTIONS", "subscriptions.json")
+DEFAULT_REFRESH_INTERVAL_S = 15 * 60
+DEFAULT_CONCURRENCY = 16
+FETCH_TIMEOUT_S = 20
+ID_PREFIX = "ics:"
+
+
+@dataclass
+class Subscription:
+    id: str
+    source: str                       # http(s)/webcal URL or file path
+    category_id: str = "custom"       # for events without a known CATEGORIES value
+    default_tz: str = "UTC"           # for floating times and all-day events
+    color: Optional[str] = None       # None: category color
+
+    # Validators of the last successful fetch
+    etag: str = ""
+    last_modified: str = ""
+    mtime_ns: int = 0
+    size: int = -1
+    content_hash: str = ""
+    last_refresh: str = ""
+    last_error: str = ""
+
+    @property
+    def event_prefix(self) -> str:
+        return f"{ID_PREFIX}{self.id}:"
+
+    @property
+    def is_url(self) -> bool:
+        return urlsplit(self.source).scheme in ("http", "https", "webcal")
+
+
+def new_subscription(source: str, **options) -> Subscription:
+    return Subscription(id=uuid.uuid4().hex[:12], source=source, **options)
+
+
+# --- Persistence ----------------------------------------------------
+
+def subscriptions_path(board_id: str, base: str = DEFAULT_SUBSCRIPTIONS_PATH) -> str:
+    """The subscriptions file of board `board_id`: `base` with the (quoted) id before the suffix."""
+    root, ext = os.path.splitext(base)
+    return f"{root}.{quote(board_id, safe='')}{ext or '.json'}"
+
+
+def load_subscriptions(path: str = DEFAULT_SUBSCRIPTIONS_PATH) -> List[Subscription]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    known = {f.name for f in fields(Subscription)}
+    return [Subscription(**{k: v for k, v in item.items() if k in known}) for item in data]
+
+
+def save_subscriptions(subscriptions: List[Subscription], path: str = DEFAULT_SUBSCRIPTIONS_PATH) -> None:
+    """Write atomically (temp file + rename)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump([asdict(s) for s in subscriptions], fh, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# --- Fetching -------------------------------------------------------
+
+@dataclass
+class Fetched:
+    changed: bool
+    text: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    mtime_ns: int = 0
+    size: int = -1
+    content_hash: str = ""
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def fetch_source(subscription: Subscription, timeout: float = FETCH_TIMEOUT_S) -> Fetched:
+    """Conditional fetch (blocking); `changed` is False when nothing new arrived."""
+    if subscription.is_url:
+        url = subscription.source
+        if url.startswith("webcal://"):
+            url = "https://" + url[len("webcal://"):]
+        request = urllib.request.Request(url, headers={"User-Agent": "TimeBoard"})
+        if subscription.etag:
+            request.add_header("If-None-Match", subscription.etag)
+        if subscription.last_modified:
+            request.add_header("If-Modified-Since", subscription.last_modified)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                data = response.read()
+                charset = response.headers.get_content_charset() or "utf-8"
+                etag = response.headers.get("ETag", "")
+                last_modified = response.headers.get("Last-Modified", "")
+        except HTTPError as exc:
+            if exc.code == 304:
+                return Fetched(changed=False)
+            raise
+        digest = _content_hash(data)
+        return Fetched(
+            changed=digest != subscription.content_hash,
+            text=data.decode(charset, errors="replace"),
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=digest,
+        )
+
+    path = subscription.source
+    if path.startswith("file://"):
+        path = urlsplit(path).path
+    stat = os.stat(path)
+    if stat.st_mtime_ns == subscription.mtime_ns and stat.st_size == subscription.size:
+        return Fetched(changed=False)
+    with open(path, "rb") as fh:
+        data = fh.read()
+    digest = _content_hash(data)
+    return Fetched(
+        changed=digest != subscription.content_hash,
+        text=data.decode("utf-8", errors="replace"),
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        content_hash=digest,
+    )
+
+
+# --- Diffing --------------------------------------------------------
+
+def _same(a: Event, b: Event) -> bool:
+    return (
+        rule_signature(a) == rule_signature(b)
+        and a.title == b.title
+        and a.color == b.color
+        and list(a.reminders_min) == list(b.reminders_min)
+    )
+
+
+def diff_events(existing: Dict[str, Event], incoming: Dict[str, Event]) -> Tuple[List[Event], List[Event], List[str]]:
+    """(creates, updates, delete ids) turning `existing` into `incoming` (both keyed by id)."""
+    creates, updates = [], []
+    for event_id, event in incoming.items():
+        current = existing.get(event_id)
+        if current is None:
+            creates.append(event)
+        elif not _same(current, event):
+            updates.append(replace(event, revision=current.revision + 1))
+    deletes = [event_id for event_id in existing if event_id not in incoming]
+    return creates, updates, deletes
+
+
+@dataclass
+class RefreshResult:
+    subscription_id: str
+    status: str = "unchanged"         # unchanged | updated | error
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    parsed_blocks: int = 0            # VEVENT blocks converted (new or changed)
+    warnings: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+# --- Refresh --------------------------------------------------------
+
+class SubscriptionRefresher:
+    """Refreshes one board's subscriptions; keeps per-block parse caches between runs."""
+
+    def __init__(self, registry: BoardRegistry, board_id: str, concurrency: int = DEFAULT_CONCURRENCY):
+        self.registry = registry
+        self.board_id = board_id
+        self.concurrency = concurrency
+        # subscription id -> block hash -> (events, warnings)
+        self._blocks: Dict[str, Dict[str, Tuple[List[Event], List[str]]]] = {}
+
+    def _existing(self, subscriptions: List[Subscription]) -> Dict[str, Dict[str, Event]]:
+        by_prefix = {s.event_prefix: {} for s in subscriptions}
+        for event_id, event in self.registry.snapshot(self.board_id).events_by_id().items():
+            if event_id.startswith(ID_PREFIX):
+                prefix = event_id[:event_id.index(":", len(ID_PREFIX)) + 1]
+                if prefix in by_prefix:
+                    by_prefix[prefix][event_id] = event
+        return {s.id: by_prefix[s.event_prefix] for s in subscriptions}
+
+    def _convert(self, subscription: Subscription, text: str) -> Tuple[Dict[str, Event], List[str], int]:
+        """Events of a calendar; blocks seen in the previous run are not parsed again."""
+        previous = self._blocks.get(subscription.id, {})
+        current: Dict[str, Tuple[List[Event], List[str]]] = {}
+        parsed = 0
+        # Conversion options are part of the key: changing them re-parses
+        options = f"{subscription.category_id}|{subscription.default_tz}|{subscription.color}\n"
+        for block in split_vevents(text):
+            digest = _content_hash((options + block).encode("utf-8"))
+            if digest in current:
+                continue
+            if digest in previous:
+                current[digest] = previous[digest]
+                continue
+            parsed += 1
+            try:
+                uid, events, warnings = vevent_to_events(
+                    block, subscription.event_prefix, subscription.category_id,
+                    subscription.default_tz, subscription.color,
+                )
+                current[digest] = (events, [f"{uid}: {w}" for w in warnings])
+            except Exception as exc:  # one bad VEVENT must not stop the calendar
+                current[digest] = ([], [f"unreadable VEVENT: {type(exc).__name__}: {exc}"])
+        self._blocks[subscription.id] = current
+
+        incoming: Dict[str, Event] = {}
+        warnings: List[str] = []
+        for events, block_warnings in current.values():
+            warnings.extend(block_warnings)
+            for event in events:
+                incoming[event.id] = event
+        return incoming, warnings, parsed
+
+    def _apply(self, creates: List[Event], updates: List[Event], deletes: List[str]) -> None:
+        if creates:
+            self.registry.add_many(self.board_id, creates)
+        if updates:
+            self.registry.update_many(self.board_id, updates)
+        if deletes:
+            self.registry.delete_many(self.board_id, deletes)
+
+    async def _refresh_one(
+        self, subscription: Subscription, existing: Dict[str, Event], semaphore: asyncio.Semaphore
+    ) -> RefreshResult:
+        result = RefreshResult(subscription.id)
+        async with semaphore:
+            try:
+                fetched = await asyncio.to_thread(fetch_source, subscription)
+                if fetched.changed:
+                    incoming, result.warnings, result.parsed_blocks = await asyncio.to_thread(
+                        self._convert, subscription, fetched.text
+                    )
+                    creates, updates, deletes = diff_events(existing, incoming)
+                    await asyncio.to_thread(self._apply, creates, updates, deletes)
+                    result.created, result.updated, result.deleted = len(creates), len(updates), len(deletes)
+                    if creates or updates or deletes:
+                        result.status = "updated"
+                # Validators are only advanced once the board has the content
+                if fetched.content_hash:
+                    subscription.etag = fetched.etag
+                    subscription.last_modified = fetched.last_modified
+                    subscription.mtime_ns = fetched.mtime_ns
+                    subscription.size = fetched.size
+                    subscription.content_hash = fetched.content_hash
+                subscription.last_error = ""
+            except Exception as exc:  # one bad source must not stop the others
+                result.status = "error"
+                result.error = subscription.last_error = f"{type(exc).__name__}: {exc}"
+        subscription.last_refresh = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return result
+
+    async def refresh(self, subscriptions: List[Subscription]) -> List[RefreshResult]:
+        """Refresh all `subscriptions` concurrently (updates their validators in place)."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        existing = self._existing(subscriptions)
+        return list(await asyncio.gather(*(
+            self._refresh_one(s, existing[s.id], semaphore) for s in subscriptions
+        )))
+
+    def refresh_sync(self, subscriptions: List[Subscription]) -> List[RefreshResult]:
+        return asyncio.run(self.refresh(subscriptions))
+
+    def unsubscribe(self, subscription: Subscription) -> int:
+        """Delete the subscription's events from the board; returns how many."""
+        ids = list(self._existing([subscription])[subscription.id])
+        if ids:
+            self.registry.delete_many(self.board_id, ids)
+        self._blocks.pop(subscription.id, None)
+        return len(ids)
+
+
+class BackgroundRefresh:
+    """
+    Periodic refresh of a subscriptions file on a daemon thread; `trigger`
+    asks for an immediate run without waiting for it.
+    """
+
+    def __init__(self, refresher: SubscriptionRefresher, path: str = DEFAULT_SUBSCRIPTIONS_PATH,
+                 interval_s: float = DEFAULT_REFRESH_INTERVAL_S):
+        self.refresher = refresher
+        self.path = path
+        self.interval_s = interval_s
+        self.last_results: List[RefreshResult] = []
+        self.running = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._file_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="timeboard-subscriptions", daemon=True)
+        self._thread.start()
+
+    def trigger(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def edit(self, change) -> List[Subscription]:
+        """Apply `change(subscriptions)` to the file under the refresh lock."""
+        with self._file_lock:
+            subscriptions = load_subscriptions(self.path)
+            change(subscriptions)
+            save_subscriptions(subscriptions, self.path)
+            return subscriptions
+
+    def subscriptions(self) -> List[Subscription]:
+        with self._file_lock:
+            return load_subscriptions(self.path)
+
+    def run_once(self) -> List[RefreshResult]:
+        with self._file_lock:
+            subscriptions = load_subscriptions(self.path)
+        if not subscriptions:
+            return []
+        self.running = True
+        try:
+            results = self.refresher.refresh_sync(subscriptions)
+        finally:
+            self.running = False
+        # Subscriptions added or removed meanwhile are kept as they are
+        refreshed = {s.id: s for s in subscriptions}
+
+        removed = []
+
+        def merge(current: List[Subscription]):
+            ids = {s.id for s in current}
+            removed.extend(s for s in subscriptions if s.id not in ids)
+            for i, s in enumerate(current):
+                if s.id in refreshed and refreshed[s.id].source == s.source:
+                    current[i] = refreshed[s.id]
+
+        self.edit(merge)
+        # Unsubscribed while this refresh ran: drop what it may have re-added
+        for subscription in removed:
+            self.refresher.unsubscribe(subscription)
+        self.last_results = results
+        return results
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:  # keep the thread alive; the error shows per subscription
+                print(f"Subscription refresh failed: {type(exc).__name__}: {exc}", file=sys.stderr)
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+
+# --- CLI ------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .api import open_source
+
+    parser = argparse.ArgumentParser(prog="timeboard-subscriptions",
+                                     description="Manage and refresh .ics calendar subscriptions.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="SQLite event store (default: timeboard.db)")
+    source.add_argument("--journal", help="Journal directory")
+    parser.add_argument("--file", default=DEFAULT_SUBSCRIPTIONS_PATH,
+                        help=f"Subscriptions file (default: {DEFAULT_SUBSCRIPTIONS_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Subscribe to an .ics URL or file")
+    add.add_argument("source")
+    add.add_argument("--category", default="custom")
+    add.add_argument("--tz", default="UTC", help="Zone for floating times and all-day events")
+    remove = commands.add_parser("remove", help="Unsubscribe and delete the subscription's events")
+    remove.add_argument("id")
+    commands.add_parser("list")
+    commands.add_parser("refresh", help="Refresh all subscriptions once")
+    args = parser.parse_args(argv)
+
+    subscriptions = load_subscriptions(args.file)
+    if args.command == "list":
+        for s in subscriptions:
+            print(f"{s.id}  {s.category_id:14s} {s.last_refresh or 'never':25s} {s.source}"
+                  + (f"  ERROR {s.last_error}" if s.last_error else ""))
+        return 0
+    if args.command == "add":
+        subscription = new_subscription(args.source, category_id=args.category, default_tz=args.tz)
+        subscriptions.append(subscription)
+        save_subscriptions(subscriptions, args.file)
+        print(f"Added {subscription.id}")
+        return 0
+
+    registry = BoardRegistry()
+    registry.register("subscriptions", open_source(args.db, args.journal))
+    refresher = SubscriptionRefresher(registry, "subscriptions")
+
+    if args.command == "remove":
+        match = [s for s in subscriptions if s.id == args.id]
+        if not match:
+            print(f"No subscription {args.id}", file=sys.stderr)
+            return 1
+        print(f"Deleted {refresher.unsubscribe(match[0])} event(s)")
+        save_subscriptions([s for s in subscriptions if s.id != args.id], args.file)
+        return 0
+
+    results = refresher.refresh_sync(subscriptions)
+    save_subscriptions(subscriptions, args.file)
+    n_failed = 0
+    for s, r in zip(subscriptions, results):
+        if r.error:
+            n_failed += 1
+            print(f"FAILED {s.source}: {r.error}", file=sys.stderr)
+            continue
+        print(f"{r.status:9s} +{r.created} ~{r.updated} -{r.deleted}  ({r.parsed_blocks} parsed)  {s.source}")
+        for warning in r.warnings:
+            print(f"          {warning}")
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# timeboard_core/time_accounting.py
+"""
+Hours per event category over arbitrary date ranges.
+
+A `CategoryLedger` expands every rule once over a span of local days (in a
+report timezone), splits each occurrence at local midnights and keeps,
+per category, a prefix-sum array of seconds per day. Any range total is
+then `prefix[hi] - prefix[lo]`, so day / week / month reports and
+plan-vs-target budgets over years of history cost one array read per
+bucket, not a re-expansion.
+
+Recurring rules are expanded through their occurrence-day sets
+(arithmetic, see occurrence_sets) and converted with the zone tables;
+seconds are real elapsed time, so a night across a DST change counts
+7 or 9 hours.
+"""
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .calendar_tables import calendar_table, weekday_of
+from .events import EVENT_CATEGORIES, Event, wall_clock_anchor
+from .occurrence_sets import date_of_day, day_of_date, event_days
+from .settings import DEFAULT_CATEGORY_BUDGETS
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+REPORT_PERIODS = ("day", "week", "month")
+
+
+def occurrence_spans(event: Event, lo_day: int, hi_day: int) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) UTC timestamps of the occurrences of `event` falling on
+    local days [lo_day, hi_day) of its reference zone.
+    """
+    duration = event.duration_min * 60
+    if (event.recurrence or "once") == "once":
+        start = int(event.start_utc.timestamp())
+        if lo_day <= zone_table(event.reference_tz or "UTC").to_local(start) // SECONDS_PER_DAY < hi_day:
+            yield start, start + duration
+        return
+    table, wall = wall_clock_anchor(event)[:2]
+    to_utc = table.to_utc
+    for day in event_days(event).iter_days(lo_day, hi_day):
+        start = to_utc(day * SECONDS_PER_DAY + wall)
+        yield start, start + duration
+
+
+def day_bounds(tz: str, first_day: int, n_days: int) -> List[int]:
+    """UTC instants of the local midnights starting days first_day .. first_day + n_days."""
+    to_utc = zone_table(tz).to_utc
+    return [to_utc((first_day + i) * SECONDS_PER_DAY) for i in range(n_days + 1)]
+
+
+def accumulate_spans(days: array, spans: Iterable[Tuple[int, int]], bounds: Sequence[int], sign: int = 1):
+    """
+    Add (sign=-1: remove) the seconds of UTC `spans` to per-day totals
+    `days`, splitting them at the local midnights `bounds`.
+    """
+    n_days = len(bounds) - 1
+    span_lo, span_hi = bounds[0], bounds[-1]
+    for start, end in spans:
+        if end <= span_lo or start >= span_hi:
+            continue
+        start = max(start, span_lo)
+        i = bisect_right(bounds, start) - 1
+        while start < end and i < n_days:
+            piece_end = min(end, bounds[i + 1])
+            days[i] += sign * (piece_end - start)
+            start = piece_end
+            i += 1
+
+
+def accumulate_event(days: array, event: Event, first_day: int, bounds: Sequence[int], sign: int = 1):
+    """Add (sign=-1: remove) the occurrence seconds of `event` to per-day totals `days`."""
+    # Reference-zone days around the span; occurrences are clipped while splitting
+    slack = 2 + event.duration_min // 1440
+    n_days = len(bounds) - 1
+    accumulate_spans(days, occurrence_spans(event, first_day - slack, first_day + n_days + 2), bounds, sign)
+
+
+class CategoryLedger:
+    """Seconds per category per local day of `tz`, as prefix sums over a span."""
+
+    def __init__(self, events: Iterable[Event], tz: str, first: date, last: date):
+        self.tz = tz
+        self.first_day = day_of_date(first)
+        self.n_days = day_of_date(last) - self.first_day + 1
+        bounds = day_bounds(tz, self.first_day, self.n_days)
+
+        per_day: Dict[str, array] = {}
+        for event in events:
+            if event.duration_min <= 0:
+                continue
+            days = per_day.get(event.category_id)
+            if days is None:
+                days = per_day[event.category_id] = array("q", bytes(8 * self.n_days))
+            accumulate_event(days, event, self.first_day, bounds)
+
+        self._prefix: Dict[str, array] = {}
+        for category_id, days in per_day.items():
+            prefix = array("q", [0])
+            total = 0
+            for seconds in days:
+                total += seconds
+                prefix.append(total)
+            self._prefix[category_id] = prefix
+
+    @property
+    def categories(self) -> List[str]:
+        """Categories with any time on the books, in EVENT_CATEGORIES order."""
+        order = {c: i for i, c in enumerate(EVENT_CATEGORIES)}
+        used = [c for c, p in self._prefix.items() if p[-1]]
+        return sorted(used, key=lambda c: (order.get(c, len(order)), c))
+
+    def covers(self, start: date, end: date) -> bool:
+        lo, hi = day_of_date(start), day_of_date(end)
+        return self.first_day <= lo and hi <= self.first_day + self.n_days
+
+    def _index(self, day: int) -> int:
+        return min(max(day - self.first_day, 0), self.n_days)
+
+    def seconds(self, category_id: str, start: date, end: date) -> int:
+        """Seconds booked for `category_id` on days [start, end) (clipped to the span)."""
+        prefix = self._prefix.get(category_id)
+        if prefix is None:
+            return 0
+        return prefix[self._index(day_of_date(end))] - prefix[self._index(day_of_date(start))]
+
+    def hours(self, category_id: str, start: date, end: date) -> float:
+        return self.seconds(category_id, start, end) / 3600
+
+    def totals(self, start: date, end: date) -> Dict[str, float]:
+        """Hours per category on days [start, end)."""
+        lo, hi = self._index(day_of_date(start)), self._index(day_of_date(end))
+        return {c: (p[hi] - p[lo]) / 3600 for c, p in self._prefix.items() if p[hi] - p[lo]}
+
+    def report(self, start: date, end: date, period: str = "week") -> List[Tuple[date, Dict[str, float]]]:
+        """
+        (bucket start, hours per category) for every day / week (from
+        Monday) / month bucket overlapping [start, end), clipped to it.
+        """
+        if period not in REPORT_PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        lo, hi = day_of_date(start), day_of_date(end)
+        rows = []
+        day = lo
+        while day < hi:
+            nxt = min(bucket_end(day, period), hi)
+            rows.append((date_of_day(day), self.totals(date_of_day(day), date_of_day(nxt))))
+            day = nxt
+        return rows
+
+    def budget(self, start: date, end: date, weekly_targets: Optional[Dict[str, float]] = None) -> List["BudgetLine"]:
+        """Planned hours vs. weekly targets pro-rated to [start, end)."""
+        targets = DEFAULT_CATEGORY_BUDGETS if weekly_targets is None else weekly_targets
+        weeks = (day_of_date(end) - day_of_date(start)) / 7
+        planned = self.totals(start, end)
+        order = list(EVENT_CATEGORIES)
+        categories = sorted(set(planned) | set(targets), key=lambda c: (order.index(c) if c in order else len(order), c))
+        lines = []
+        for category_id in categories:
+            target = targets.get(category_id)
+            lines.append(BudgetLine(
+                category_id=category_id,
+                planned_hours=planned.get(category_id, 0.0),
+                target_hours=target * weeks if target is not None else None,
+            ))
+        return lines
+
+
+@dataclass(frozen=True)
+class BudgetLine:
+    category_id: str
+    planned_hours: float
+    target_hours: Optional[float]   # None = no target for this category
+
+    @property
+    def delta_hours(self) -> Optional[float]:
+        """Planned minus target (negative = under budget)."""
+        return None if self.target_hours is None else self.planned_hours - self.target_hours
+
+
+def bucket_end(day: int, period: str) -> int:
+    """First epoch day after the day / week (Monday-based) / month containing `day`."""
+    if period == "day":
+        return day + 1
+    if period == "week":
+        return day + 7 - weekday_of(day)
+    dom, length = calendar_table().month_info(day)
+    return day + length - dom + 1
+
+
+def ledger_span(start: date, end: date) -> Tuple[date, date]:
+    """
+    Whole calendar years around [start, end): ledgers built for this span
+    are reused while the view moves within the same years.
+    """
+    return date(start.year, 1, 1), date(max(end.year, start.year), 12, 31)
@@ -0,0 +1,426 @@
+# timeboard_core/timeline_html.py
+"""
+HTML and SVG output for a `TimelineLayout`.
+
+`timeline_html` produces the same markup the Streamlit timeline embeds;
+`standalone_html` and `timeline_svg` wrap it for static files.
+"""
+from html import escape
+from typing import List
+
+from .timeline_layout import TimelineLayout, LayoutBlock
+
+
+# ------------------------------------------------------------------
+# CSS for Timeline
+# ------------------------------------------------------------------
+def get_timeline_css(timeline_width: int) -> str:
+    return f"""
+<style>
+.tb-scroll-container {{
+    overflow-x: auto;
+    overflow-y: visible;
+    width: 100%;
+    padding: 10px 0;
+    margin: 10px 0;
+}}
+
+.tb-timeline-inner {{
+    width: {timeline_width}px;
+    position: relative;
+    background: #0e1117;
+}}
+
+.tb-hours-row {{
+    position: relative;
+    height: 28px;
+    border-bottom: 1px solid #333;
+    margin-bottom: 8px;
+}}
+
+.tb-day-header {{
+    position: absolute;
+    font-size: 11px;
+    font-weight: 600;
+    color: #fff;
+    background: #1a1a2e;
+    padding: 3px 8px;
+    border-radius: 3px;
+    top: 3px;
+    z-index: 5;
+}}
+
+.tb-hour-mark {{
+    position: absolute;
+    font-size: 9px;
+    color: #555;
+    top: 14px;
+}}
+
+.tb-zone-section {{
+    margin-bottom: 16px;
+}}
+
+.tb-zone-header {{
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 4px 8px;
+    background: #1a1a2e;
+    border-radius: 4px 4px 0 0;
+}}
+
+.tb-zone-name {{
+    font-weight: 600;
+    font-size: 13px;
+    color: #fff;
+}}
+
+.tb-zone-times {{
+    display: flex;
+    gap: 20px;
+    font-size: 12px;
+}}
+
+.tb-time-now {{ color: #4da3ff; }}
+.tb-time-active {{ color: #ff3b3b; }}
+
+.tb-zone-bar {{
+    position: relative;
+    height: 42px;
+    background: #111;
+    border-radius: 0 0 4px 4px;
+    overflow: visible;
+}}
+
+.tb-day-segment {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    display: flex;
+    align-items: flex-end;
+    padding: 0 0 4px 6px;
+    box-sizing: border-box;
+}}
+
+.tb-day-segment.with-border {{
+    border-right: 2px solid #ffd700;
+}}
+
+.tb-day-label {{
+    font-size: 9px;
+    color: rgba(255,255,255,0.5);
+    white-space: nowrap;
+}}
+
+.tb-transition {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    z-index: 2;
+    pointer-events: none;
+}}
+
+.tb-daylight {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    z-index: 2;
+    pointer-events: none;
+}}
+
+.tb-midnight-line {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    border-left: 2px solid #ffd700;
+    z-index: 10;
+}}
+
+.tb-now-line {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    border-left: 2px dashed #4da3ff;
+    z-index: 15;
+}}
+
+.tb-active-line {{
+    position: absolute;
+    top: 0;
+    bottom: 0;
+    border-left: 3px solid #ff3b3b;
+    z-index: 16;
+}}
+
+.tb-event {{
+    position: absolute;
+    top: 6px;
+    height: 22px;
+    border-radius: 4px;
+    padding: 2px 6px;
+    font-size: 10px;
+    color: white;
+    white-space: nowrap;
+    overflow: hidden;
+    text-overflow: ellipsis;
+    z-index: 12;
+}}
+
+.tb-event.highlighted {{
+    border: 2px solid #fff;
+    box-shadow: 0 0 8px rgba(255,255,255,0.4);
+}}
+
+.tb-session {{
+    position: absolute;
+    top: 26px;
+    height: 14px;
+    border-radius: 2px;
+    padding: 0 4px;
+    font-size: 8px;
+    color: #333;
+    white-space: nowrap;
+    overflow: hidden;
+    z-index: 11;
+    opacity: 0.8;
+}}
+
+.tb-session-overlap {{
+    position: absolute;
+    top: 22px;
+    height: 4px;
+    border-radius: 2px;
+    z-index: 11;
+}}
+</style>
+"""
+
+
+# ------------------------------------------------------------------
+# HTML
+# ------------------------------------------------------------------
+def _block_html(block: LayoutBlock, pct) -> str:
+    left = f"left:{pct(block.start)}%;"
+    width = f"width:{pct(block.end - block.start)}%;"
+
+    if block.kind == "day":
+        border_class = "with-border" if block.bordered else ""
+        label_html = f"<span class='tb-day-label'>{block.label}</span>" if block.label else ""
+        return (
+            f"<div class='tb-day-segment {border_class}' style='"
+            f"{left}{width}background:{block.color};'>{label_html}</div>"
+        )
+    if block.kind == "transition":
+        return (
+            f"<div class='tb-transition' style='{left}{width}"
+            f"background:linear-gradient(to right, {block.color}, {block.color_to});'></div>"
+        )
+    if block.kind == "midnight":
+        return f"<div class='tb-midnight-line' style='{left}'></div>"
+    if block.kind == "now":
+        return f"<div class='tb-now-line' style='{left}'></div>"
+    if block.kind == "active":
+        return f"<div class='tb-active-line' style='{left}'></div>"
+    if block.kind == "event":
+        hl_class = " highlighted" if block.highlighted else ""
+        return (
+            f"<div class='tb-event{hl_class}' style='{left}{width}"
+            f"background:{block.color};' "
+            f"title='{escape(block.title)}'>"
+            f"{escape(block.label)}</div>"
+        )
+    if block.kind == "session":
+        return (
+            f"<div class='tb-session' style='{left}{width}"
+            f"background:{block.color};'>{block.label}</div>"
+        )
+    if block.kind == "session_overlap":
+        return (
+            f"<div class='tb-session-overlap' style='{left}{width}"
+            f"background:{block.color};' title='{escape(block.title)}'></div>"
+        )
+    return ""
+
+
+def timeline_html(layout: TimelineLayout) -> str:
+    """Render the timeline body (without CSS) as one HTML string."""
+    total_minutes = layout.total_minutes
+
+    def _pct(minutes: float) -> float:
+        return (minutes / total_minutes) * 100
+
+    html_parts: List[str] = []
+    html_parts.append("<div class='tb-scroll-container'>")
+    html_parts.append("<div class='tb-timeline-inner'>")
+
+    # ---- Hours Row ----
+    html_parts.append("<div class='tb-hours-row'>")
+    marks = layout.hour_marks
+    m = 0
+    for start, label in layout.day_headers:
+        html_parts.append(
+            f"<div class='tb-day-header' style='left:{_pct(start)}%;'>{label}</div>"
+        )
+        # Hour marks of this day (both lists are sorted by minute)
+        while m < len(marks) and marks[m][0] < start + 1440:
+            minute, mark = marks[m]
+            html_parts.append(
+                f"<div class='tb-hour-mark' style='left:{_pct(minute)}%;'>{mark}</div>"
+            )
+            m += 1
+    html_parts.append("</div>")  # End hours-row
+
+    # ---- Timezones ----
+    for lane in layout.lanes:
+        html_parts.append("<div class='tb-zone-section'>")
+        html_parts.append(
+            f"<div class='tb-zone-header'>"
+            f"<span class='tb-zone-name'>{lane.label}</span>"
+            f"<span class='tb-zone-times'>"
+            f"<span class='tb-time-now'>Now: {lane.now_str} ({lane.now_date})</span>"
+            f"<span class='tb-time-active'>Active: {lane.active_str}</span>"
+            f"</span></div>"
+        )
+        html_parts.append("<div class='tb-zone-bar'>")
+        for block in lane.blocks:
+            html_parts.append(_block_html(block, _pct))
+        html_parts.append("</div>")  # End zone-bar
+        html_parts.append("</div>")  # End zone-section
+
+    html_parts.append("</div>")  # End timeline-inner
+    html_parts.append("</div>")  # End scroll-container
+    return "".join(html_parts)
+
+
+def standalone_html(layout: TimelineLayout, title: str = "TimeBoard") -> str:
+    """Self-contained HTML document for a timeline (used by exports)."""
+    return (
+        "<!DOCTYPE html>\n"
+        "<html><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title>"
+        f"{get_timeline_css(layout.width)}"
+        "</head><body style='background:#0e1117;color:#fff;font-family:sans-serif;'>"
+        f"<h1 style='font-size:18px;'>{escape(title)}</h1>"
+        f"{timeline_html(layout)}"
+        "</body></html>\n"
+    )
+
+
+# ------------------------------------------------------------------
+# SVG
+# ------------------------------------------------------------------
+SVG_HOURS_HEIGHT = 36
+SVG_HEADER_HEIGHT = 24
+SVG_BAR_HEIGHT = 42
+SVG_ZONE_GAP = 16
+
+
+def timeline_svg(layout: TimelineLayout, title: str = "TimeBoard") -> str:
+    """Render the timeline as a standalone SVG with the same geometry."""
+    width = layout.width
+    scale = width / layout.total_minutes
+    lane_height = SVG_HEADER_HEIGHT + SVG_BAR_HEIGHT + SVG_ZONE_GAP
+    height = SVG_HOURS_HEIGHT + lane_height * len(layout.lanes)
+
+    parts: List[str] = [
+        f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' "
+        f"font-family='sans-serif'>",
+        f"<title>{escape(title)}</title>",
+        f"<rect width='{width}' height='{height}' fill='#0e1117'/>",
+    ]
+
+    for start, label in layout.day_headers:
+        parts.append(
+            f"<text x='{start * scale + 8:.1f}' y='14' font-size='11' "
+            f"font-weight='600' fill='#fff'>{label}</text>"
+        )
+    for minute, mark in layout.hour_marks:
+        parts.append(
+            f"<text x='{minute * scale:.1f}' y='26' font-size='9' fill='#555'>{mark}</text>"
+        )
+
+    gradient_ids = {}
+    for i, lane in enumerate(layout.lanes):
+        y0 = SVG_HOURS_HEIGHT + i * lane_height
+        bar_y = y0 + SVG_HEADER_HEIGHT
+        parts.append(f"<rect x='0' y='{y0}' width='{width}' height='{SVG_HEADER_HEIGHT}' fill='#1a1a2e'/>")
+        parts.append(
+            f"<text x='8' y='{y0 + 16}' font-size='13' font-weight='600' fill='#fff'>"
+            f"{escape(lane.label)}</text>"
+        )
+        parts.append(
+            f"<text x='{width - 8}' y='{y0 + 16}' font-size='12' text-anchor='end'>"
+            f"<tspan fill='#4da3ff'>Now: {lane.now_str} ({lane.now_date})</tspan>"
+            f"<tspan fill='#ff3b3b' dx='20'>Active: {lane.active_str}</tspan></text>"
+        )
+        parts.append(f"<rect x='0' y='{bar_y}' width='{width}' height='{SVG_BAR_HEIGHT}' fill='#111'/>")
+
+        for block in lane.blocks:
+            x = block.start * scale
+            w = (block.end - block.start) * scale
+            if block.kind == "day":
+                parts.append(
+                    f"<rect x='{x:.1f}' y='{bar_y}' width='{w:.1f}' height='{SVG_BAR_HEIGHT}' "
+                    f"fill='{block.color}'/>"
+                )
+                if block.bordered:
+                    parts.append(
+                        f"<line x1='{x + w:.1f}' x2='{x + w:.1f}' y1='{bar_y}' "
+                        f"y2='{bar_y + SVG_BAR_HEIGHT}' stroke='#ffd700' stroke-width='2'/>"
+                    )
+                if block.label:
+                    parts.append(
+                        f"<text x='{x + 6:.1f}' y='{bar_y + SVG_BAR_HEIGHT - 5}' font-size='9' "
+                        f"fill='rgba(255,255,255,0.5)'>{block.label}</text>"
+                    )
+            elif block.kind == "transition":
+                key = (block.color, block.color_to)
+                if key not in gradient_ids:
+                    gid = f"g{len(gradient_ids)}"
+                    gradient_ids[key] = gid
+                    parts.append(
+                        f"<defs><linearGradient id='{gid}'>"
+                        f"<stop offset='0' stop-color='{block.color}'/>"
+                        f"<stop offset='1' stop-color='{block.color_to}'/>"
+                        f"</linearGradient></defs>"
+                    )
+                parts.append(
+                    f"<rect x='{x:.1f}' y='{bar_y}' width='{w:.1f}' height='{SVG_BAR_HEIGHT}' "
+                    f"fill='url(#{gradient_ids[key]})'/>"
+                )
+            elif block.kind in ("midnight", "now", "active"):
+                stroke = {
+                    "midnight": "stroke='#ffd700' stroke-width='2'",
+                    "now": "stroke='#4da3ff' stroke-width='2' stroke-dasharray='4 3'",
+                    "active": "stroke='#ff3b3b' stroke-width='3'",
+                }[block.kind]
+                parts.append(
+                    f"<line x1='{x:.1f}' x2='{x:.1f}' y1='{bar_y}' "
+                    f"y2='{bar_y + SVG_BAR_HEIGHT}' {stroke}/>"
+                )
+            elif block.kind == "event":
+                outline = " stroke='#fff' stroke-width='2'" if block.highlighted else ""
+                parts.append(
+                    f"<g><title>{escape(block.title)}</title>"
+                    f"<rect x='{x:.1f}' y='{bar_y + 6}' width='{w:.1f}' height='22' rx='4' "
+                    f"fill='{block.color}'{outline}/>"
+                    f"<text x='{x + 6:.1f}' y='{bar_y + 21}' font-size='10' fill='#fff'>"
+                    f"{escape(block.label)}</text></g>"
+                )
+            elif block.kind == "session":
+                parts.append(
+                    f"<rect x='{x:.1f}' y='{bar_y + 26}' width='{w:.1f}' height='14' rx='2' "
+                    f"fill='{block.color}' opacity='0.8'/>"
+                    f"<text x='{x + 4:.1f}' y='{bar_y + 36}' font-size='8' fill='#333'>"
+                    f"{block.label}</text>"
+                )
+            elif block.kind == "session_overlap":
+                parts.append(
+                    f"<g><title>{escape(block.title)}</title>"
+                    f"<rect x='{x:.1f}' y='{bar_y + 22}' width='{w:.1f}' height='4' rx='2' "
+                    f"fill='{block.color}'/></g>"
+                )
+
+    parts.append("</svg>\n")
+    return "".join(parts)
@@ -0,0 +1,458 @@
+# timeboard_core/timeline_layout.py
+"""
+Streamlit-free layout of the multi-zone timeline.
+
+`build_timeline_layout` turns settings + events into positioned blocks
+(in minutes from the timeline start), in two steps: `build_timeline_frame`
+does the expensive, time-independent part (day bands, events, sessions)
+and `finish_timeline_layout` adds the now / active markers, so a frame
+can be cached and prefetched per window. The HTML/SVG output lives in
+`timeboard_core.timeline_html`, so the same layout is used by the app and by
+headless exports.
+"""
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from .events import Event, instantiate_for_day
+from .renderer import format_zone_label
+from .settings import UserSettings, ZOOM_LEVELS
+from .trading_calendar import (
+    OVERLAP_COLOR, active_overlaps, exchange_ids_or_default, exchanges, overlap_intervals, session_intervals,
+)
+from .tz_tables import zone_table
+
+
+# ------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------
+WEEKDAY_COLORS = {
+    0: "#2d4a3e",  # Monday    - Green
+    1: "#2d3a4a",  # Tuesday   - Blue
+    2: "#3d2d4a",  # Wednesday - Purple
+    3: "#4a4a2d",  # Thursday  - Olive
+    4: "#4a2d2d",  # Friday    - Red
+    5: "#2d4a4a",  # Saturday  - Cyan
+    6: "#4a3a2d",  # Sunday    - Orange
+}
+
+# Lighter versions for daylight hours
+WEEKDAY_COLORS_LIGHT = {
+    0: "#4a7a6e",  # Monday    - Green (lighter)
+    1: "#4a6a7a",  # Tuesday   - Blue (lighter)
+    2: "#6a5a7a",  # Wednesday - Purple (lighter)
+    3: "#7a7a4a",  # Thursday  - Olive (lighter)
+    4: "#7a4a4a",  # Friday    - Red (lighter)
+    5: "#4a7a7a",  # Saturday  - Cyan (lighter)
+    6: "#7a6a4a",  # Sunday    - Orange (lighter)
+}
+
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Default daylight settings
+DEFAULT_DAYLIGHT_START = 7
+DEFAULT_DAYLIGHT_END = 22
+DEFAULT_TRANSITION = 1.5
+
+UTC = ZoneInfo("UTC")
+
+# "HH:MM" per minute of the day, for event time labels
+_CLOCK_LABELS = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(1440))
+
+
+# ------------------------------------------------------------------
+# Layout Model
+# ------------------------------------------------------------------
+@dataclass(frozen=True)
+class LayoutBlock:
+    """
+    One positioned element on a zone bar.
+
+    kind: day | transition | midnight | now | active | event | session | session_overlap
+    start/end are minutes from the timeline start, already clipped.
+    """
+    kind: str
+    start: float
+    end: float = 0.0
+    color: str = ""
+    color_to: str = ""        # gradient target (transitions only)
+    label: str = ""
+    title: str = ""
+    bordered: bool = False
+    highlighted: bool = False
+
+
+@dataclass(frozen=True)
+class ZoneLane:
+    zone: str
+    label: str
+    now_str: str
+    now_date: str
+    active_str: str
+    blocks: Tuple[LayoutBlock, ...] = ()
+
+
+@dataclass(frozen=True)
+class TimelineLayout:
+    start_utc: datetime
+    visible_days: int
+    width: int
+    total_minutes: int
+    day_headers: Tuple[Tuple[float, str], ...] = ()
+    hour_marks: Tuple[Tuple[float, str], ...] = ()
+    lanes: Tuple[ZoneLane, ...] = field(default_factory=tuple)
+
+
+# ------------------------------------------------------------------
+# Helper Functions
+# ------------------------------------------------------------------
+def format_date(dt: datetime) -> str:
+    """Format date as 'Mon 06.01.'"""
+    return f"{WEEKDAY_NAMES[dt.weekday()]} {dt.strftime('%d.%m.')}"
+
+
+def format_date_short(dt: datetime) -> str:
+    """Format date as 'Mon 06.'"""
+    return f"{WEEKDAY_NAMES[dt.weekday()]} {dt.strftime('%d.')}"
+
+
+def get_zoom_config(settings: UserSettings) -> dict:
+    zoom_level = getattr(settings, 'zoom_level', 'week')
+    return ZOOM_LEVELS.get(zoom_level, ZOOM_LEVELS['week'])
+
+
+def collect_occurrences(
+    events: Iterable[Event],
+    timeline_start_utc: datetime,
+    visible_days: int
+) -> List[Event]:
+    """
+    Expand all events for the visible window (plus one trailing day so
+    overnight events from the last day are still shown).
+    """
+    events = list(events)
+    occurrences = []
+    for day in range(visible_days + 1):
+        day_utc = timeline_start_utc + timedelta(days=day)
+        for event in events:
+            inst = instantiate_for_day(event, day_utc)
+            if inst:
+                occurrences.append(inst)
+    return occurrences
+
+
+# ------------------------------------------------------------------
+# Layout
+# ------------------------------------------------------------------
+def _day_blocks(
+    tz: ZoneInfo,
+    timeline_start_utc: datetime,
+    visible_days: int,
+    total_minutes: int,
+    settings: UserSettings
+) -> List[LayoutBlock]:
+    show_daylight = getattr(settings, 'show_daylight', False)
+    daylight_start = getattr(settings, 'daylight_start_hour', DEFAULT_DAYLIGHT_START)
+    daylight_end = getattr(settings, 'daylight_end_hour', DEFAULT_DAYLIGHT_END)
+    transition_hours = getattr(settings, 'transition_duration', DEFAULT_TRANSITION)
+
+    blocks = []
+    seen_days = set()
+
+    def _clip(kind, start, end, **kwargs):
+        if end <= 0 or start >= total_minutes:
+            return
+        vis_start = max(0, start)
+        vis_end = min(total_minutes, end)
+        if vis_end <= vis_start:
+            return
+        blocks.append(LayoutBlock(kind, vis_start, vis_end, **kwargs))
+
+    for day in range(-1, visible_days + 2):
+        utc_day = timeline_start_utc + timedelta(days=day)
+        zone_ref = utc_day.astimezone(tz)
+        zone_midnight = zone_ref.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Avoid duplicates
+        day_key = zone_midnight.strftime("%Y-%m-%d")
+        if day_key in seen_days:
+            continue
+        seen_days.add(day_key)
+
+        midnight_utc = zone_midnight.astimezone(UTC)
+        day_start_min = (midnight_utc - timeline_start_utc).total_seconds() / 60
+
+        if day_start_min > total_minutes or day_start_min + 1440 < 0:
+            continue
+
+        weekday = zone_midnight.weekday()
+        color_dark = WEEKDAY_COLORS[weekday]
+        color_light = WEEKDAY_COLORS_LIGHT[weekday]
+        date_label = format_date(zone_midnight)
+
+        if not show_daylight:
+            # ---- SIMPLE MODE: Solid color per day ----
+            _clip("day", day_start_min, day_start_min + 1440,
+                  color=color_dark, label=date_label, bordered=True)
+            continue
+
+        # ---- DAYLIGHT MODE: Render with gradients ----
+        transition_min = transition_hours * 60
+        sunrise_end = day_start_min + (daylight_start * 60)
+        sunrise_start = sunrise_end - transition_min
+        sunset_start = day_start_min + (daylight_end * 60)
+        sunset_end = sunset_start + transition_min
+
+        # Night 1, sunrise, daylight, sunset, night 2
+        _clip("day", day_start_min, sunrise_start, color=color_dark, label=date_label)
+        _clip("transition", sunrise_start, sunrise_end, color=color_dark, color_to=color_light)
+        _clip("day", sunrise_end, sunset_start, color=color_light)
+        _clip("transition", sunset_start, sunset_end, color=color_light, color_to=color_dark)
+        _clip("day", sunset_end, day_start_min + 1440, color=color_dark, bordered=True)
+
+        # Midnight line at day boundary
+        if 0 < day_start_min < total_minutes:
+            blocks.append(LayoutBlock("midnight", day_start_min))
+
+    return blocks
+
+
+def _session_blocks(
+    zone: str,
+    exchange_ids: List[str],
+    timeline_start_utc: datetime,
+    total_minutes: int
+) -> List[LayoutBlock]:
+    """Open sessions of exchanges in `zone` (holidays and half days included) and their overlaps."""
+    start_ts = int(timeline_start_utc.timestamp())
+    end_ts = start_ts + total_minutes * 60
+    known = exchanges()
+
+    blocks = []
+    for exchange_id in exchange_ids:
+        exchange = known[exchange_id]
+        if exchange.zone != zone:
+            continue
+        for open_ts, close_ts in session_intervals(exchange_id, start_ts, end_ts):
+            blocks.append(LayoutBlock(
+                "session", (open_ts - start_ts) / 60, (close_ts - start_ts) / 60,
+                color=exchange.color, label=exchange.name,
+            ))
+
+    for first, second in active_overlaps(exchange_ids):
+        if zone not in (first.zone, second.zone):
+            continue
+        label = f"{first.name.split(' (')[0]}/{second.name.split(' (')[0]} overlap"
+        for open_ts, close_ts in overlap_intervals(first.id, second.id, start_ts, end_ts):
+            blocks.append(LayoutBlock(
+                "session_overlap", (open_ts - start_ts) / 60, (close_ts - start_ts) / 60,
+                color=OVERLAP_COLOR, label=label, title=label,
+            ))
+    return blocks
+
+
+@dataclass(frozen=True)
+class LaneFrame:
+    """A zone lane without the now / active markers."""
+    zone: str
+    label: str
+    day_blocks: Tuple[LayoutBlock, ...] = ()
+    event_blocks: Tuple[LayoutBlock, ...] = ()     # not highlighted; same order as TimelineFrame.event_spans
+    session_blocks: Tuple[LayoutBlock, ...] = ()
+
+
+@dataclass(frozen=True)
+class TimelineFrame:
+    """
+    Everything of a layout that does not depend on the current or active
+    time: the expensive part, cached and prefetched per window.
+    """
+    start_utc: datetime
+    visible_days: int
+    width: int
+    total_minutes: int
+    day_headers: Tuple[Tuple[float, str], ...] = ()
+    hour_marks: Tuple[Tuple[float, str], ...] = ()
+    event_spans: Tuple[Tuple[float, float], ...] = ()   # unclipped (start, end) minutes per placed event
+    lanes: Tuple[LaneFrame, ...] = field(default_factory=tuple)
+
+
+def layout_settings_key(settings: UserSettings) -> tuple:
+    """Hashable snapshot of the settings (cache key part for frames)."""
+    values = []
+    for f in fields(settings):
+        value = getattr(settings, f.name)
+        if isinstance(value, list):
+            value = tuple(value)
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        values.append((f.name, value))
+    return tuple(values)
+
+
+def build_timeline_frame(
+    zones: List[str],
+    settings: UserSettings,
+    events: Iterable[Event],
+    timeline_start_utc: datetime,
+    occurrences: Optional[List[Event]] = None,
+) -> TimelineFrame:
+    """
+    The time-independent part of the layout for `zones` starting at
+    `timeline_start_utc` (UTC midnight). Pass precomputed `occurrences`
+    to skip expansion.
+    """
+    zoom_config = get_zoom_config(settings)
+    visible_days = zoom_config['days']
+    total_minutes = visible_days * 1440
+    show_trading_sessions = getattr(settings, 'show_trading_sessions', False)
+    exchange_ids = exchange_ids_or_default(getattr(settings, 'trading_exchanges', None))
+
+    if occurrences is None:
+        occurrences = collect_occurrences(events, timeline_start_utc, visible_days)
+
+    # ---- Hours Row ----
+    if visible_days == 1:
+        hour_marks = list(range(0, 24, 2))  # Every 2 hours for day view
+    else:
+        hour_marks = [0, 6, 12, 18]  # Every 6 hours
+
+    day_headers = []
+    hour_positions = []
+    for day in range(visible_days):
+        day_start_min = day * 1440
+        day_headers.append((day_start_min, format_date(timeline_start_utc + timedelta(days=day))))
+        for h in hour_marks:
+            hour_positions.append((day_start_min + h * 60, f"{h:02d}"))
+
+    # Event positions are zone-independent; only the time label differs
+    placed = []
+    for inst in occurrences:
+        event_start_min = (inst.start_utc - timeline_start_utc).total_seconds() / 60
+        event_end_min = (inst.end_utc - timeline_start_utc).total_seconds() / 60
+
+        if event_end_min < 0 or event_start_min > total_minutes:
+            continue
+
+        visible_start = max(0, event_start_min)
+        visible_end = min(total_minutes, event_end_min)
+
+        if visible_end <= visible_start:
+            continue
+
+        placed.append((inst, event_start_min, event_end_min, visible_start, visible_end))
+
+    # Whole UTC seconds of each event's start and end, for the time labels
+    start_ts = int(timeline_start_utc.timestamp())
+    spans_ts = []
+    for inst, _, _, _, _ in placed:
+        start, end = inst.start_utc - timeline_start_utc, inst.end_utc - timeline_start_utc
+        spans_ts.append((start_ts + start.days * 86400 + start.seconds,
+                         start_ts + end.days * 86400 + end.seconds))
+
+    # ---- Timezones ----
+    lanes = []
+    for zone in zones:
+        tz = ZoneInfo(zone)
+        to_local = zone_table(zone).to_local
+
+        event_blocks = []
+        for (inst, _, _, visible_start, visible_end), (event_start, event_end) in zip(placed, spans_ts):
+            time_label = (f"{_CLOCK_LABELS[to_local(event_start) // 60 % 1440]}"
+                          f"-{_CLOCK_LABELS[to_local(event_end) // 60 % 1440]}")
+            event_blocks.append(LayoutBlock(
+                "event", visible_start, visible_end,
+                color=getattr(inst, "_color", "#00FFFF"),
+                label=inst.title,
+                title=f"{inst.title} ({time_label})",
+            ))
+
+        lanes.append(LaneFrame(
+            zone=zone,
+            label=format_zone_label(zone, zone == settings.church_timezone, settings),
+            day_blocks=tuple(_day_blocks(tz, timeline_start_utc, visible_days, total_minutes, settings)),
+            event_blocks=tuple(event_blocks),
+            session_blocks=tuple(
+                _session_blocks(zone, exchange_ids, timeline_start_utc, total_minutes)
+                if show_trading_sessions else ()
+            ),
+        ))
+
+    return TimelineFrame(
+        start_utc=timeline_start_utc,
+        visible_days=visible_days,
+        width=zoom_config['width'],
+        total_minutes=total_minutes,
+        day_headers=tuple(day_headers),
+        hour_marks=tuple(hour_positions),
+        event_spans=tuple((start, end) for _, start, end, _, _ in placed),
+        lanes=tuple(lanes),
+    )
+
+
+def finish_timeline_layout(
+    frame: TimelineFrame,
+    now_utc: datetime,
+    active_utc: Optional[datetime] = None,
+) -> TimelineLayout:
+    """Add the now / active markers, clocks and highlighted events to a frame (cheap)."""
+    timeline_start_utc = frame.start_utc
+    total_minutes = frame.total_minutes
+    active_utc = active_utc or now_utc
+
+    now_min = (now_utc - timeline_start_utc).total_seconds() / 60
+    active_min = (active_utc - timeline_start_utc).total_seconds() / 60
+    highlighted = [start <= active_min < end for start, end in frame.event_spans]
+
+    lanes = []
+    for lane in frame.lanes:
+        tz = ZoneInfo(lane.zone)
+        zone_now = now_utc.astimezone(tz)
+
+        blocks = list(lane.day_blocks)
+        if 0 <= now_min <= total_minutes:
+            blocks.append(LayoutBlock("now", now_min))
+        if 0 <= active_min <= total_minutes:
+            blocks.append(LayoutBlock("active", active_min))
+        blocks.extend(
+            replace(block, highlighted=True) if is_highlighted else block
+            for block, is_highlighted in zip(lane.event_blocks, highlighted)
+        )
+        blocks.extend(lane.session_blocks)
+
+        lanes.append(ZoneLane(
+            zone=lane.zone,
+            label=lane.label,
+            now_str=zone_now.strftime("%H:%M"),
+            now_date=format_date(zone_now),
+            active_str=active_utc.astimezone(tz).strftime("%H:%M"),
+            blocks=tuple(blocks),
+        ))
+
+    return TimelineLayout(
+        start_utc=timeline_start_utc,
+        visible_days=frame.visible_days,
+        width=frame.width,
+        total_minutes=total_minutes,
+        day_headers=frame.day_headers,
+        hour_marks=frame.hour_marks,
+        lanes=tuple(lanes),
+    )
+
+
+def build_timeline_layout(
+    zones: List[str],
+    settings: UserSettings,
+    events: Iterable[Event],
+    timeline_start_utc: datetime,
+    now_utc: datetime,
+    active_utc: Optional[datetime] = None,
+    occurrences: Optional[List[Event]] = None,
+) -> TimelineLayout:
+    """
+    Lay out the timeline for `zones` starting at `timeline_start_utc`
+    (UTC midnight). Pass precomputed `occurrences` to skip expansion.
+    """
+    frame = build_timeline_frame(zones, settings, events, timeline_start_utc, occurrences)
+    return finish_timeline_layout(frame, now_utc, active_utc)
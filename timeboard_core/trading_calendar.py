@@ -0,0 +1,190 @@
+# timeboard_core/trading_calendar.py
+"""
+Exchange trading calendars with precomputed session windows.
+
+Each exchange is defined by a JSON file (timeboard_core/exchanges/, plus
+TIMEBOARD_EXCHANGES_DIR for additions / overrides):
+
+    {"id": "london", "name": "London (LSE)", "zone": "Europe/London",
+     "color": "#CFCFCF", "sessions": [["08:00", "16:30"]],
+     "weekdays": [0, 1, 2, 3, 4],
+     "holidays": ["2025-12-25", ...], "half_days": {"2025-12-24": "12:30"}}
+
+Sessions are local wall-clock times (a lunch break is two sessions); a
+half day closes early at the given time. For every (exchange, year) the
+open intervals are converted to UTC once and kept as sorted start / end
+arrays, so the timeline overlay and overlap highlights (e.g. London/New
+York) for any window are bisects plus a merge of sorted intervals.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+import json
+import os
+
+from .occurrence_sets import day_of_date
+from .settings import DEFAULT_TRADING_EXCHANGES
+from .tz_tables import SECONDS_PER_DAY, zone_table
+
+BUILTIN_EXCHANGES_DIR = Path(__file__).with_name("exchanges")
+DEFAULT_EXCHANGES_DIR = os.environ.get("TIMEBOARD_EXCHANGES_DIR", "")
+
+# Pairs highlighted where both are open
+SESSION_OVERLAPS = [("london", "new_york"), ("hong_kong", "london"), ("sydney", "tokyo")]
+OVERLAP_COLOR = "#F5C542"
+
+Interval = Tuple[int, int]   # UTC timestamps [start, end)
+
+
+def _minute_of_day(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+@dataclass(frozen=True)
+class Exchange:
+    id: str
+    name: str
+    zone: str
+    color: str
+    sessions: Tuple[Tuple[int, int], ...]    # (open, close) minutes of the local day
+    weekdays: FrozenSet[int]
+    holidays: FrozenSet[date]
+    half_days: Tuple[Tuple[date, int], ...]  # (date, early close minute)
+
+    @property
+    def open_minute(self) -> int:
+        return self.sessions[0][0]
+
+    @property
+    def close_minute(self) -> int:
+        return self.sessions[-1][1]
+
+    def day_sessions(self, d: date) -> List[Tuple[int, int]]:
+        """Local (open, close) minutes on `d`; empty on weekends and holidays."""
+        if d.weekday() not in self.weekdays or d in self.holidays:
+            return []
+        close = dict(self.half_days).get(d)
+        if close is None:
+            return list(self.sessions)
+        return [(start, min(end, close)) for start, end in self.sessions if start < close]
+
+
+def exchange_from_dict(data: Dict) -> Exchange:
+    sessions = tuple(
+        (_minute_of_day(start), _minute_of_day(end)) for start, end in data["sessions"]
+    )
+    if not sessions or any(end <= start for start, end in sessions):
+        raise ValueError(f"Exchange {data.get('id', '?')}: sessions must be non-empty (open, close) pairs")
+    return Exchange(
+        id=data["id"],
+        name=data.get("name", data["id"]),
+        zone=data["zone"],
+        color=data.get("color", "#CFCFCF"),
+        sessions=sessions,
+        weekdays=frozenset(data.get("weekdays", range(5))),
+        holidays=frozenset(date.fromisoformat(d) for d in data.get("holidays", [])),
+        half_days=tuple(sorted(
+            (date.fromisoformat(d), _minute_of_day(close)) for d, close in data.get("half_days", {}).items()
+        )),
+    )
+
+
+def load_exchanges(*directories) -> Dict[str, Exchange]:
+    """Exchanges from every *.json file; later directories override earlier ids."""
+    result: Dict[str, Exchange] = {}
+    for directory in directories:
+        if not directory:
+            continue
+        for path in sorted(Path(directory).glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                exchange = exchange_from_dict(json.load(f))
+            result[exchange.id] = exchange
+    return result
+
+
+@lru_cache(maxsize=None)
+def exchanges() -> Dict[str, Exchange]:
+    """Built-in exchanges plus those in TIMEBOARD_EXCHANGES_DIR (loaded once)."""
+    return load_exchanges(BUILTIN_EXCHANGES_DIR, DEFAULT_EXCHANGES_DIR)
+
+
+# --- Precomputed windows ----------------------------------------
+
+@lru_cache(maxsize=256)
+def session_table(exchange_id: str, year: int) -> Tuple[array, array]:
+    """Sorted UTC (starts, ends) of every open interval of `exchange_id` in `year`."""
+    exchange = exchanges()[exchange_id]
+    table = zone_table(exchange.zone)
+    starts, ends = array("q"), array("q")
+    first, last = day_of_date(date(year, 1, 1)), day_of_date(date(year + 1, 1, 1))
+    d = date(year, 1, 1)
+    for day in range(first, last):
+        for start, end in exchange.day_sessions(d):
+            starts.append(table.to_utc(day * SECONDS_PER_DAY + start * 60))
+            ends.append(table.to_utc(day * SECONDS_PER_DAY + end * 60))
+        d = date.fromordinal(d.toordinal() + 1)
+    return starts, ends
+
+
+def _year_of(ts: int) -> int:
+    return datetime.fromtimestamp(ts, timezone.utc).year
+
+
+def session_intervals(exchange_id: str, start_ts: int, end_ts: int) -> List[Interval]:
+    """Open intervals of `exchange_id` overlapping [start_ts, end_ts), clipped to it."""
+    result: List[Interval] = []
+    # Sessions are local days, so a year's table may start before Jan 1 UTC
+    for year in range(_year_of(start_ts - SECONDS_PER_DAY), _year_of(end_ts + SECONDS_PER_DAY) + 1):
+        starts, ends = session_table(exchange_id, year)
+        lo = bisect_right(ends, start_ts)
+        hi = bisect_left(starts, end_ts)
+        for i in range(lo, hi):
+            result.append((max(starts[i], start_ts), min(ends[i], end_ts)))
+    return result
+
+
+def intersect_intervals(a: Sequence[Interval], b: Sequence[Interval]) -> List[Interval]:
+    """Intersection of two sorted, non-overlapping interval lists (two-pointer merge)."""
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def overlap_intervals(first_id: str, second_id: str, start_ts: int, end_ts: int) -> List[Interval]:
+    """Times in [start_ts, end_ts) when both exchanges are open."""
+    return intersect_intervals(
+        session_intervals(first_id, start_ts, end_ts),
+        session_intervals(second_id, start_ts, end_ts),
+    )
+
+
+def active_overlaps(exchange_ids: Sequence[str]) -> List[Tuple[Exchange, Exchange]]:
+    """SESSION_OVERLAPS pairs whose exchanges are both shown."""
+    known = exchanges()
+    shown = set(exchange_ids)
+    return [
+        (known[a], known[b]) for a, b in SESSION_OVERLAPS
+        if a in shown and b in shown and a in known and b in known
+    ]
+
+
+def exchange_ids_or_default(exchange_ids: Optional[Sequence[str]]) -> List[str]:
+    """Known ids of `exchange_ids`; the defaults only if it is None (an empty choice shows none)."""
+    known = exchanges()
+    if exchange_ids is None:
+        exchange_ids = DEFAULT_TRADING_EXCHANGES
+    return [e for e in exchange_ids if e in known]
@@ -0,0 +1,170 @@
+# timeboard_core/tz_tables.py
+"""
+Precomputed UTC-offset transition tables per timezone.
+
+Recurrence expansion converts many wall-clock times to UTC. Instead of a
+ZoneInfo lookup per occurrence, each zone's offset transitions are found
+once per year (daily probes, bisected to the second) and kept in sorted
+arrays; conversions are then a single bisect. Tables grow on demand,
+one contiguous year range per zone.
+
+Ambiguous and non-existent wall times resolve like `datetime` with
+fold=0: the earlier instant in a fall-back overlap, the pre-transition
+offset in a spring-forward gap.
+"""
+from bisect import bisect_right
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+import threading
+
+SECONDS_PER_DAY = 86400
+
+# Offsets are probed daily; zones never change offset twice within a day
+PROBE_STEP = SECONDS_PER_DAY
+
+# Years outside this range are converted through ZoneInfo directly
+TABLE_MIN_YEAR = 1900
+TABLE_MAX_YEAR = 2200
+
+# Memoized wall-clock -> UTC datetimes per zone (see ZoneTable.utc_datetime)
+DATETIME_CACHE_SIZE = 65536
+
+UTC = ZoneInfo("UTC")
+
+
+def _year_start(year: int) -> int:
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _year_of(ts: int) -> int:
+    return datetime.fromtimestamp(ts, timezone.utc).year
+
+
+class ZoneTable:
+    """
+    Offset transitions of one zone as parallel sorted arrays.
+
+    The arrays and their covered range are published together as one
+    tuple, replaced (never modified) when the table grows, so readers
+    take no lock: each call unpacks one consistent version.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.zone = ZoneInfo(name)
+        self._lock = threading.Lock()
+        self._first_year = self._last_year = None
+        self._entries: List[Tuple[int, int]] = []   # (utc ts, offset from then on)
+        # (lo, hi, utc, wall, offsets): covered UTC range [lo, hi), the
+        # transitions, their fold=0 switch points in local seconds, offsets
+        self._arrays: Tuple[int, int, List[int], List[int], List[int]] = (0, 0, [], [], [])
+        self._datetimes: Dict[int, datetime] = {}
+
+    def _probe(self, ts: int) -> int:
+        return int(datetime.fromtimestamp(ts, self.zone).utcoffset().total_seconds())
+
+    def _year_entries(self, year: int) -> List[Tuple[int, int]]:
+        start, end = _year_start(year), _year_start(year + 1)
+        prev_ts, prev_off = start, self._probe(start)
+        entries = [(start, prev_off)]
+        ts = start
+        while ts < end - 1:
+            ts = min(ts + PROBE_STEP, end - 1)
+            off = self._probe(ts)
+            if off != prev_off:
+                lo, hi = prev_ts, ts            # offset changes in (lo, hi]
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if self._probe(mid) == prev_off:
+                        lo = mid
+                    else:
+                        hi = mid
+                entries.append((hi, off))
+                prev_off = off
+            prev_ts = ts
+        return entries
+
+    def _cover_year(self, year: int):
+        with self._lock:
+            if self._first_year is not None and self._first_year <= year <= self._last_year:
+                return
+            if self._first_year is None:
+                years = [year]
+                self._first_year = self._last_year = year
+            elif year < self._first_year:
+                years = list(range(year, self._first_year))
+                self._first_year = year
+            else:
+                years = list(range(self._last_year + 1, year + 1))
+                self._last_year = year
+
+            new = [e for y in years for e in self._year_entries(y)]
+            entries = sorted(self._entries + new)
+
+            # Drop year-start probes that do not change the offset
+            compact = entries[:1]
+            for ts, off in entries[1:]:
+                if off != compact[-1][1]:
+                    compact.append((ts, off))
+
+            utc, wall, offsets = [], [], []
+            prev_off = compact[0][1]
+            for ts, off in compact:
+                utc.append(ts)
+                wall.append(ts + max(prev_off, off))
+                offsets.append(off)
+                prev_off = off
+            self._entries = compact
+            self._arrays = (_year_start(self._first_year), _year_start(self._last_year + 1), utc, wall, offsets)
+
+    def _cover(self, ts: int) -> bool:
+        """Make sure `ts` is inside the table; False if it is out of range."""
+        year = _year_of(ts)
+        if not TABLE_MIN_YEAR <= year <= TABLE_MAX_YEAR:
+            return False
+        self._cover_year(year)
+        return True
+
+    def utc_offset(self, utc_ts: int) -> int:
+        """Offset (seconds east of UTC) in effect at `utc_ts`."""
+        lo, hi, utc, _, offsets = self._arrays
+        if not lo <= utc_ts < hi:
+            if not self._cover(utc_ts):
+                return self._probe(utc_ts)
+            _, _, utc, _, offsets = self._arrays
+        return offsets[bisect_right(utc, utc_ts) - 1]
+
+    def to_local(self, utc_ts: int) -> int:
+        """Wall-clock seconds (as if the zone were UTC) for a UTC timestamp."""
+        return utc_ts + self.utc_offset(utc_ts)
+
+    def to_utc(self, local_ts: int) -> int:
+        """UTC timestamp of a wall-clock time (fold=0 for overlaps and gaps)."""
+        lo, hi, _, wall, offsets = self._arrays
+        if not lo + SECONDS_PER_DAY <= local_ts < hi - SECONDS_PER_DAY:
+            if not (self._cover(local_ts - SECONDS_PER_DAY) and self._cover(local_ts + SECONDS_PER_DAY)):
+                naive = datetime.fromtimestamp(local_ts, timezone.utc).replace(tzinfo=self.zone)
+                return int(naive.timestamp())
+            _, _, _, wall, offsets = self._arrays
+        # local_ts is a day past the first switch point (a year start), so i >= 0
+        return local_ts - offsets[bisect_right(wall, local_ts) - 1]
+
+    def utc_datetime(self, local_ts: int) -> datetime:
+        """
+        `to_utc` as an aware UTC datetime, memoized: occurrences of
+        different rules and days share the same (immutable) instances.
+        """
+        dt = self._datetimes.get(local_ts)
+        if dt is None:
+            if len(self._datetimes) >= DATETIME_CACHE_SIZE:
+                self._datetimes.clear()
+            dt = self._datetimes[local_ts] = datetime.fromtimestamp(self.to_utc(local_ts), UTC)
+        return dt
+
+
+@lru_cache(maxsize=None)
+def zone_table(name: str) -> ZoneTable:
+    """Shared table for zone `name` (tables are thread-safe)."""
+    return ZoneTable(name)